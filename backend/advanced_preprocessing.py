@@ -8,8 +8,17 @@ from nltk.tokenize import word_tokenize, sent_tokenize
 from textblob import TextBlob
 import spacy
 from collections import Counter
+from functools import cached_property
+from itertools import islice
+from multiprocessing import Pool
 import string
 
+try:
+    from .keyword_lexicons import get_default_matcher
+except Exception:
+    # Support running as script
+    from keyword_lexicons import get_default_matcher
+
 # Download required NLTK data
 try:
     nltk.data.find('tokenizers/punkt')
@@ -26,6 +35,58 @@ try:
 except LookupError:
     nltk.download('wordnet')
 
+# spaCy components _spacy_features() reads from (entities, dependencies, noun chunks, POS tags)
+_SPACY_FEATURE_PIPES = {'tok2vec', 'tagger', 'morphologizer', 'attribute_ruler', 'parser', 'ner'}
+
+# Per-process preprocessor for preprocess_texts() workers (NLTK/TextBlob features only)
+_worker_preprocessor = None
+
+def _init_worker():
+    global _worker_preprocessor
+    _worker_preprocessor = AdvancedTextPreprocessor(use_spacy=False)
+
+def _preprocess_in_worker(args):
+    text, advanced_features = args
+    return _worker_preprocessor.preprocess_text(text, advanced_features)
+
+class AnalyzedDocument:
+    """
+    Views of one article shared by the feature extractors.
+
+    Sentences, word tokens, the lowercased text, the TextBlob and the spaCy
+    doc are each computed on first use and then reused, so one call to
+    preprocess_text() tokenizes and parses the article once.
+    """
+    
+    def __init__(self, text, nlp=None):
+        self.text = text
+        self._nlp = nlp
+    
+    @cached_property
+    def sentences(self):
+        return sent_tokenize(self.text)
+    
+    @cached_property
+    def tokens(self):
+        # Same as word_tokenize(text), reusing the sentence split
+        return [token for sentence in self.sentences for token in word_tokenize(sentence, preserve_line=True)]
+    
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+    
+    @cached_property
+    def lower_tokens(self):
+        return [token.lower() for token in self.tokens]
+    
+    @cached_property
+    def blob(self):
+        return TextBlob(self.text)
+    
+    @cached_property
+    def spacy_doc(self):
+        return self._nlp(self.text) if self._nlp is not None else None
+
 class AdvancedTextPreprocessor:
     """
     Advanced text preprocessing with feature engineering
@@ -47,43 +108,16 @@ class AdvancedTextPreprocessor:
                 print("⚠️ spaCy model not found. Install with: python -m spacy download en_core_web_sm")
                 self.nlp = None
         
-        # Fake news indicators
-        self.fake_indicators = {
-            'clickbait_words': [
-                'shocking', 'amazing', 'incredible', 'unbelievable', 'mind-blowing',
-                'you won\'t believe', 'this will shock you', 'doctors hate this',
-                'secret', 'exposed', 'revealed', 'conspiracy', 'cover-up'
-            ],
-            'emotional_words': [
-                'outrageous', 'disgusting', 'terrifying', 'horrifying', 'shocking',
-                'amazing', 'incredible', 'unbelievable', 'fantastic', 'wonderful'
-            ],
-            'urgency_words': [
-                'breaking', 'urgent', 'immediate', 'now', 'today only',
-                'limited time', 'act fast', 'don\'t wait', 'last chance'
-            ],
-            'authority_words': [
-                'expert says', 'scientists confirm', 'doctors agree',
-                'research shows', 'studies prove', 'official statement'
-            ]
-        }
-        
-        # Credibility indicators
-        self.credibility_indicators = {
-            'factual_words': [
-                'according to', 'data shows', 'statistics indicate',
-                'research conducted', 'study published', 'official report',
-                'verified', 'confirmed', 'evidence', 'source'
-            ],
-            'neutral_words': [
-                'reported', 'stated', 'announced', 'declared',
-                'mentioned', 'noted', 'observed', 'found'
-            ]
-        }
+        # Fake news and credibility indicator lexicons (see lexicons.json), matched in one pass
+        self.keyword_matcher = get_default_matcher()
+        self.fake_indicators = self.keyword_matcher.lexicons['fake_indicators']
+        self.credibility_indicators = self.keyword_matcher.lexicons['credibility_indicators']
     
-    def preprocess_text(self, text, advanced_features=True):
+    def preprocess_text(self, text, advanced_features=True, doc=None):
         """
         Comprehensive text preprocessing with feature extraction
+        
+        `doc` is an optional AnalyzedDocument of `text` to reuse.
         """
         if not text or not isinstance(text, str):
             return "", {}
@@ -100,10 +134,56 @@ class AdvancedTextPreprocessor:
         # Extract features
         features = {}
         if advanced_features:
-            features = self._extract_text_features(text, processed_text)
+            features = self._extract_text_features(text, processed_text, doc)
         
         return processed_text, features
     
+    def preprocess_texts(self, texts, batch_size=256, n_process=1, advanced_features=True):
+        """
+        Preprocess many texts, yielding (processed_text, features) in input order.
+        
+        Texts are read from the iterable `batch_size` at a time. spaCy parses
+        each batch with nlp.pipe() (only the components the features use),
+        while the NLTK/TextBlob features run in `n_process` worker processes.
+        Memory stays bounded by one batch however long the input is.
+        """
+        pool = Pool(n_process, initializer=_init_worker) if n_process > 1 else None
+        try:
+            texts = iter(texts)
+            while True:
+                batch = list(islice(texts, batch_size))
+                if not batch:
+                    break
+                if pool is not None:
+                    pending = pool.map_async(_preprocess_in_worker, [(text, advanced_features) for text in batch],
+                                             chunksize=max(1, len(batch) // (n_process * 4)))
+                parsed = self._parse_batch(batch, batch_size) if advanced_features else [None] * len(batch)
+                if pool is not None:
+                    for text, spacy_doc, (processed_text, features) in zip(batch, parsed, pending.get()):
+                        if features and spacy_doc is not None:
+                            doc = AnalyzedDocument(text, self.nlp)
+                            doc.spacy_doc = spacy_doc
+                            features.update(self._spacy_features(doc))
+                        yield processed_text, features
+                else:
+                    for text, spacy_doc in zip(batch, parsed):
+                        doc = AnalyzedDocument(text, self.nlp)
+                        doc.spacy_doc = spacy_doc
+                        yield self.preprocess_text(text, advanced_features, doc=doc)
+        finally:
+            if pool is not None:
+                pool.terminate()
+    
+    def _parse_batch(self, texts, batch_size):
+        """spaCy docs for a batch (None where there is no model or no text)"""
+        if not self.nlp:
+            return [None] * len(texts)
+        valid = [text if text and isinstance(text, str) else '' for text in texts]
+        unused = [name for name in self.nlp.pipe_names if name not in _SPACY_FEATURE_PIPES]
+        with self.nlp.select_pipes(disable=unused):
+            docs = list(self.nlp.pipe(valid, batch_size=batch_size))
+        return [doc if text else None for doc, text in zip(docs, valid)]
+    
     def _basic_cleaning(self, text):
         """Basic text cleaning"""
         # Convert to lowercase
@@ -142,40 +222,41 @@ class AdvancedTextPreprocessor:
         
         return ' '.join(tokens)
     
-    def _extract_text_features(self, original_text, processed_text):
+    def _extract_text_features(self, original_text, processed_text, doc=None):
         """Extract comprehensive text features"""
         features = {}
+        if doc is None:
+            doc = AnalyzedDocument(original_text, self.nlp)
         
         # Basic text statistics
-        features.update(self._basic_statistics(original_text, processed_text))
+        features.update(self._basic_statistics(doc, processed_text))
         
         # Linguistic features
-        features.update(self._linguistic_features(original_text))
+        features.update(self._linguistic_features(doc))
         
         # Sentiment analysis
-        features.update(self._sentiment_features(original_text))
+        features.update(self._sentiment_features(doc))
         
-        # Fake news indicators
-        features.update(self._fake_news_indicators(original_text))
-        
-        # Credibility indicators
-        features.update(self._credibility_indicators(original_text))
+        # Fake news and credibility indicators, counted in one pass
+        keyword_counts = self.keyword_matcher.count(doc.lower)
+        features.update(self._fake_news_indicators(original_text, keyword_counts))
+        features.update(self._credibility_indicators(original_text, keyword_counts))
         
         # Readability metrics
-        features.update(self._readability_features(original_text))
+        features.update(self._readability_features(doc))
         
         # Advanced NLP features (if spaCy available)
         if self.nlp:
-            features.update(self._spacy_features(original_text))
+            features.update(self._spacy_features(doc))
         
         return features
     
-    def _basic_statistics(self, original_text, processed_text):
+    def _basic_statistics(self, doc, processed_text):
         """Extract basic text statistics"""
         # Word counts
         word_count = len(processed_text.split())
-        char_count = len(original_text)
-        sentence_count = len(sent_tokenize(original_text))
+        char_count = len(doc.text)
+        sentence_count = len(doc.sentences)
         
         # Vocabulary diversity
         unique_words = len(set(processed_text.split()))
@@ -197,10 +278,11 @@ class AdvancedTextPreprocessor:
             'unique_words': unique_words
         }
     
-    def _linguistic_features(self, text):
+    def _linguistic_features(self, doc):
         """Extract linguistic features"""
+        text = doc.text
         # Part of speech distribution
-        tokens = word_tokenize(text.lower())
+        tokens = doc.lower_tokens
         
         # Count different types of words
         noun_count = 0
@@ -235,13 +317,12 @@ class AdvancedTextPreprocessor:
             'question_ratio': question_ratio
         }
     
-    def _sentiment_features(self, text):
+    def _sentiment_features(self, doc):
         """Extract sentiment features"""
-        blob = TextBlob(text)
-        
         # Polarity and subjectivity
-        polarity = blob.sentiment.polarity
-        subjectivity = blob.sentiment.subjectivity
+        blob_sentiment = doc.blob.sentiment
+        polarity = blob_sentiment.polarity
+        subjectivity = blob_sentiment.subjectivity
         
         # Sentiment categories
         if polarity > 0.1:
@@ -257,14 +338,12 @@ class AdvancedTextPreprocessor:
             'sentiment_category': sentiment
         }
     
-    def _fake_news_indicators(self, text):
+    def _fake_news_indicators(self, text, keyword_counts=None):
         """Detect fake news indicators"""
-        text_lower = text.lower()
+        if keyword_counts is None:
+            keyword_counts = self.keyword_matcher.count(text)
         
-        fake_scores = {}
-        for category, words in self.fake_indicators.items():
-            score = sum(1 for word in words if word.lower() in text_lower)
-            fake_scores[f'{category}_count'] = score
+        fake_scores = {f'{category}_count': score for category, score in keyword_counts['fake_indicators'].items()}
         
         # Overall fake news score
         total_fake_score = sum(fake_scores.values())
@@ -275,14 +354,13 @@ class AdvancedTextPreprocessor:
             'fake_news_probability': min(total_fake_score / 10, 1.0)  # Normalize to 0-1
         }
     
-    def _credibility_indicators(self, text):
+    def _credibility_indicators(self, text, keyword_counts=None):
         """Detect credibility indicators"""
-        text_lower = text.lower()
+        if keyword_counts is None:
+            keyword_counts = self.keyword_matcher.count(text)
         
-        credibility_scores = {}
-        for category, words in self.credibility_indicators.items():
-            score = sum(1 for word in words if word.lower() in text_lower)
-            credibility_scores[f'{category}_count'] = score
+        credibility_scores = {f'{category}_count': score
+                              for category, score in keyword_counts['credibility_indicators'].items()}
         
         # Overall credibility score
         total_credibility_score = sum(credibility_scores.values())
@@ -293,15 +371,15 @@ class AdvancedTextPreprocessor:
             'credibility_probability': min(total_credibility_score / 10, 1.0)  # Normalize to 0-1
         }
     
-    def _readability_features(self, text):
+    def _readability_features(self, doc):
         """Calculate readability metrics"""
-        sentences = sent_tokenize(text)
-        words = word_tokenize(text)
+        sentences = doc.sentences
+        words = doc.tokens
         
         # Flesch Reading Ease
         if len(sentences) > 0 and len(words) > 0:
             avg_sentence_length = len(words) / len(sentences)
-            syllables = self._count_syllables(text)
+            syllables = self._count_syllables(doc.lower)
             avg_syllables_per_word = syllables / max(len(words), 1)
             
             flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables_per_word)
@@ -331,12 +409,12 @@ class AdvancedTextPreprocessor:
             'avg_syllables_per_word': avg_syllables_per_word if 'avg_syllables_per_word' in locals() else 0
         }
     
-    def _spacy_features(self, text):
+    def _spacy_features(self, doc):
         """Extract advanced NLP features using spaCy"""
         if not self.nlp:
             return {}
         
-        doc = self.nlp(text)
+        doc = doc.spacy_doc
         
         # Named entities
         entity_types = Counter([ent.label_ for ent in doc.ents])
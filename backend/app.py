@@ -1,29 +1,31 @@
-from flask import Flask, request, jsonify, session, send_from_directory
+from flask import Flask, request, jsonify, session, send_from_directory, Response, stream_with_context, has_request_context, g
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from urllib.parse import quote_plus
 import pickle
+import hashlib
 import re
 import string
 from urllib.parse import urlparse
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import json
 import jwt
 import functools
+import threading
+import time
 from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import xml.etree.ElementTree as ET
+from sqlalchemy import or_, and_, select, union_all, event as sqlalchemy_event
 
 try:
     import requests
-    from bs4 import BeautifulSoup
 except Exception:  # Optional at runtime if user doesn't pass URLs
     requests = None
-    BeautifulSoup = None
 
 app = Flask(__name__)
 
@@ -87,6 +89,39 @@ except Exception:
     # Support running as script
     from continuous_learning import ContinuousLearningSystem
 
+try:
+    from .sparse_vectors import encode_sparse_vector, load_stored_vector
+    from .db_migrations import add_missing_columns, add_missing_indexes
+    from .related_index import RelatedNewsIndex, ApproximateRelatedIndex
+    from .prediction_cache import PredictionCache
+    from .url_cache import ExtractedTextCache, normalize_url
+    from .http_client import HttpClient
+    from .evidence_cache import EvidenceCache
+    from .local_evidence import LocalEvidenceIndex
+    from .html_extraction import extract_article_text, iter_response_text, is_supported_content_type
+    from .write_behind import CommitSequence, IdAllocator, WriteBehindQueue
+    from .near_duplicates import SimHashIndex, minhash, simhash, to_signed, to_unsigned
+    from .story_clusters import StoryClusterer
+    from .keyword_lexicons import get_default_matcher
+    from .text_stats import text_statistics
+    from .term_weights import TermWeights
+except Exception:
+    from sparse_vectors import encode_sparse_vector, load_stored_vector
+    from db_migrations import add_missing_columns, add_missing_indexes
+    from related_index import RelatedNewsIndex, ApproximateRelatedIndex
+    from prediction_cache import PredictionCache
+    from url_cache import ExtractedTextCache, normalize_url
+    from http_client import HttpClient
+    from evidence_cache import EvidenceCache
+    from local_evidence import LocalEvidenceIndex
+    from html_extraction import extract_article_text, iter_response_text, is_supported_content_type
+    from write_behind import CommitSequence, IdAllocator, WriteBehindQueue
+    from near_duplicates import SimHashIndex, minhash, simhash, to_signed, to_unsigned
+    from story_clusters import StoryClusterer
+    from keyword_lexicons import get_default_matcher
+    from text_stats import text_statistics
+    from term_weights import TermWeights
+
 cl_system = ContinuousLearningSystem(
     models_dir=os.path.join(os.path.dirname(__file__), 'models'),
     feedback_dir=os.path.join(os.path.dirname(__file__), 'feedback')
@@ -222,23 +257,198 @@ class News(db.Model):
     emotional_indicators = db.Column(db.Integer)
     
     # Vector representation for similarity search
-    content_vector = db.Column(db.Text)  # JSON string of TF-IDF vector
+    content_vector_sparse = db.Column(db.LargeBinary)  # Compact sparse TF-IDF vector (see sparse_vectors.py)
+    content_vector = db.Column(db.Text)  # Legacy JSON dense vector; rewritten by migrate_db.py
     
     # Related news tracking
     related_news_ids = db.Column(db.Text)  # JSON string of related article IDs
     
+    # Duplicate detection: identical cleaned text or URL under the same model is analyzed once
+    content_hash = db.Column(db.String(64))  # sha256 of cleaned_content
+    canonical_url = db.Column(db.String(1000))  # Normalized original_source for URL inputs
+    model_version = db.Column(db.String(20))  # Model that produced the prediction
+    vocabulary_version = db.Column(db.String(20))  # Vectorizer that produced content_vector_sparse
+    simhash = db.Column(db.BigInteger)  # 64-bit SimHash of cleaned_content (signed, see near_duplicates.py)
+    minhash = db.Column(db.LargeBinary)  # MinHash signature of cleaned_content, confirms wider SimHash matches
+    cluster_id = db.Column(db.Integer)  # Id of the first article in its near-duplicate cluster
+    commit_seq = db.Column(db.BigInteger)  # Commit order across workers, which indexes sync by (see write_behind.py)
+    
     user = db.relationship('User', backref='news_articles')
 
+    __table_args__ = (
+        # Serves per-user history ordered by time, including keyset pagination
+        db.Index('ix_news_user_analyzed_at', 'user_id', 'analyzed_at', 'id'),
+        db.Index('ix_news_content_hash', 'content_hash', 'model_version'),
+        db.Index('ix_news_canonical_url', 'canonical_url', 'model_version'),
+        db.Index('ix_news_cluster_id', 'cluster_id'),
+        db.Index('ix_news_commit_seq', 'commit_seq'),
+    )
+
+# A submission that reused an already analyzed article instead of storing a copy
+class NewsEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    news_id = db.Column(db.Integer, db.ForeignKey('news.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    source_type = db.Column(db.String(20), nullable=False)  # text or url
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    commit_seq = db.Column(db.BigInteger)  # Commit order across workers (see write_behind.py)
+
+    __table_args__ = (
+        db.Index('ix_news_event_user_submitted_at', 'user_id', 'submitted_at', 'id'),
+        db.Index('ix_news_event_commit_seq', 'commit_seq'),
+    )
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+# Cache of prediction payloads keyed on cleaned text + model version
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 10000)),
+    ttl_seconds=int(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+)
+
 # Load model and vectorizer
-import os
 model_path = os.path.join(os.path.dirname(__file__), "model.pkl")
 vectorizer_path = os.path.join(os.path.dirname(__file__), "vectorizer.pkl")
-model = pickle.load(open(model_path, "rb"))
-vectorizer = pickle.load(open(vectorizer_path, "rb"))
+
+def model_feature_importance(model):
+    """Per-term weight toward the FAKE class, or None if the model type exposes none"""
+    if hasattr(model, 'coef_'):
+        # Linear models (Logistic Regression, SVM, etc.)
+        return np.asarray(model.coef_[0], dtype=np.float64)
+    if hasattr(model, 'feature_log_prob_'):
+        # Naive Bayes models
+        # Use the difference between log probabilities of classes
+        if len(model.classes_) == 2:
+            # For binary classification, use the difference between fake and real class probabilities
+            fake_class_idx = 1 if 1 in model.classes_ else 0
+            real_class_idx = 0 if fake_class_idx == 1 else 1
+            return model.feature_log_prob_[fake_class_idx] - model.feature_log_prob_[real_class_idx]
+        return model.feature_log_prob_[0]  # Use first class as reference
+    return None
+
+# Story clusters for /trending: an article joins the closest cluster whose centroid
+# has at least STORY_CLUSTER_THRESHOLD cosine similarity, or starts a new one.
+# At most STORY_CLUSTER_MAX clusters are kept; the least recently updated are evicted.
+def new_story_clusterer():
+    return StoryClusterer(
+        threshold=float(os.environ.get('STORY_CLUSTER_THRESHOLD', 0.5)),
+        max_clusters=int(os.environ.get('STORY_CLUSTER_MAX', 5000)),
+        bucket_seconds=int(os.environ.get('TRENDING_BUCKET_SECONDS', 300)),
+        max_window=int(float(os.environ.get('TRENDING_MAX_WINDOW_HOURS', 24)) * 3600)
+    )
+
+# Related-news index, shared by all requests served with the same vectorizer.
+# 'exact' uses term -> postings lists; 'approximate' uses random-projection LSH,
+# where more tables/probes trade latency for recall.
+RELATED_NEWS_MODE = os.environ.get('RELATED_NEWS_MODE', 'exact')
+
+def new_related_index():
+    if RELATED_NEWS_MODE == 'approximate':
+        return ApproximateRelatedIndex(
+            dimensions=int(os.environ.get('RELATED_NEWS_ANN_DIMENSIONS', 128)),
+            n_tables=int(os.environ.get('RELATED_NEWS_ANN_TABLES', 8)),
+            n_bits=int(os.environ.get('RELATED_NEWS_ANN_BITS', 12)),
+            n_probes=int(os.environ.get('RELATED_NEWS_ANN_PROBES', 2))
+        )
+    return RelatedNewsIndex()
+
+class ModelArtifacts:
+    """
+    Everything derived from one model.pkl/vectorizer.pkl pair, replaced as a whole on reload.
+
+    Requests read it once (see current_model()), so a reload in the middle of
+    a request cannot pair the new vectorizer with the old model. The
+    related-news index and story clusters compare TF-IDF vectors, so they
+    belong to the vectorizer: artifacts with the same vectorizer share them.
+    """
+
+    def __init__(self, model, vectorizer, version, vocabulary_version, related_index, story_clusters):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.version = version
+        self.vocabulary_version = vocabulary_version
+        # Term names and weights for interpretability, computed once per model instead of per request
+        self.feature_names = vectorizer.get_feature_names_out()
+        self.feature_importance = model_feature_importance(model)
+        # Fixed IDF statistics for evidence re-ranking, with an open vocabulary.
+        # clean_text is defined further down, so it is looked up when the weights are used.
+        self.rerank_weights = TermWeights.from_vectorizer(vectorizer, preprocess=lambda text: clean_text(text))
+        self.related_index = related_index
+        self.story_clusters = story_clusters
+
+def _model_file_mtimes():
+    return os.path.getmtime(model_path), os.path.getmtime(vectorizer_path)
+
+def load_model_artifacts():
+    """Load (or reload) the model and vectorizer and drop results computed by the previous model.
+    Returns True if the files held a different model than the one being served."""
+    global model_artifacts, _model_mtimes
+    mtimes = _model_file_mtimes()
+    with open(model_path, "rb") as f:
+        model_bytes = f.read()
+    with open(vectorizer_path, "rb") as f:
+        vectorizer_bytes = f.read()
+    version = hashlib.sha1(model_bytes + vectorizer_bytes).hexdigest()[:12]
+    previous = globals().get('model_artifacts')
+    if previous is not None and version == previous.version:
+        _model_mtimes = mtimes
+        return False
+    vocabulary_version = hashlib.sha1(vectorizer_bytes).hexdigest()[:12]
+    if previous is not None and vocabulary_version == previous.vocabulary_version:
+        related, clusters = previous.related_index, previous.story_clusters
+    else:
+        # Vectors from another vocabulary cannot be compared with this one's: start over and load its rows
+        related, clusters = new_related_index(), new_story_clusterer()
+    artifacts = ModelArtifacts(pickle.loads(model_bytes), pickle.loads(vectorizer_bytes), version, vocabulary_version,
+                               related, clusters)
+    model_artifacts = artifacts  # The one assignment requests can observe
+    _model_mtimes = mtimes
+    prediction_cache.clear()
+    return True
+
+def current_model():
+    """The ModelArtifacts serving this request, taken on first use so it stays the same until the request ends"""
+    if not has_request_context():
+        return model_artifacts
+    if 'model_artifacts' not in g:
+        g.model_artifacts = model_artifacts
+    return g.model_artifacts
+
+load_model_artifacts()
+
+# Replacing model.pkl/vectorizer.pkl (e.g. with a version saved by continuous learning)
+# takes effect in every worker within MODEL_RELOAD_CHECK_SECONDS, without a restart
+MODEL_RELOAD_CHECK_SECONDS = float(os.environ.get('MODEL_RELOAD_CHECK_SECONDS', 30))
+_model_checked_at = time.monotonic()
+_model_reload_lock = threading.Lock()
+
+def reload_model_if_changed():
+    """Reload the model artifacts if their files changed since they were loaded (checked at most every MODEL_RELOAD_CHECK_SECONDS)"""
+    global _model_checked_at
+    if MODEL_RELOAD_CHECK_SECONDS <= 0 or time.monotonic() - _model_checked_at < MODEL_RELOAD_CHECK_SECONDS:
+        return False
+    if not _model_reload_lock.acquire(blocking=False):
+        return False  # Another thread is already checking
+    try:
+        _model_checked_at = time.monotonic()
+        if _model_file_mtimes() == _model_mtimes:
+            return False
+        if load_model_artifacts():
+            print(f"🔄 Reloaded model artifacts (version {model_artifacts.version})")
+            return True
+        return False
+    except Exception as e:
+        # A half-copied file keeps the current model; the next check retries
+        print(f"Error reloading model artifacts: {e}")
+        return False
+    finally:
+        _model_reload_lock.release()
+
+@app.before_request
+def check_model_files():
+    reload_model_if_changed()
 
 
 def is_url(text: str) -> bool:
@@ -249,20 +459,64 @@ def is_url(text: str) -> bool:
         return False
 
 
-def extract_text_from_url(url: str) -> str:
-    if requests is None or BeautifulSoup is None:
-        return url  # Fallback: treat as plain text if deps not available
+# Pooled client with per-upstream circuit breakers for every outbound request
+http_client = HttpClient(
+    pool_maxsize=int(os.environ.get('HTTP_POOL_MAXSIZE', 32)),
+    retries=int(os.environ.get('HTTP_RETRIES', 1)),
+    failure_threshold=int(os.environ.get('HTTP_BREAKER_FAILURES', 5)),
+    reset_timeout=float(os.environ.get('HTTP_BREAKER_RESET_SECONDS', 30))
+) if requests is not None else None
+
+# Extracted article text shared by all workers, keyed by normalized URL
+url_text_cache = ExtractedTextCache(
+    os.environ.get('URL_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'cache', 'url_text.sqlite3')),
+    max_bytes=int(os.environ.get('URL_CACHE_MAX_MB', 256)) * 1024 * 1024,
+    fresh_seconds=int(os.environ.get('URL_CACHE_FRESH_SECONDS', 3600))
+)
+
+# Limits for streamed article downloads
+URL_MAX_BYTES = int(os.environ.get('URL_MAX_KB', 2048)) * 1024
+URL_MAX_CHARS = int(os.environ.get('URL_MAX_CHARS', 100000))
+
+
+def fetch_url_text(url: str):
+    """Article text for a URL (fresh, revalidated or stale from the cache), or None if it could not be downloaded"""
+    if http_client is None:
+        return None
+    cached = url_text_cache.get(url)
+    if cached and cached['fresh']:
+        return cached['text']
     try:
-        response = requests.get(url, timeout=8)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        # Remove script and style elements
-        for tag in soup(["script", "style", "noscript"]):
-            tag.decompose()
-        text = " ".join(soup.stripped_strings)
+        # Revalidate stale entries with a conditional GET
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = http_client.get(url, timeout=8, headers=headers, stream=True)
+        try:
+            if cached and response.status_code == 304:
+                url_text_cache.touch(url)
+                return cached['text']
+            response.raise_for_status()
+            if not is_supported_content_type(response.headers.get('Content-Type')):
+                raise ValueError(f"Unsupported content type: {response.headers.get('Content-Type')}")
+            # Parse while downloading; stops at the byte cap or once enough article text is collected
+            text = extract_article_text(iter_response_text(response, max_bytes=URL_MAX_BYTES), max_chars=URL_MAX_CHARS)
+        finally:
+            response.close()
+        if not text:
+            raise ValueError("No article text found")
+        url_text_cache.put(url, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
         return text
     except Exception:
-        return url
+        # Prefer stale text over reporting a failed download
+        return cached['text'] if cached else None
+
+
+def extract_text_from_url(url: str) -> str:
+    text = fetch_url_text(url)
+    return text if text is not None else url  # Fallback: treat as plain text if the download failed
 
 
 def clean_text(text: str) -> str:
@@ -275,6 +529,35 @@ def clean_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text).strip()
     return text
 
+
+class ArticleAnalysis:
+    """Per-request analysis state shared by the predict helpers.
+
+    Owns the cleaned text, its sparse TF-IDF row and the derived text
+    statistics so each is computed at most once per article, along with the
+    model artifacts the row comes from.
+    """
+
+    def __init__(self, cleaned_text, vector=None, text_stats=None, artifacts=None):
+        self.cleaned_text = cleaned_text
+        self.artifacts = artifacts or current_model()
+        self._vector = vector
+        self._text_stats = text_stats
+
+    @property
+    def vector(self):
+        """Sparse 1 x vocabulary TF-IDF row for the cleaned text"""
+        if self._vector is None:
+            self._vector = self.artifacts.vectorizer.transform([self.cleaned_text])
+        return self._vector
+
+    @property
+    def text_stats(self):
+        """Readability and indicator statistics for the cleaned text"""
+        if self._text_stats is None:
+            self._text_stats = analyze_text_characteristics(self.cleaned_text)
+        return self._text_stats
+
 # Authentication routes
 @app.route('/register', methods=['POST'])
 def register():
@@ -362,6 +645,7 @@ def get_profile():
         # Ensure session is refreshed
         session.permanent = True
         session.modified = True
+        wait_for_user_writes()
         
         return jsonify({
             'id': current_user.id,
@@ -382,6 +666,8 @@ def get_profile():
 def get_profile_jwt():
     """Get user profile using JWT authentication"""
     try:
+        if write_behind is not None:
+            write_behind.wait_for_user(request.user_id)
         user = User.query.get(request.user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -403,6 +689,7 @@ def get_profile_jwt():
 @app.route('/user/stats', methods=['GET'])
 @login_required
 def get_user_stats():
+    wait_for_user_writes()
     total = current_user.predictions_made
     fake_percentage = (current_user.fake_detected / total * 100) if total > 0 else 0
     real_percentage = (current_user.real_detected / total * 100) if total > 0 else 0
@@ -507,53 +794,118 @@ def validate_jwt():
         print(f"Error validating JWT: {e}")
         return jsonify({'valid': False, 'error': 'JWT validation failed'})
 
-@app.route('/predict', methods=['POST'])
-@rate_limit(max_requests=30, window_seconds=60)
-def predict():
-    data = request.get_json() or {}
-    original_input = data.get('news', '')
-
-    source_type = 'url' if is_url(original_input) else 'text'
-    resolved_text = extract_text_from_url(original_input) if source_type == 'url' else original_input
-
-    cleaned = clean_text(resolved_text)
+def predict_labels(X, model):
+    """Predict labels and confidences for every row of a TF-IDF matrix in one model call."""
+    predictions = model.predict(X)
+    labels = ["FAKE" if prediction == 1 else "REAL" for prediction in predictions]
 
-    X = vectorizer.transform([cleaned])
-
-    prediction = model.predict(X)[0]
-    label = "FAKE" if prediction == 1 else "REAL"
-
-    confidence = None
     try:
-        proba = model.predict_proba(X)[0]
+        proba = model.predict_proba(X)
         # If class order is unknown, compute max probability as confidence
-        confidence = float(max(proba))
+        confidences = [float(p) for p in np.max(proba, axis=1)]
     except Exception:
         try:
             # Fallback to decision_function if available; map to 0-1 via sigmoid
-            import math
-            score = model.decision_function(X)[0]
-            confidence = 1 / (1 + math.exp(-abs(float(score))))
+            scores = np.asarray(model.decision_function(X), dtype=float).reshape(-1)
+            confidences = [float(c) for c in 1 / (1 + np.exp(-np.abs(scores)))]
         except Exception:
-            confidence = 0.5
+            confidences = [0.5] * X.shape[0]
 
-    # Get model interpretability data
-    interpretability_data = get_model_interpretability(X, cleaned, label, confidence)
+    return labels, confidences
 
-    # Store the news in database
-    news_id = store_analyzed_news(original_input, resolved_text, cleaned, label, confidence, source_type, interpretability_data)
+def score_articles(cleaned_texts):
+    """Score cleaned texts, serving repeats from the prediction cache.
 
-    # Find related news articles
-    related_news = find_related_news(cleaned, news_id)
+    Returns one (analysis, label, confidence, interpretability) tuple per text.
+    Texts missing from the cache are vectorized and scored in a single model call.
+    """
+    artifacts = current_model()
+    scored = [None] * len(cleaned_texts)
+    misses = []
+    for position, cleaned in enumerate(cleaned_texts):
+        cache_key = PredictionCache.make_key(cleaned, artifacts.version)
+        cached = prediction_cache.get(cache_key)
+        if cached is None:
+            misses.append((position, cache_key))
+            continue
+        analysis = ArticleAnalysis(cleaned, vector=cached['vector'],
+                                   text_stats=cached['interpretability'].get('text_analysis') or None, artifacts=artifacts)
+        scored[position] = (analysis, cached['label'], cached['confidence'], cached['interpretability'])
+
+    if misses:
+        X = artifacts.vectorizer.transform([cleaned_texts[position] for position, _ in misses])
+        labels, confidences = predict_labels(X, artifacts.model)
+        for row, (position, cache_key) in enumerate(misses):
+            analysis = ArticleAnalysis(cleaned_texts[position], vector=X[row], artifacts=artifacts)
+            label, confidence = labels[row], confidences[row]
+            interpretability_data = get_model_interpretability(analysis, label, confidence)
+            prediction_cache.set(cache_key, {
+                'label': label,
+                'confidence': confidence,
+                'interpretability': interpretability_data,
+                'vector': analysis.vector
+            })
+            scored[position] = (analysis, label, confidence, interpretability_data)
 
-    # Track user activity if authenticated
-    if current_user.is_authenticated:
-        current_user.predictions_made += 1
-        if label == "FAKE":
-            current_user.fake_detected += 1
+    return scored
+
+@app.route('/predict', methods=['POST'])
+@rate_limit(max_requests=30, window_seconds=60)
+def predict():
+    data = request.get_json() or {}
+    original_input = data.get('news', '')
+
+    source_type = 'url' if is_url(original_input) else 'text'
+
+    # Reuse an article this model already analyzed: same canonical URL (skips the download) or same cleaned text
+    stored = find_analyzed_news(canonical_url=normalize_url(original_input)) if source_type == 'url' else None
+    downloaded = True
+    cleaned = None
+    if stored is None:
+        if source_type == 'url':
+            resolved_text = fetch_url_text(original_input)
+            downloaded = resolved_text is not None
+            if not downloaded:
+                resolved_text = original_input  # Fallback: treat as plain text if the download failed
         else:
-            current_user.real_detected += 1
-        db.session.commit()
+            resolved_text = original_input
+        cleaned = clean_text(resolved_text)
+        # Empty text would match every other empty (e.g. failed) article
+        stored = find_analyzed_news(content_hash=hash_cleaned_text(cleaned)) if cleaned else None
+
+    # Reposts with a new headline or footer: reuse the cluster's prior verdict
+    near_duplicate = False
+    cluster_id = None
+    if stored is None:
+        match = find_near_duplicate(cleaned)
+        if match is not None:
+            stored, cluster_id, distance = match
+            # Distance 0 is this very text, e.g. resubmitted before the write-behind flush stored its hash
+            near_duplicate = distance > 0
+
+    if stored is not None:
+        cluster_id = cluster_id or stored.cluster_id or stored.id
+        if cleaned is None:
+            cleaned = stored.cleaned_content  # Reused by canonical URL without downloading: the stored text is this URL's
+        analysis, label, confidence, interpretability_data = reuse_analyzed_news(stored)
+        news_id = stored.id
+        event = record_news_event(stored, source_type)
+        if event is not None:
+            story_cluster_id = analysis.artifacts.story_clusters.record(
+                event.id, (stored.id, analysis.vector, utc_timestamp(event.submitted_at), label, stored.title))
+        else:
+            story_cluster_id = analysis.artifacts.story_clusters.cluster_of(stored.id)
+    else:
+        # Prediction and interpretability data (cached per cleaned text and model version)
+        analysis, label, confidence, interpretability_data = score_articles([cleaned])[0]
+
+        # Store the news in database
+        news_id = store_analyzed_news(original_input, resolved_text, analysis, label, confidence, source_type,
+                                      interpretability_data, downloaded=downloaded)
+        story_cluster_id = analysis.artifacts.story_clusters.cluster_of(news_id)
+
+    # Find related news articles
+    related_news = find_related_news(analysis, news_id)
 
     response = {
         'prediction': label,
@@ -562,10 +914,123 @@ def predict():
         'cleaned_preview': cleaned[:200],
         'interpretability': interpretability_data,
         'news_id': news_id,
+        'reused': stored is not None,
+        'near_duplicate': near_duplicate,
+        'duplicate_cluster_id': cluster_id,
+        'story_cluster_id': story_cluster_id,
         'related_news': related_news
     }
     return jsonify(response)
 
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 500))
+# URL items of a batch are downloaded on this many threads, all within BATCH_URL_DEADLINE_SECONDS
+_batch_url_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('BATCH_URL_WORKERS', 8)),
+                                         thread_name_prefix='batch-url')
+BATCH_URL_DEADLINE_SECONDS = float(os.environ.get('BATCH_URL_DEADLINE_SECONDS', 60))
+
+def fetch_batch_urls(urls, deadline_seconds=None):
+    """Download (position, url) items concurrently.
+    Returns ({position: text or None}, positions still downloading at the deadline)"""
+    if not urls:
+        return {}, set()
+    futures = {_batch_url_executor.submit(fetch_url_text, url): position for position, url in urls}
+    texts = {}
+    try:
+        for future in as_completed(futures, timeout=deadline_seconds or BATCH_URL_DEADLINE_SECONDS):
+            try:
+                texts[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Error downloading batch item {futures[future]}: {e}")
+                texts[futures[future]] = None
+    except FuturesTimeoutError:
+        pass
+    timed_out = set()
+    for future, position in futures.items():
+        if position not in texts:
+            future.cancel()
+            timed_out.add(position)
+    return texts, timed_out
+
+@app.route('/predict/batch', methods=['POST'])
+@rate_limit(max_requests=10, window_seconds=60)
+def predict_batch():
+    """Score many articles (text or URLs) with a single vectorizer/model pass.
+    Body: { news: [str, ...] }
+    """
+    data = request.get_json() or {}
+    inputs = data.get('news')
+    if not isinstance(inputs, list) or not inputs:
+        return jsonify({'error': 'news must be a non-empty list of texts or URLs'}), 400
+    if len(inputs) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} items)'}), 400
+
+    results = [None] * len(inputs)
+    # Download URL items concurrently under one deadline, so a batch of slow URLs cannot outlive the worker timeout
+    url_texts, timed_out = fetch_batch_urls([(position, item) for position, item in enumerate(inputs)
+                                             if isinstance(item, str) and is_url(item)])
+    pending = []  # (position, original_input, resolved_text, cleaned, source_type)
+    for position, original_input in enumerate(inputs):
+        if not original_input or not isinstance(original_input, str):
+            results[position] = {'index': position, 'error': 'Item must be a non-empty string'}
+            continue
+        try:
+            source_type = 'url' if is_url(original_input) else 'text'
+            if source_type == 'url' and url_texts.get(position) is None:
+                error = 'URL download timed out' if position in timed_out else 'Failed to download URL'
+                results[position] = {'index': position, 'error': error}
+                continue
+            resolved_text = url_texts[position] if source_type == 'url' else original_input
+            cleaned = clean_text(resolved_text)
+            if not cleaned:
+                results[position] = {'index': position, 'error': 'No analyzable text'}
+                continue
+            pending.append((position, original_input, resolved_text, cleaned, source_type))
+        except Exception as e:
+            print(f"Error preparing batch item {position}: {e}")
+            results[position] = {'index': position, 'error': 'Failed to process item'}
+
+    if pending:
+        try:
+            scored = score_articles([item[3] for item in pending])
+        except Exception as e:
+            print(f"Error scoring batch: {e}")
+            return jsonify({'error': 'Batch prediction failed'}), 500
+
+        news_records = []
+        for (position, original_input, resolved_text, cleaned, source_type), (analysis, label, confidence, interpretability_data) in zip(pending, scored):
+            try:
+                news = build_news_record(original_input, resolved_text, analysis, label, confidence,
+                                         source_type, interpretability_data)
+                news_records.append((position, news, analysis))
+                results[position] = {
+                    'index': position,
+                    'prediction': label,
+                    'confidence': round(confidence * 100, 2),
+                    'source_type': source_type,
+                    'cleaned_preview': cleaned[:200],
+                    'interpretability': interpretability_data,
+                    'news_id': None
+                }
+            except Exception as e:
+                print(f"Error in batch item {position}: {e}")
+                results[position] = {'index': position, 'error': 'Failed to process item'}
+
+        # Persist the whole batch in one transaction (or one write-behind flush)
+        try:
+            persist_news([news for _, news, _ in news_records])
+            for position, news, analysis in news_records:
+                results[position]['news_id'] = news.id
+                index_stored_news(news, analysis)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error storing batch: {e}")
+
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'errors': sum(1 for item in results if 'error' in item)
+    })
+
 @app.route('/feedback', methods=['POST'])
 @login_required
 @rate_limit(max_requests=100, window_seconds=3600)
@@ -584,6 +1049,8 @@ def submit_feedback():
         return jsonify({'error': 'predicted_label and actual_label are required'}), 400
 
     if news_id:
+        if write_behind is not None:
+            write_behind.wait_for_news([news_id])
         news = News.query.get(news_id)
         if not news:
             return jsonify({'error': 'news_id not found'}), 404
@@ -619,50 +1086,287 @@ def feedback_stats():
         print(f"Error getting feedback stats: {e}")
         return jsonify({'error': 'Failed to retrieve feedback stats'}), 500
 
+@app.route('/upstreams/status', methods=['GET'])
+@login_required
+def upstreams_status():
+    """Circuit breaker states, connection pool usage and evidence cache counters"""
+    if http_client is None:
+        return jsonify({'error': 'Outbound HTTP is not available'}), 503
+    status = http_client.stats()
+    status['evidence_cache'] = evidence_cache.stats()
+    return jsonify(status)
+
+@app.route('/model/reload', methods=['POST'])
+@login_required
+def model_reload():
+    """Reload model.pkl/vectorizer.pkl in this worker now (other workers follow within MODEL_RELOAD_CHECK_SECONDS)"""
+    try:
+        with _model_reload_lock:
+            reloaded = load_model_artifacts()
+        return jsonify({'reloaded': reloaded, 'model_version': model_artifacts.version})
+    except Exception as e:
+        print(f"Error reloading model: {e}")
+        return jsonify({'error': 'Failed to reload model'}), 500
+
 @app.route('/model/status', methods=['GET'])
 @login_required
 def model_status():
     try:
         status = cl_system.get_system_status()
+        status['model_version'] = model_artifacts.version
+        status['prediction_cache'] = prediction_cache.stats()
+        status['write_behind'] = write_behind.stats() if write_behind is not None else None
         return jsonify(status)
     except Exception as e:
         print(f"Error getting model status: {e}")
         return jsonify({'error': 'Failed to retrieve model status'}), 500
 
-def store_analyzed_news(original_input, resolved_text, cleaned_text, label, confidence, source_type, interpretability_data):
+@app.route('/trending', methods=['GET'])
+@rate_limit(max_requests=60, window_seconds=60)
+def trending_stories():
+    """Story clusters with the most articles in the last `window` seconds.
+    Query: window (default 3600), limit (default 10)
+    """
+    try:
+        window = request.args.get('window', 3600, type=int)
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        story_clusters = current_model().story_clusters
+        sync_story_clusters()
+        return jsonify({
+            'window_seconds': max(story_clusters.bucket_seconds, min(window, story_clusters.max_window)),
+            'stories': story_clusters.trending(time.time(), window_seconds=window, limit=limit),
+            'clusters': story_clusters.stats()
+        })
+    except Exception as e:
+        print(f"Error getting trending stories: {e}")
+        return jsonify({'error': 'Failed to retrieve trending stories'}), 500
+
+# News ids are reserved in blocks per process so /predict can return them
+# before the row is written; rows and user counters are then written in
+# bulk by a background thread instead of a commit per request.
+news_id_allocator = IdAllocator(db, News.__table__.name, block_size=int(os.environ.get('NEWS_ID_BLOCK_SIZE', 100)))
+# Repeat submissions get their ids up front too, so story clusters can count them locally and skip them when synced
+news_event_id_allocator = IdAllocator(db, NewsEvent.__table__.name,
+                                      block_size=int(os.environ.get('NEWS_ID_BLOCK_SIZE', 100)))
+# Indexes sync rows written by other workers in commit order, which block-allocated ids are not
+news_commit_sequence = CommitSequence(db, News.__table__.name)
+news_event_commit_sequence = CommitSequence(db, NewsEvent.__table__.name)
+
+@sqlalchemy_event.listens_for(db.session, 'before_flush')
+def stamp_commit_sequences(session, flush_context, instances):
+    """Number News and NewsEvent rows added through the session (the write-behind flush numbers its own)"""
+    for model, sequence in ((News, news_commit_sequence), (NewsEvent, news_event_commit_sequence)):
+        sequence.stamp(session, [obj for obj in session.new if isinstance(obj, model) and obj.commit_seq is None])
+
+write_behind = WriteBehindQueue(
+    app, db, News, User, NewsEvent, news_commit_sequence, news_event_commit_sequence,
+    flush_interval=float(os.environ.get('WRITE_BEHIND_INTERVAL', 1.0)),
+    batch_size=int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', 200)),
+    max_pending=int(os.environ.get('WRITE_BEHIND_MAX_PENDING', 2000)),
+    max_attempts=int(os.environ.get('WRITE_BEHIND_MAX_ATTEMPTS', 3))
+) if os.environ.get('WRITE_BEHIND', '1') != '0' else None
+
+def build_news_record(original_input, resolved_text, analysis, label, confidence, source_type, interpretability_data,
+                      downloaded=True):
+    """Build (but do not persist) a News row for an analyzed article.
+    Only articles whose URL was downloaded and that have cleaned text get the
+    canonical URL and content hash that later submissions are reused from."""
+    # Extract title (first 100 characters or first sentence)
+    title = resolved_text[:100] if len(resolved_text) <= 100 else resolved_text[:100] + "..."
+    
+    # Get text analysis data
+    text_analysis = analysis.text_stats
+    
+    # Content vector for similarity search
+    vector_blob = encode_sparse_vector(analysis.vector)
+    
+    # Near-duplicates of an indexed article join its cluster; anything else starts a new one
+    news_id = news_id_allocator.next_id()
+    fingerprint, signature = article_fingerprint(analysis.cleaned_text) or (None, None)
+    match = simhash_index.query(fingerprint, signature) if fingerprint is not None else None
+    reusable = downloaded and bool(analysis.cleaned_text)
+    
+    return News(
+        id=news_id,
+        title=title,
+        content=resolved_text,
+        cleaned_content=analysis.cleaned_text,
+        prediction=label,
+        confidence=confidence,
+        source_type=source_type,
+        original_source=original_input if source_type == 'url' else None,
+        user_id=current_user.id if has_request_context() and current_user.is_authenticated else None,
+        word_count=text_analysis.get('word_count', 0),
+        vocabulary_diversity=text_analysis.get('vocabulary_diversity', 0.0),
+        readability_score=text_analysis.get('readability_score', 0.0),
+        formal_indicators=text_analysis.get('formal_indicators', 0),
+        credibility_indicators=text_analysis.get('credibility_indicators', 0),
+        emotional_indicators=text_analysis.get('emotional_indicators', 0),
+        content_vector_sparse=vector_blob,
+        content_hash=hash_cleaned_text(analysis.cleaned_text) if reusable else None,
+        canonical_url=normalize_url(original_input) if source_type == 'url' and reusable else None,
+        model_version=analysis.artifacts.version,
+        vocabulary_version=analysis.artifacts.vocabulary_version,
+        simhash=to_signed(fingerprint) if fingerprint is not None else None,
+        minhash=signature,
+        cluster_id=match[1] if match else news_id
+    )
+
+def persist_news(records):
+    """Queue built News rows for the write-behind flush (or commit them now with WRITE_BEHIND=0)
+    and count them toward the signed-in user's activity stats"""
+    user_id = current_user.id if current_user.is_authenticated else None
+    if write_behind is not None:
+        # Raises, with nothing queued, if the buffer is full and cannot be flushed
+        write_behind.reserve(len(records))
+        for news in records:
+            write_behind.add_news(news)
+            if user_id is not None:
+                write_behind.add_user_prediction(user_id, news.prediction)
+        return
+    db.session.add_all(records)
+    if user_id is not None:
+        for news in records:
+            count_user_prediction(current_user, news.prediction)
+    db.session.commit()
+
+def count_user_prediction(user, label):
+    user.predictions_made += 1
+    if label == "FAKE":
+        user.fake_detected += 1
+    else:
+        user.real_detected += 1
+
+def record_news_event(news, source_type):
+    """Link a repeat submission of an already stored article to the submitting user.
+    Returns the queued or stored NewsEvent, or None if it could not be recorded."""
+    try:
+        user_id = current_user.id if current_user.is_authenticated else None
+        event = NewsEvent(id=news_event_id_allocator.next_id(), news_id=news.id, user_id=user_id,
+                          source_type=source_type, submitted_at=datetime.utcnow())
+        if write_behind is not None:
+            write_behind.add_event(event)
+            if user_id is not None:
+                write_behind.add_user_prediction(user_id, news.prediction)
+            return event
+        db.session.add(event)
+        if user_id is not None:
+            count_user_prediction(current_user, news.prediction)
+        db.session.commit()
+        return event
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error recording news event: {e}")
+        return None
+
+def index_stored_news(news, analysis):
+    """Make a just-stored article visible to this process's related-news, near-duplicate and story-cluster lookups"""
+    analysis.artifacts.related_index.add(news.id, analysis.vector)
+    if news.simhash is not None:
+        simhash_index.add(news.id, (to_unsigned(news.simhash), news.cluster_id, news.minhash))
+    analysis.artifacts.story_clusters.add(news.id, (analysis.vector, time.time(), news.prediction, news.title))
+
+def article_fingerprint(cleaned):
+    """(SimHash, MinHash signature) of a cleaned text, or None when it is too short for near-duplicate matching"""
+    tokens = cleaned.split()
+    if len(tokens) < NEAR_DUPLICATE_MIN_TOKENS:
+        return None
+    return simhash(tokens), minhash(tokens)
+
+def _load_fingerprints(watermark, batch_size=5000):
+    """Yield (commit_seq, news_id, (fingerprint, cluster_id, signature)) for articles committed after the watermark"""
+    rows = (db.session.query(News.commit_seq, News.id, News.simhash, News.cluster_id, News.minhash)
+            .filter(News.commit_seq > watermark)
+            .order_by(News.commit_seq)
+            .yield_per(batch_size))
+    for commit_seq, news_id, fingerprint, cluster_id, signature in rows:
+        yield commit_seq, news_id, (to_unsigned(fingerprint), cluster_id, signature) if fingerprint is not None else None
+
+def sync_simhash_index():
+    """Build the near-duplicate index on first use and pick up rows written by other workers"""
+    simhash_index.sync(_load_fingerprints)
+
+def find_near_duplicate(cleaned):
+    """(stored article, cluster id, SimHash distance) for a near-duplicate analyzed by the current model, or None"""
+    fingerprinted = article_fingerprint(cleaned)
+    if fingerprinted is None:
+        return None
+    try:
+        sync_simhash_index()
+        match = simhash_index.query(*fingerprinted)
+        if match is None:
+            return None
+        news_id, cluster_id, distance = match
+        if write_behind is not None:
+            write_behind.wait_for_news([news_id])
+        news = News.query.get(news_id)
+        if news is None or news.model_version != current_model().version:
+            return None
+        return news, cluster_id, distance
+    except Exception as e:
+        print(f"Error looking up near duplicates: {e}")
+        return None
+
+def hash_cleaned_text(cleaned):
+    return hashlib.sha256(cleaned.encode('utf-8')).hexdigest()
+
+def find_analyzed_news(content_hash=None, canonical_url=None):
+    """Most recent stored article with this cleaned-text hash or canonical URL under the current model"""
+    try:
+        # A copy still in the write-behind buffer (e.g. resubmitted within a second) is written first
+        if content_hash is not None and write_behind is not None:
+            pending_id = write_behind.pending_news_id(content_hash)
+            if pending_id is not None:
+                write_behind.wait_for_news([pending_id])
+        news_query = News.query.filter(News.model_version == current_model().version)
+        if content_hash is not None:
+            news_query = news_query.filter(News.content_hash == content_hash)
+        if canonical_url is not None:
+            news_query = news_query.filter(News.canonical_url == canonical_url)
+        return news_query.order_by(News.id.desc()).first()
+    except Exception as e:
+        print(f"Error looking up analyzed news: {e}")
+        return None
+
+def reuse_analyzed_news(news):
+    """(analysis, label, confidence, interpretability) for a stored article, without re-running the model"""
+    try:
+        vector = load_stored_vector(news.content_vector_sparse, news.content_vector)
+        if vector is not None:
+            vector = vector.astype(np.float64)  # Stored as float32; keep JSON-serializable scores
+    except Exception:
+        vector = None
+    cache_key = PredictionCache.make_key(news.cleaned_content, current_model().version)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        analysis = ArticleAnalysis(news.cleaned_content, vector=cached['vector'],
+                                   text_stats=cached['interpretability'].get('text_analysis') or None)
+        return analysis, news.prediction, news.confidence, cached['interpretability']
+    analysis = ArticleAnalysis(news.cleaned_content, vector=vector)
+    interpretability_data = get_model_interpretability(analysis, news.prediction, news.confidence)
+    prediction_cache.set(cache_key, {
+        'label': news.prediction,
+        'confidence': news.confidence,
+        'interpretability': interpretability_data,
+        'vector': analysis.vector
+    })
+    return analysis, news.prediction, news.confidence, interpretability_data
+
+def wait_for_user_writes():
+    """Make the signed-in user's queued articles and counters visible before reading them"""
+    if write_behind is not None and current_user.is_authenticated:
+        if write_behind.wait_for_user(current_user.id):
+            db.session.refresh(current_user._get_current_object())
+
+def store_analyzed_news(original_input, resolved_text, analysis, label, confidence, source_type, interpretability_data,
+                        downloaded=True):
     """Store news in database"""
     try:
-        # Extract title (first 100 characters or first sentence)
-        title = resolved_text[:100] if len(resolved_text) <= 100 else resolved_text[:100] + "..."
+        news = build_news_record(original_input, resolved_text, analysis, label, confidence, source_type,
+                                 interpretability_data, downloaded=downloaded)
         
-        # Get text analysis data
-        text_analysis = interpretability_data.get('text_analysis', {})
-        
-        # Create content vector for similarity search
-        content_vector = vectorizer.transform([cleaned_text])
-        vector_json = content_vector.toarray()[0].tolist()
-        
-        # Create news record
-        news = News(
-            title=title,
-            content=resolved_text,
-            cleaned_content=cleaned_text,
-            prediction=label,
-            confidence=confidence,
-            source_type=source_type,
-            original_source=original_input if source_type == 'url' else None,
-            user_id=current_user.id if current_user.is_authenticated else None,
-            word_count=text_analysis.get('word_count', 0),
-            vocabulary_diversity=text_analysis.get('vocabulary_diversity', 0.0),
-            readability_score=text_analysis.get('readability_score', 0.0),
-            formal_indicators=text_analysis.get('formal_indicators', 0),
-            credibility_indicators=text_analysis.get('credibility_indicators', 0),
-            emotional_indicators=text_analysis.get('emotional_indicators', 0),
-            content_vector=json.dumps(vector_json)
-        )
-        
-        db.session.add(news)
-        db.session.commit()
+        persist_news([news])
+        index_stored_news(news, analysis)
         
         return news.id
         
@@ -670,49 +1374,139 @@ def store_analyzed_news(original_input, resolved_text, cleaned_text, label, conf
         print(f"Error storing news: {e}")
         return None
 
-def find_related_news(cleaned_text, current_news_id, limit=5):
+# Near-duplicate (SimHash) index: fingerprints within 3 bits count as the same story, and ones
+# within NEAR_DUPLICATE_MAX_DISTANCE bits too if their shingle sets are at least
+# NEAR_DUPLICATE_MIN_SIMILARITY alike; texts shorter than NEAR_DUPLICATE_MIN_TOKENS only match exactly.
+simhash_index = SimHashIndex(max_distance=int(os.environ.get('NEAR_DUPLICATE_MAX_DISTANCE', 15)),
+                             min_similarity=float(os.environ.get('NEAR_DUPLICATE_MIN_SIMILARITY', 0.6)))
+NEAR_DUPLICATE_MIN_TOKENS = int(os.environ.get('NEAR_DUPLICATE_MIN_TOKENS', 20))
+
+def _load_indexable_news(watermark, vocabulary_version, batch_size=1000):
+    """Yield (commit_seq, news_id, vector) for articles vectorized with this vocabulary and committed after the watermark"""
+    rows = (db.session.query(News.commit_seq, News.id, News.content_vector_sparse, News.content_vector)
+            .filter(News.commit_seq > watermark, News.vocabulary_version == vocabulary_version)
+            .order_by(News.commit_seq)
+            .yield_per(batch_size))
+    for commit_seq, news_id, sparse_blob, legacy_json in rows:
+        try:
+            yield commit_seq, news_id, load_stored_vector(sparse_blob, legacy_json)
+        except Exception:
+            yield commit_seq, news_id, None
+
+def sync_related_index():
+    """Build the related-news index on first use and pick up rows written by other workers"""
+    artifacts = current_model()
+    artifacts.related_index.sync(functools.partial(_load_indexable_news, vocabulary_version=artifacts.vocabulary_version))
+
+def utc_timestamp(naive_utc):
+    """POSIX timestamp of a naive UTC datetime as stored in the database"""
+    return naive_utc.replace(tzinfo=timezone.utc).timestamp()
+
+def _load_cluster_rows(watermark, vocabulary_version, max_window, batch_size=1000):
+    """Yield (commit_seq, news_id, (vector, timestamp, label, title)) for recent articles vectorized with this
+    vocabulary and committed after the watermark"""
+    # Older articles can no longer count toward any trending window
+    cutoff = datetime.utcnow() - timedelta(seconds=max_window)
+    rows = (db.session.query(News.commit_seq, News.id, News.content_vector_sparse, News.content_vector,
+                             News.analyzed_at, News.prediction, News.title)
+            .filter(News.commit_seq > watermark, News.vocabulary_version == vocabulary_version,
+                    News.analyzed_at >= cutoff)
+            .order_by(News.commit_seq)
+            .yield_per(batch_size))
+    for commit_seq, news_id, sparse_blob, legacy_json, analyzed_at, prediction, title in rows:
+        try:
+            vector = load_stored_vector(sparse_blob, legacy_json)
+        except Exception:
+            vector = None
+        yield commit_seq, news_id, (vector, utc_timestamp(analyzed_at), prediction, title) if vector is not None else None
+
+def _load_cluster_events(watermark, vocabulary_version, max_window, batch_size=1000):
+    """Yield (commit_seq, event_id, (news_id, vector, timestamp, label, title)) for recent repeat submissions of
+    articles vectorized with this vocabulary, committed after the watermark"""
+    cutoff = datetime.utcnow() - timedelta(seconds=max_window)
+    rows = (db.session.query(NewsEvent.commit_seq, NewsEvent.id, NewsEvent.submitted_at, News.id,
+                             News.content_vector_sparse, News.content_vector, News.prediction, News.title)
+            .join(News, News.id == NewsEvent.news_id)
+            .filter(NewsEvent.commit_seq > watermark, News.vocabulary_version == vocabulary_version,
+                    NewsEvent.submitted_at >= cutoff)
+            .order_by(NewsEvent.commit_seq)
+            .yield_per(batch_size))
+    for commit_seq, event_id, submitted_at, news_id, sparse_blob, legacy_json, prediction, title in rows:
+        try:
+            vector = load_stored_vector(sparse_blob, legacy_json)
+        except Exception:
+            vector = None
+        yield commit_seq, event_id, (news_id, vector, utc_timestamp(submitted_at), prediction, title) if vector is not None else None
+
+def sync_story_clusters():
+    """Pick up recent articles and repeat submissions written by other workers into this process's story clusters"""
+    artifacts = current_model()
+    story_clusters = artifacts.story_clusters
+    story_clusters.sync(functools.partial(_load_cluster_rows, vocabulary_version=artifacts.vocabulary_version,
+                                          max_window=story_clusters.max_window))
+    story_clusters.sync_events(functools.partial(_load_cluster_events, vocabulary_version=artifacts.vocabulary_version,
+                                                 max_window=story_clusters.max_window))
+
+def _rescore_candidates(vector, news_by_id):
+    """Exact cosine similarity between a vector and candidate articles, best first"""
+    query = vector.toarray().reshape(-1)
+    query_norm = np.linalg.norm(query)
+    scored = []
+    for news_id, news in news_by_id.items():
+        try:
+            stored = load_stored_vector(news.content_vector_sparse, news.content_vector)
+        except Exception:
+            continue
+        if stored is None or query_norm == 0:
+            continue
+        stored_norm = np.sqrt(stored.multiply(stored).sum())
+        if stored_norm == 0:
+            continue
+        similarity = float(stored.dot(query)[0]) / (query_norm * stored_norm)
+        scored.append((news_id, similarity))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+def find_related_news(analysis, current_news_id, limit=5):
     """Find related news articles based on content similarity"""
     try:
-        # Get current article's vector
-        current_vector = vectorizer.transform([cleaned_text])
-        
-        # Get all previously stored news
-        existing_news = News.query.filter(News.id != current_news_id).all()
+        sync_related_index()
+        related_index = analysis.artifacts.related_index
         
-        if not existing_news:
+        if related_index.approximate:
+            # Over-fetch LSH candidates, then re-score them exactly from their stored vectors
+            matches = related_index.query(analysis.vector, limit=limit * 4, exclude_id=current_news_id)
+        else:
+            # Only articles sharing terms with this one are scored
+            matches = related_index.query(analysis.vector, limit=limit, exclude_id=current_news_id,
+                                          min_similarity=0.1)  # Only include if similarity > 10%
+        if not matches:
             return []
+        if write_behind is not None:
+            write_behind.wait_for_news([news_id for news_id, _ in matches])
         
-        similarities = []
-        for news in existing_news:
-            try:
-                # Parse stored vector
-                stored_vector = json.loads(news.content_vector)
-                stored_vector = np.array(stored_vector).reshape(1, -1)
-                
-                # Calculate cosine similarity
-                similarity = cosine_similarity(current_vector, stored_vector)[0][0]
-                similarities.append((news, similarity))
-            except Exception:
-                continue
+        news_by_id = {news.id: news for news in News.query.filter(News.id.in_([news_id for news_id, _ in matches])).all()}
         
-        # Sort by similarity and get top matches
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        top_matches = similarities[:limit]
+        if related_index.approximate:
+            matches = _rescore_candidates(analysis.vector, news_by_id)
+            matches = [(news_id, similarity) for news_id, similarity in matches if similarity > 0.1][:limit]
         
         # Format related news data
         related_news = []
-        for news, similarity in top_matches:
-            if similarity > 0.1:  # Only include if similarity > 10%
-                related_news.append({
-                    'id': news.id,
-                    'title': news.title,
-                    'prediction': news.prediction,
-                    'confidence': round(news.confidence * 100, 2),
-                    'analyzed_at': news.analyzed_at.isoformat(),
-                    'similarity': round(similarity * 100, 1),
-                    'word_count': news.word_count,
-                    'readability_score': news.readability_score
-                })
+        for news_id, similarity in matches:
+            news = news_by_id.get(news_id)
+            if news is None:
+                continue
+            related_news.append({
+                'id': news.id,
+                'title': news.title,
+                'prediction': news.prediction,
+                'confidence': round(news.confidence * 100, 2),
+                'analyzed_at': news.analyzed_at.isoformat(),
+                'similarity': round(similarity * 100, 1),
+                'word_count': news.word_count,
+                'readability_score': news.readability_score
+            })
         
         return related_news
         
@@ -725,37 +1519,34 @@ def find_related_news(cleaned_text, current_news_id, limit=5):
 @app.route('/news/history', methods=['GET'])
 @login_required
 def get_user_news_history():
-    """Get user's news analysis history"""
+    """Get user's news analysis history.
+    Offset mode: ?page=N&per_page=M (with total counts).
+    Keyset mode: ?after=<analyzed_at,id> (empty for the first page), total only with include_total=1.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+        wait_for_user_writes()
         
-        # Get user's news articles with pagination
-        news_query = News.query.filter_by(user_id=current_user.id).order_by(News.analyzed_at.desc())
-        pagination = news_query.paginate(page=page, per_page=per_page, error_out=False)
+        if 'after' in request.args:
+            return _news_history_page_after(request.args.get('after', ''), per_page)
         
-        news_list = []
-        for news in pagination.items:
-            news_list.append({
-                'id': news.id,
-                'title': news.title,
-                'prediction': news.prediction,
-                'confidence': round(news.confidence * 100, 2),
-                'analyzed_at': news.analyzed_at.isoformat(),
-                'source_type': news.source_type,
-                'word_count': news.word_count,
-                'readability_score': news.readability_score
-            })
+        history = _user_history(current_user.id, limit=page * per_page)
+        rows = (db.session.query(history.c.news_id, history.c.analyzed_at)
+                .order_by(history.c.analyzed_at.desc(), history.c.news_id.desc())
+                .offset((page - 1) * per_page).limit(per_page).all())
+        total = _user_history_total(current_user.id)
+        pages = (total + per_page - 1) // per_page
         
         return jsonify({
-            'news': news_list,
+            'news': _history_items(rows),
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
+                'total': total,
+                'pages': pages,
+                'has_next': page < pages,
+                'has_prev': page > 1
             }
         })
         
@@ -763,10 +1554,86 @@ def get_user_news_history():
         print(f"Error getting news history: {e}")
         return jsonify({'error': 'Failed to retrieve history'}), 500
 
+def _user_history(user_id, after=None, limit=None):
+    """Subquery of (news_id, analyzed_at) for everything a user analyzed, newest first:
+    articles they stored plus earlier articles their submissions reused (NewsEvent).
+    Each side is filtered by the keyset cursor and limited on its own index before merging."""
+    branches = []
+    for news_id, analyzed_at, user_column in ((News.id, News.analyzed_at, News.user_id),
+                                              (NewsEvent.news_id, NewsEvent.submitted_at, NewsEvent.user_id)):
+        branch = select(news_id.label('news_id'), analyzed_at.label('analyzed_at')).where(user_column == user_id)
+        if after is not None:
+            after_time, after_id = after
+            branch = branch.where(or_(analyzed_at < after_time,
+                                      and_(analyzed_at == after_time, news_id < after_id)))
+        if limit is not None:
+            branch = branch.order_by(analyzed_at.desc(), news_id.desc()).limit(limit)
+        # Wrapped so the ORDER BY / LIMIT stays inside the branch (SQLite rejects it on compound members)
+        inner = branch.subquery()
+        branches.append(select(inner.c.news_id, inner.c.analyzed_at))
+    return union_all(*branches).subquery()
+
+def _user_history_total(user_id):
+    return (News.query.filter_by(user_id=user_id).count() +
+            NewsEvent.query.filter_by(user_id=user_id).count())
+
+def _history_items(rows):
+    """History entries for (news_id, analyzed_at) rows, loading the articles in one query"""
+    news_by_id = {news.id: news for news in News.query.filter(News.id.in_({row.news_id for row in rows})).all()}
+    items = []
+    for row in rows:
+        news = news_by_id.get(row.news_id)
+        if news is None:
+            continue
+        items.append({
+            'id': news.id,
+            'title': news.title,
+            'prediction': news.prediction,
+            'confidence': round(news.confidence * 100, 2),
+            'analyzed_at': row.analyzed_at.isoformat(),
+            'source_type': news.source_type,
+            'word_count': news.word_count,
+            'readability_score': news.readability_score
+        })
+    return items
+
+def _news_history_page_after(after, per_page):
+    """Keyset page of history: rows strictly after the (analyzed_at, id) cursor, no OFFSET scan"""
+    cursor = None
+    if after:
+        try:
+            after_time, after_id = after.rsplit(',', 1)
+            cursor = (datetime.fromisoformat(after_time), int(after_id))
+        except ValueError:
+            return jsonify({'error': 'after must be "<analyzed_at>,<id>"'}), 400
+    
+    # One extra row tells whether another page exists without counting
+    history = _user_history(current_user.id, after=cursor, limit=per_page + 1)
+    rows = (db.session.query(history.c.news_id, history.c.analyzed_at)
+            .order_by(history.c.analyzed_at.desc(), history.c.news_id.desc())
+            .limit(per_page + 1).all())
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    pagination = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'has_prev': bool(after),
+        'next_cursor': f"{rows[-1].analyzed_at.isoformat()},{rows[-1].news_id}" if has_next else None
+    }
+    if request.args.get('include_total', '0').lower() in ('1', 'true', 'yes'):
+        pagination['total'] = _user_history_total(current_user.id)
+    
+    return jsonify({
+        'news': _history_items(rows),
+        'pagination': pagination
+    })
+
 @app.route('/news/<int:news_id>', methods=['GET'])
 def get_news_details(news_id):
     """Get detailed information about a specific news article"""
     try:
+        if write_behind is not None:
+            write_behind.wait_for_news([news_id])
         news = News.query.get_or_404(news_id)
         
         # Get related news
@@ -810,45 +1677,29 @@ def get_news_details(news_id):
 
 
 
-def get_model_interpretability(X, cleaned_text, label, confidence):
+def get_model_interpretability(analysis, label, confidence):
     """Extract model interpretability information"""
     try:
-        # Get feature importance scores
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Handle different model types
-        feature_importance = None
-        if hasattr(model, 'coef_'):
-            # Linear models (Logistic Regression, SVM, etc.)
-            feature_importance = model.coef_[0]
-        elif hasattr(model, 'feature_log_prob_'):
-            # Naive Bayes models
-            # Use the difference between log probabilities of classes
-            if len(model.classes_) == 2:
-                # For binary classification, use the difference between fake and real class probabilities
-                fake_class_idx = 1 if 1 in model.classes_ else 0
-                real_class_idx = 0 if fake_class_idx == 1 else 1
-                feature_importance = model.feature_log_prob_[fake_class_idx] - model.feature_log_prob_[real_class_idx]
-            else:
-                feature_importance = model.feature_log_prob_[0]  # Use first class as reference
-        
+        X = analysis.vector
+        cleaned_text = analysis.cleaned_text
+
         # Get top contributing words for the prediction
         top_features = []
+        feature_importance = analysis.artifacts.feature_importance
         if feature_importance is not None and len(feature_importance) > 0:
-            # Get the indices of non-zero features in the input text
-            input_features = X.toarray()[0]
-            non_zero_indices = [i for i, val in enumerate(input_features) if val > 0]
+            # Only the non-zero entries of the sparse row are touched
+            row = X.tocsr()
+            keep = (row.data > 0) & (row.indices < len(feature_importance))
+            indices = row.indices[keep]
+            values = row.data[keep].astype(np.float64)
+            scores = values * feature_importance[indices]
             
-            # Calculate contribution scores for these features
-            feature_scores = []
-            for idx in non_zero_indices:
-                if idx < len(feature_importance):
-                    score = input_features[idx] * feature_importance[idx]
-                    feature_scores.append((feature_names[idx], score, input_features[idx]))
-            
-            # Sort by absolute contribution score
-            feature_scores.sort(key=lambda x: abs(x[1]), reverse=True)
-            top_features = feature_scores[:10]  # Top 10 contributing features
+            # Top 10 by absolute contribution score
+            order = np.arange(len(indices))
+            if len(order) > 10:
+                order = np.argpartition(-np.abs(scores), 9)[:10]
+            order = order[np.lexsort((indices[order], -np.abs(scores[order])))]
+            top_features = [(str(analysis.artifacts.feature_names[indices[i]]), float(scores[i]), float(values[i])) for i in order]
         else:
             # Fallback: show most frequent words in the input
             words = cleaned_text.split()
@@ -862,7 +1713,7 @@ def get_model_interpretability(X, cleaned_text, label, confidence):
             top_features = [(word, 0.0, freq) for word, freq in sorted_words[:10]]
         
         # Analyze text characteristics
-        text_analysis = analyze_text_characteristics(cleaned_text, label)
+        text_analysis = analysis.text_stats
         
         # Get confidence breakdown
         confidence_breakdown = get_confidence_breakdown(confidence, label)
@@ -883,62 +1734,44 @@ def get_model_interpretability(X, cleaned_text, label, confidence):
             'model_reasoning': "Unable to provide detailed analysis at this time."
         }
 
-def analyze_text_characteristics(text, label):
+def analyze_text_characteristics(text, label=None):
     """Analyze text characteristics that might indicate real vs fake news"""
-    words = text.split()
+    # Word, syllable and sentence counts from one scan over the words
+    stats = text_statistics(text)
+    word_count = stats['word_count']
     
     # Calculate readability score (Flesch Reading Ease approximation)
-    sentences = text.split('.') + text.split('!') + text.split('?')
-    sentences = [s.strip() for s in sentences if s.strip()]
-    avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
-    
-    # Calculate average syllables per word (approximation)
-    def count_syllables(word):
-        word = word.lower()
-        count = 0
-        vowels = "aeiouy"
-        on_vowel = False
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not on_vowel:
-                count += 1
-            on_vowel = is_vowel
-        return max(count, 1)
-    
-    avg_syllables = sum(count_syllables(word) for word in words) / len(words) if words else 0
+    sentence_count = stats['sentence_count']
+    avg_sentence_length = stats['sentence_words'] / sentence_count if sentence_count else 0
+    avg_syllables = stats['syllables'] / word_count if word_count else 0
     
     # Flesch Reading Ease approximation
     flesch_score = 206.835 - (1.015 * avg_sentence_length) - (84.6 * avg_syllables)
     flesch_score = max(0, min(100, flesch_score))
     
+    # All keyword lexicons are counted in one pass
+    indicators = get_default_matcher().count(text)['text_analysis']
+    
     analysis = {
-        'word_count': len(words),
-        'avg_word_length': sum(len(word) for word in words) / len(words) if words else 0,
-        'unique_words': len(set(words)),
-        'vocabulary_diversity': len(set(words)) / len(words) if words else 0,
+        'word_count': word_count,
+        'avg_word_length': stats['total_word_length'] / word_count if word_count else 0,
+        'unique_words': stats['unique_words'],
+        'vocabulary_diversity': stats['unique_words'] / word_count if word_count else 0,
         'has_quotes': '"' in text or "'" in text,
-        'has_numbers': any(char.isdigit() for char in text),
-        'has_urls': 'http' in text.lower() or 'www' in text.lower(),
-        'sentence_count': len(sentences),
+        'has_numbers': stats['has_numbers'],
+        'has_urls': _URL_HINT_RE.search(text) is not None,
+        'sentence_count': sentence_count,
         'avg_sentence_length': round(avg_sentence_length, 1),
         'readability_score': round(flesch_score, 1),
         'readability_level': get_readability_level(flesch_score),
-        'formal_indicators': count_formal_indicators(text),
-        'credibility_indicators': count_credibility_indicators(text),
-        'emotional_indicators': count_emotional_indicators(text)
+        'formal_indicators': indicators['formal'],
+        'credibility_indicators': indicators['credibility'],
+        'emotional_indicators': indicators['emotional']
     }
     
     return analysis
 
-def count_formal_indicators(text):
-    """Count indicators of formal, professional writing"""
-    formal_words = ['according', 'research', 'study', 'official', 'government', 'authority', 'expert', 'analysis', 'report', 'data']
-    return sum(1 for word in formal_words if word in text.lower())
-
-def count_credibility_indicators(text):
-    """Count indicators of credible, factual reporting"""
-    credibility_words = ['source', 'verified', 'confirmed', 'official', 'statement', 'announcement', 'press', 'release', 'document', 'evidence']
-    return sum(1 for word in credibility_words if word in text.lower())
+_URL_HINT_RE = re.compile(r'http|www', re.IGNORECASE)
 
 def get_confidence_breakdown(confidence, label):
     """Break down confidence into interpretable components"""
@@ -991,11 +1824,6 @@ def get_readability_level(score):
     else:
         return "Very Difficult"
 
-def count_emotional_indicators(text):
-    """Count emotional or sensational language indicators"""
-    emotional_words = ['amazing', 'shocking', 'incredible', 'unbelievable', 'stunning', 'outrageous', 'scandalous', 'explosive', 'breaking', 'urgent', 'warning', 'alert', 'danger', 'threat', 'panic', 'fear', 'hate', 'love', 'hate', 'terrible', 'wonderful', 'fantastic', 'horrible']
-    return sum(1 for word in emotional_words if word in text.lower())
-
 # ------------------------------
 # Source verification utilities
 # ------------------------------
@@ -1048,125 +1876,192 @@ def _strip_html(text: str) -> str:
     except Exception:
         return text or ''
 
-def _search_bing_news(query: str, limit: int = 5):
+# Search results keyed by engine, site filter and query; optionally shared by all workers via SQLite
+evidence_cache = EvidenceCache(
+    ttl_seconds=int(os.environ.get('EVIDENCE_CACHE_TTL', 600)),
+    stale_seconds=int(os.environ.get('EVIDENCE_CACHE_STALE', 3600)),
+    path=os.environ.get('EVIDENCE_CACHE_PATH', os.path.join(os.path.dirname(__file__), 'cache', 'evidence.sqlite3')) or None
+)
+
+def _fetch_bing_news(query: str, limit: int):
     """Query Bing News RSS (no API key) and parse results."""
+    rss_url = f"https://www.bing.com/news/search?q={quote_plus(query)}&format=rss"
+    resp = http_client.get(rss_url, engine='bing_news', timeout=8)
+    resp.raise_for_status()
+    root = ET.fromstring(resp.content)
+    # RSS structure: rss/channel/item
+    items = []
+    for item in root.findall('.//item'):
+        title = item.findtext('title') or ''
+        link = item.findtext('link') or ''
+        description = item.findtext('description') or ''
+        pub_date = item.findtext('pubDate') or ''
+        domain = _domain_from_url(link)
+        items.append({
+            'title': _strip_html(title),
+            'url': link,
+            'snippet': _strip_html(description),
+            'published_at': pub_date,
+            'source': domain,
+            'credibility': round(_credibility_score(domain), 2)
+        })
+        if len(items) >= limit:
+            break
+    # Sort primarily by credibility, secondarily keep order
+    items.sort(key=lambda x: x['credibility'], reverse=True)
+    return items
+
+def _search_bing_news(query: str, limit: int = 5, raise_errors: bool = False):
+    """Cached _fetch_bing_news; errors are logged and yield no results unless raise_errors is set."""
     try:
-        if requests is None:
+        if http_client is None:
             return []
-        rss_url = f"https://www.bing.com/news/search?q={quote_plus(query)}&format=rss"
-        resp = requests.get(rss_url, timeout=8)
-        resp.raise_for_status()
-        root = ET.fromstring(resp.content)
-        # RSS structure: rss/channel/item
-        items = []
-        for item in root.findall('.//item'):
-            title = item.findtext('title') or ''
-            link = item.findtext('link') or ''
-            description = item.findtext('description') or ''
-            pub_date = item.findtext('pubDate') or ''
-            domain = _domain_from_url(link)
-            items.append({
-                'title': _strip_html(title),
-                'url': link,
-                'snippet': _strip_html(description),
-                'published_at': pub_date,
-                'source': domain,
-                'credibility': round(_credibility_score(domain), 2)
-            })
-            if len(items) >= limit:
-                break
-        # Sort primarily by credibility, secondarily keep order
-        items.sort(key=lambda x: x['credibility'], reverse=True)
-        return items
+        key = EvidenceCache.make_key('bing_news', None, query, limit)
+        return evidence_cache.get_or_fetch(key, functools.partial(_fetch_bing_news, query, limit))
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error in _search_bing_news: {e}")
         return []
 
-def _search_bing_web(query: str, site_filter: str = None, limit: int = 5):
+def _fetch_bing_web(query: str, site_filter: str, limit: int):
     """Query Bing Web RSS with optional site filter: site:gov, site:snopes.com, etc."""
+    q = f"{query}"
+    if site_filter:
+        q = f"site:{site_filter} {query}" if not site_filter.startswith('site:') else f"{site_filter} {query}"
+    rss_url = f"https://www.bing.com/search?q={quote_plus(q)}&format=rss"
+    resp = http_client.get(rss_url, engine='bing_web', timeout=8)
+    resp.raise_for_status()
+    root = ET.fromstring(resp.content)
+    items = []
+    for item in root.findall('.//item'):
+        title = item.findtext('title') or ''
+        link = item.findtext('link') or ''
+        description = item.findtext('description') or ''
+        pub_date = item.findtext('pubDate') or ''
+        domain = _domain_from_url(link)
+        items.append({
+            'title': _strip_html(title),
+            'url': link,
+            'snippet': _strip_html(description),
+            'published_at': pub_date,
+            'source': domain,
+            'credibility': round(_credibility_score(domain), 2)
+        })
+        if len(items) >= limit:
+            break
+    return items
+
+def _search_bing_web(query: str, site_filter: str = None, limit: int = 5, raise_errors: bool = False):
+    """Cached _fetch_bing_web; errors are logged and yield no results unless raise_errors is set."""
     try:
-        if requests is None:
+        if http_client is None:
             return []
-        q = f"{query}"
-        if site_filter:
-            q = f"site:{site_filter} {query}" if not site_filter.startswith('site:') else f"{site_filter} {query}"
-        rss_url = f"https://www.bing.com/search?q={quote_plus(q)}&format=rss"
-        resp = requests.get(rss_url, timeout=8)
-        resp.raise_for_status()
-        root = ET.fromstring(resp.content)
-        items = []
-        for item in root.findall('.//item'):
-            title = item.findtext('title') or ''
-            link = item.findtext('link') or ''
-            description = item.findtext('description') or ''
-            pub_date = item.findtext('pubDate') or ''
-            domain = _domain_from_url(link)
-            items.append({
-                'title': _strip_html(title),
-                'url': link,
-                'snippet': _strip_html(description),
-                'published_at': pub_date,
-                'source': domain,
-                'credibility': round(_credibility_score(domain), 2)
-            })
-            if len(items) >= limit:
-                break
-        return items
+        key = EvidenceCache.make_key('bing_web', site_filter, query, limit)
+        return evidence_cache.get_or_fetch(key, functools.partial(_fetch_bing_web, query, site_filter, limit))
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error in _search_bing_web: {e}")
         return []
 
-def _search_crossref(query: str, limit: int = 5):
+def _fetch_crossref(query: str, limit: int):
     """Query CrossRef works API for scholarly references."""
+    url = f"https://api.crossref.org/works?query={quote_plus(query)}&rows={limit}"
+    resp = http_client.get(url, engine='crossref', timeout=8, headers={'User-Agent': 'FakeNewsDetection/1.0 (mailto:example@example.com)'})
+    resp.raise_for_status()
+    data = resp.json()
+    items = []
+    for it in data.get('message', {}).get('items', []):
+        title = ' '.join(it.get('title', [])).strip() or it.get('container-title', [''])[0]
+        link = ''
+        for l in it.get('link', []):
+            if l.get('URL'):
+                link = l['URL']
+                break
+        if not link and it.get('URL'):
+            link = it['URL']
+        snippet = (it.get('abstract') or '').replace('\n', ' ').strip()
+        pub = it.get('created', {}).get('date-time') or it.get('issued', {}).get('date-parts', [[None]])[0][0]
+        domain = _domain_from_url(link) or 'crossref'
+        items.append({
+            'title': _strip_html(title),
+            'url': link,
+            'snippet': _strip_html(snippet)[:300],
+            'published_at': str(pub) if pub else '',
+            'source': domain,
+            'credibility': 0.85  # scholarly default
+        })
+    return items[:limit]
+
+def _search_crossref(query: str, limit: int = 5, raise_errors: bool = False):
+    """Cached _fetch_crossref; errors are logged and yield no results unless raise_errors is set."""
+    try:
+        if http_client is None:
+            return []
+        key = EvidenceCache.make_key('crossref', None, query, limit)
+        return evidence_cache.get_or_fetch(key, functools.partial(_fetch_crossref, query, limit))
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"Error in _search_crossref: {e}")
+        return []
+
+# Offline BM25 index over ingested fact-checks/reference articles (built with local_evidence.py)
+try:
+    local_evidence_index = LocalEvidenceIndex.load(
+        os.environ.get('LOCAL_EVIDENCE_DIR', os.path.join(os.path.dirname(__file__), 'evidence_index'))
+    )
+except Exception as e:
+    print(f"⚠️ Local evidence index not loaded: {e}")
+    local_evidence_index = None
+
+def _search_local_evidence(query: str, limit: int = 5, raise_errors: bool = False):
+    """Query the offline evidence index; needs no network access."""
     try:
-        if requests is None:
+        if local_evidence_index is None:
             return []
-        url = f"https://api.crossref.org/works?query={quote_plus(query)}&rows={limit}"
-        resp = requests.get(url, timeout=8, headers={'User-Agent': 'FakeNewsDetection/1.0 (mailto:example@example.com)'})
-        resp.raise_for_status()
-        data = resp.json()
         items = []
-        for it in data.get('message', {}).get('items', []):
-            title = ' '.join(it.get('title', [])).strip() or it.get('container-title', [''])[0]
-            link = ''
-            for l in it.get('link', []):
-                if l.get('URL'):
-                    link = l['URL']
-                    break
-            if not link and it.get('URL'):
-                link = it['URL']
-            snippet = (it.get('abstract') or '').replace('\n', ' ').strip()
-            pub = it.get('created', {}).get('date-time') or it.get('issued', {}).get('date-parts', [[None]])[0][0]
-            domain = _domain_from_url(link) or 'crossref'
+        for doc in local_evidence_index.search(query, limit=limit):
+            domain = doc.get('source') or _domain_from_url(doc.get('url', ''))
+            credibility = doc.get('credibility')
             items.append({
-                'title': _strip_html(title),
-                'url': link,
-                'snippet': _strip_html(snippet)[:300],
-                'published_at': str(pub) if pub else '',
+                'title': doc.get('title', ''),
+                'url': doc.get('url', ''),
+                'snippet': doc.get('snippet', ''),
+                'published_at': doc.get('published_at', ''),
                 'source': domain,
-                'credibility': 0.85  # scholarly default
+                'credibility': round(float(credibility), 2) if credibility is not None else round(_credibility_score(domain), 2),
+                'bm25_score': doc['score']
             })
-        return items[:limit]
+        return items
     except Exception as e:
-        print(f"Error in _search_crossref: {e}")
+        if raise_errors:
+            raise
+        print(f"Error in _search_local_evidence: {e}")
         return []
 
-def _hybrid_rerank(query_text: str, items: list):
-    """Simple TF-IDF cosine re-ranking combined with credibility."""
-    try:
-        if not items:
-            return []
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity as _cos
-        corpus = [f"{it.get('title','')} {it.get('snippet','')}" for it in items]
-        vec = TfidfVectorizer(min_df=1, max_features=5000)
-        X = vec.fit_transform(corpus + [query_text])
-        q_vec = X[-1]
-        D = X[:-1]
-        sims = _cos(D, q_vec).reshape(-1)
+def _hybrid_rerank_batch(candidate_lists):
+    """Re-rank several (query_text, items) lists in one pass.
+
+    Similarity is TF-IDF cosine with the model's tokenization and IDF
+    statistics fixed at model load (see term_weights.py), so nothing is
+    fitted per request and terms outside the production vocabulary still
+    count. Every candidate of the batch is scored in one sparse product.
+    """
+    queries = [query_text for query_text, _ in candidate_lists]
+    documents = [f"{it.get('title','')} {it.get('snippet','')}" for _, items in candidate_lists for it in items]
+    owners = [position for position, (_, items) in enumerate(candidate_lists) for _ in items]
+    similarities = []
+    if documents:
+        matrix = current_model().rerank_weights.transform(queries + documents)
+        query_rows, document_rows = matrix[:len(queries)], matrix[len(queries):]
+        similarities = np.asarray(document_rows.multiply(query_rows[owners]).sum(axis=1)).ravel().tolist()
+    ranked_lists = []
+    offset = 0
+    for _, items in candidate_lists:
         ranked = []
-        for idx, it in enumerate(items):
-            sim = float(sims[idx]) if idx < len(sims) else 0.0
+        for it, sim in zip(items, similarities[offset:offset + len(items)]):
             cred = float(it.get('credibility', 0.5))
             # Hybrid score: 70% semantic similarity, 30% credibility
             score = 0.7 * sim + 0.3 * cred
@@ -1175,12 +2070,88 @@ def _hybrid_rerank(query_text: str, items: list):
             enriched['hybrid_score'] = round(score, 3)
             ranked.append(enriched)
         ranked.sort(key=lambda x: x['hybrid_score'], reverse=True)
-        return ranked
+        ranked_lists.append(ranked)
+        offset += len(items)
+    return ranked_lists
+
+def _hybrid_rerank(query_text: str, items: list):
+    """TF-IDF cosine re-ranking against fixed IDF statistics, combined with credibility."""
+    try:
+        if not items:
+            return []
+        return _hybrid_rerank_batch([(query_text, items)])[0]
     except Exception as e:
         print(f"Error in _hybrid_rerank: {e}")
         # Fallback to credibility sort
         return sorted(items, key=lambda x: x.get('credibility', 0.5), reverse=True)
 
+# Fact-check sites queried by /verify/hybrid
+_FACT_CHECK_SITES = ['politifact.com', 'snopes.com', 'factcheck.org', 'fullfact.org', 'afp.com', 'reuters.com/fact-check']
+
+# Worker threads for outbound evidence queries, shared by all requests in this process
+_evidence_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('VERIFY_MAX_WORKERS', 16)),
+                                        thread_name_prefix='evidence')
+VERIFY_DEADLINE_SECONDS = float(os.environ.get('VERIFY_DEADLINE_SECONDS', 10))
+
+def _hybrid_engine_tasks(query: str):
+    """(engine, source_type, callable) for every upstream query made by /verify/hybrid"""
+    tasks = [
+        ('news', 'news', functools.partial(_search_bing_news, query, limit=6, raise_errors=True)),
+        # Government sources
+        ('gov', 'gov', functools.partial(_search_bing_web, query, site_filter='gov', limit=5, raise_errors=True)),
+    ]
+    # Fact-check sources (aggregate)
+    for site in _FACT_CHECK_SITES:
+        tasks.append((f'fact_check:{site}', 'fact_check',
+                      functools.partial(_search_bing_web, query, site_filter=site, limit=2, raise_errors=True)))
+    # Scholarly via CrossRef
+    tasks.append(('scholarly', 'scholarly', functools.partial(_search_crossref, query, limit=5, raise_errors=True)))
+    # Offline archive of previously ingested fact-checks and references
+    if local_evidence_index is not None:
+        tasks.append(('local', 'local', functools.partial(_search_local_evidence, query, limit=5, raise_errors=True)))
+    return tasks
+
+def _timed_call(fn):
+    started = time.monotonic()
+    items = fn()
+    return items, round((time.monotonic() - started) * 1000)
+
+def _iter_engine_results(tasks, deadline_seconds):
+    """Run engine queries concurrently and yield (engine, source_type, items, status) as each finishes.
+
+    Engines still running when the deadline passes are reported with a 'timeout' status.
+    """
+    futures = {_evidence_executor.submit(_timed_call, fn): (engine, source_type) for engine, source_type, fn in tasks}
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline_seconds):
+            pending.discard(future)
+            engine, source_type = futures[future]
+            try:
+                items, elapsed_ms = future.result()
+                items = [dict(it, source_type=source_type) for it in items]
+                yield engine, source_type, items, {'status': 'ok', 'count': len(items), 'elapsed_ms': elapsed_ms}
+            except Exception as e:
+                print(f"Error in engine {engine}: {e}")
+                yield engine, source_type, [], {'status': 'error', 'error': str(e)}
+    except FuturesTimeoutError:
+        pass
+    for future in pending:
+        future.cancel()
+        engine, source_type = futures[future]
+        yield engine, source_type, [], {'status': 'timeout'}
+
+def _group_hybrid_items(tasks, items_by_engine):
+    """Group engine results by source type, in engine order so output does not depend on completion order"""
+    grouped = {'news': [], 'gov': [], 'fact_check': [], 'scholarly': [], 'local': []}
+    for engine, source_type, _ in tasks:
+        grouped[source_type].extend(items_by_engine.get(engine, []))
+    return grouped
+
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/verify/hybrid', methods=['POST'])
 @rate_limit(max_requests=15, window_seconds=60)
 def verify_with_sources_hybrid():
@@ -1191,43 +2162,72 @@ def verify_with_sources_hybrid():
         if not text or not isinstance(text, str):
             return jsonify({'error': 'Missing news text or URL'}), 400
         query = _extract_core_query(text)
-        # Fetch candidates from multiple verticals
-        news = _search_bing_news(query, limit=6)
-        # Government sources
-        gov = _search_bing_web(query, site_filter='gov', limit=5)
-        # Fact-check sources (aggregate)
-        fc_sites = ['politifact.com', 'snopes.com', 'factcheck.org', 'fullfact.org', 'afp.com', 'reuters.com/fact-check']
-        fact_checks = []
-        for s in fc_sites:
-            fact_checks.extend(_search_bing_web(query, site_filter=s, limit=2))
-        # Scholarly via CrossRef
-        scholarly = _search_crossref(query, limit=5)
-        # Tag source_type
-        for it in news:
-            it['source_type'] = 'news'
-        for it in gov:
-            it['source_type'] = 'gov'
-        for it in fact_checks:
-            it['source_type'] = 'fact_check'
-        for it in scholarly:
-            it['source_type'] = 'scholarly'
-        all_items = news + gov + fact_checks + scholarly
+        # Fetch candidates from all verticals concurrently under one deadline
+        tasks = _hybrid_engine_tasks(query)
+        items_by_engine = {}
+        engines = {}
+        for engine, source_type, items, status in _iter_engine_results(tasks, VERIFY_DEADLINE_SECONDS):
+            items_by_engine[engine] = items
+            engines[engine] = status
+        grouped = _group_hybrid_items(tasks, items_by_engine)
+        all_items = grouped['news'] + grouped['gov'] + grouped['fact_check'] + grouped['scholarly'] + grouped['local']
         ranked = _hybrid_rerank(query, all_items)
         # Grouped response
         return jsonify({
             'query': query,
             'results': {
                 'all': ranked,
-                'news': news,
-                'gov': gov,
-                'fact_check': fact_checks,
-                'scholarly': scholarly
-            }
+                'news': grouped['news'],
+                'gov': grouped['gov'],
+                'fact_check': grouped['fact_check'],
+                'scholarly': grouped['scholarly'],
+                'local': grouped['local']
+            },
+            'engines': engines
         })
     except Exception as e:
         print(f"Error in /verify/hybrid: {e}")
         return jsonify({'error': 'Hybrid verification failed'}), 500
 
+@app.route('/verify/hybrid/stream', methods=['POST'])
+@rate_limit(max_requests=15, window_seconds=60)
+def verify_with_sources_hybrid_stream():
+    """Hybrid verification streamed as Server-Sent Events.
+
+    Emits 'query', then a 'news' / 'gov' / 'fact_check' / 'scholarly' / 'local' event with the
+    group's results so far whenever one of its engines finishes, and finally the
+    re-ranked 'all' event.
+    """
+    data = request.get_json() or {}
+    text = data.get('news', '') or ''
+    if not text or not isinstance(text, str):
+        return jsonify({'error': 'Missing news text or URL'}), 400
+    query = _extract_core_query(text)
+    tasks = _hybrid_engine_tasks(query)
+
+    def generate():
+        yield _sse_event('query', {'query': query})
+        items_by_engine = {}
+        engines = {}
+        try:
+            for engine, source_type, items, status in _iter_engine_results(tasks, VERIFY_DEADLINE_SECONDS):
+                items_by_engine[engine] = items
+                engines[engine] = status
+                group_items = _group_hybrid_items(tasks, items_by_engine)[source_type]
+                group_engines = {name: engines[name] for name, st, _ in tasks if st == source_type and name in engines}
+                yield _sse_event(source_type, {'items': group_items, 'engines': group_engines})
+            grouped = _group_hybrid_items(tasks, items_by_engine)
+            all_items = grouped['news'] + grouped['gov'] + grouped['fact_check'] + grouped['scholarly'] + grouped['local']
+            yield _sse_event('all', {'items': _hybrid_rerank(query, all_items), 'engines': engines})
+        except Exception as e:
+            print(f"Error in /verify/hybrid/stream: {e}")
+            yield _sse_event('error', {'error': 'Hybrid verification failed'})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Disable proxy buffering so events reach the client immediately
+    })
+
 # Verify with sources endpoint
 @app.route('/verify', methods=['POST'])
 @rate_limit(max_requests=20, window_seconds=60)
@@ -1240,6 +2240,8 @@ def verify_with_sources():
             return jsonify({'error': 'Missing news text or URL'}), 400
         query = _extract_core_query(text)
         results = _search_bing_news(query, limit=6)
+        # Local archive hits work even when outbound requests are blocked
+        results = results + [dict(it, source_type='local') for it in _search_local_evidence(query, limit=4)]
         return jsonify({
             'query': query,
             'results': results
@@ -1277,6 +2279,10 @@ def serve_js(filename):
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+        add_missing_columns(db)
+        add_missing_indexes(db)
+        sync_related_index()
+        sync_simhash_index()
     print("🚀 Starting Fake News Detection App...")
     print("🌐 Frontend will be available at: http://localhost:5000")
     print("📝 Press Ctrl+C to stop the server")
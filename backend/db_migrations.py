@@ -0,0 +1,151 @@
+"""
+Lightweight schema upgrades for existing databases.
+
+db.create_all() only creates missing tables, so columns added to the models
+after a database was first created are added here with ALTER TABLE.
+"""
+
+from sqlalchemy import inspect, or_, text
+
+try:
+    from .sparse_vectors import encode_sparse_vector, decode_legacy_vector
+    from .near_duplicates import to_signed
+except Exception:
+    # Support running as script
+    from sparse_vectors import encode_sparse_vector, decode_legacy_vector
+    from near_duplicates import to_signed
+
+
+def add_missing_columns(db):
+    """Add model columns that are missing from existing tables. Returns the added 'table.column' names."""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def add_missing_indexes(db):
+    """Create model indexes that are missing from existing tables. Returns the created index names."""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            index.create(bind=db.engine)
+            created.append(index.name)
+    return created
+
+
+def backfill_fingerprints(db, News, fingerprint, index, batch_size=500):
+    """
+    Compute SimHash fingerprints, MinHash signatures and near-duplicate
+    clusters for stored articles missing them, oldest first.
+    `fingerprint(cleaned_text)` returns an unsigned fingerprint and a
+    signature, or None; `index` is a SimHashIndex. Articles that already
+    have a fingerprint keep their cluster. Returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        rows = (News.query
+                .filter(News.id > last_id, or_(News.simhash.is_(None), News.minhash.is_(None)))
+                .order_by(News.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        for news in rows:
+            last_id = news.id
+            fingerprinted = fingerprint(news.cleaned_content or '')
+            if fingerprinted is None:
+                continue
+            value, signature = fingerprinted
+            news.minhash = signature
+            if news.simhash is None:
+                match = index.query(value, signature)
+                news.simhash = to_signed(value)
+                news.cluster_id = match[1] if match else news.id
+                index.add(news.id, (value, news.cluster_id, signature))
+            updated += 1
+        db.session.commit()
+        db.session.expunge_all()
+    return updated
+
+
+def backfill_commit_sequences(db, model, sequence, batch_size=500):
+    """
+    Number rows stored before `commit_seq` existed, oldest first, with the
+    model's CommitSequence so indexes that sync by it load them. Returns the
+    number of rows updated.
+    """
+    updated = 0
+    while True:
+        rows = (model.query
+                .filter(model.commit_seq.is_(None))
+                .order_by(model.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        sequence.stamp(db.session, rows)
+        updated += len(rows)
+        db.session.commit()
+        db.session.expunge_all()
+    return updated
+
+
+def backfill_vocabulary_versions(db, News, model_version, vocabulary_version):
+    """
+    Mark articles analyzed by the served model as vectorized with its
+    vocabulary, so the related-news and story indexes load them. Articles
+    from other models stay unmarked, since their vectors may come from
+    another vocabulary. Returns the number of rows updated.
+    """
+    updated = (News.query
+               .filter(News.vocabulary_version.is_(None), News.model_version == model_version)
+               .update({News.vocabulary_version: vocabulary_version}, synchronize_session=False))
+    db.session.commit()
+    return updated
+
+
+def migrate_content_vectors(db, News, batch_size=500):
+    """Rewrite legacy JSON content vectors into the compact sparse encoding. Returns the number of rows converted."""
+    converted = 0
+    last_id = 0
+    while True:
+        rows = (News.query
+                .filter(News.id > last_id,
+                        News.content_vector.isnot(None),
+                        News.content_vector_sparse.is_(None))
+                .order_by(News.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            break
+        for news in rows:
+            last_id = news.id
+            try:
+                news.content_vector_sparse = encode_sparse_vector(decode_legacy_vector(news.content_vector))
+                news.content_vector = None
+                converted += 1
+            except Exception as e:
+                print(f"Skipping news {news.id}: {e}")
+        db.session.commit()
+        db.session.expunge_all()
+    return converted
@@ -0,0 +1,160 @@
+"""
+Cache for evidence search results with stale-while-revalidate.
+
+Results live in a per-process LRU and, optionally, in a SQLite file shared
+by every worker on the host. Fresh entries are served directly; entries
+past their TTL but inside the stale window are served immediately while a
+background refresh fetches a new copy.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class EvidenceCache:
+    """Two-level (process memory + shared SQLite) TTL cache for search results"""
+
+    _CLEANUP_INTERVAL = 256  # stores between purges of expired shared entries
+
+    def __init__(self, ttl_seconds=600, stale_seconds=3600, max_entries=5000, path=None, refresh_workers=2):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='evidence-refresh')
+        self._local = threading.local()
+        self._stores_since_cleanup = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_failures = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with self._connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS evidence (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        stored_at REAL NOT NULL
+                    )
+                ''')
+
+    @staticmethod
+    def make_key(engine, site_filter, query, limit):
+        raw = json.dumps([engine, site_filter, query, limit], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _lookup(self, key):
+        """Return (stored_at, value) from memory, falling back to the shared backend"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if not self.path:
+            return None
+        try:
+            row = self._connection().execute(
+                'SELECT stored_at, value FROM evidence WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Evidence cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        entry = (row[0], json.loads(row[1]))
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, key, value):
+        entry = (time.time(), value)
+        self._remember(key, entry)
+        if not self.path:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO evidence (key, value, stored_at) VALUES (?, ?, ?)',
+                             (key, json.dumps(value), entry[0]))
+            self._stores_since_cleanup += 1
+            if self._stores_since_cleanup >= self._CLEANUP_INTERVAL:
+                self._stores_since_cleanup = 0
+                with conn:
+                    conn.execute('DELETE FROM evidence WHERE stored_at < ?',
+                                 (time.time() - self.ttl_seconds - self.stale_seconds,))
+        except sqlite3.Error as e:
+            print(f"Evidence cache write failed: {e}")
+
+    def _refresh(self, key, fetch):
+        try:
+            self._store(key, fetch())
+        except Exception as e:
+            # Keep serving the stale copy until it ages out
+            self.refresh_failures += 1
+            print(f"Evidence cache refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresh_executor.submit(self._refresh, key, fetch)
+
+    def get_or_fetch(self, key, fetch):
+        """Return the cached value for key, calling fetch() on a miss. Exceptions from fetch() are not cached."""
+        entry = self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh_in_background(key, fetch)
+                return entry[1]
+        self.misses += 1
+        value = fetch()
+        self._store(key, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            'entries': entries,
+            'shared_backend': bool(self.path),
+            'ttl_seconds': self.ttl_seconds,
+            'stale_seconds': self.stale_seconds,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refresh_failures': self.refresh_failures
+        }
@@ -0,0 +1,144 @@
+"""
+Streaming, size-bounded article text extraction for URL inputs.
+
+Instead of downloading the whole page and building a BeautifulSoup tree,
+the response is decoded chunk by chunk into an incremental HTMLParser that
+keeps only paragraph and heading text, skips scripts and page chrome, and
+stops as soon as enough text has been collected or the byte cap is hit.
+"""
+
+import codecs
+from html.parser import HTMLParser
+
+# Content types we know how to extract text from
+SUPPORTED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+# Elements whose text is never article content
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'nav', 'footer', 'aside', 'form', 'button', 'iframe', 'select'}
+# Elements whose text makes up the article body
+_HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+_BLOCK_TAGS = {'p', 'blockquote'} | _HEADING_TAGS
+# Start tags that implicitly end an open <p> (HTML's "optional end tag" rules for p)
+_P_CLOSING_STARTS = {
+    'address', 'article', 'aside', 'blockquote', 'details', 'dialog', 'div', 'dl', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'header', 'hgroup', 'hr', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'search',
+    'section', 'table', 'ul'
+} | _HEADING_TAGS
+# End tags of containers that implicitly end an open <p> inside them
+_P_CLOSING_ENDS = (_P_CLOSING_STARTS - {'p', 'hr'} - _HEADING_TAGS) | {'body', 'html', 'li', 'dd', 'dt', 'td', 'th', 'caption'}
+
+
+def is_supported_content_type(content_type):
+    """True if a Content-Type header (or its absence) looks like extractable text"""
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in SUPPORTED_CONTENT_TYPES
+
+
+class ArticleTextParser(HTMLParser):
+    """
+    Incremental parser collecting article text.
+
+    Paragraph/heading text is gathered separately from all other visible
+    text so pages without <p> markup can still fall back to the latter.
+    `done` becomes True once `max_chars` of paragraph text is collected.
+    Unclosed <p> elements end where a browser would end them.
+    """
+
+    def __init__(self, max_chars=100000):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.done = False
+        self._skip_depth = 0
+        self._open_blocks = []  # Open body elements, innermost last
+        self._block_parts = []
+        self._blocks = []
+        self._block_chars = 0
+        self._other_parts = []
+        self._other_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if not self._skip_depth:
+            if tag in _P_CLOSING_STARTS:
+                self._close_block('p')
+            if tag in _HEADING_TAGS and self._open_blocks and self._open_blocks[-1] in _HEADING_TAGS:
+                self._close_block(self._open_blocks[-1])
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS and not self._skip_depth:
+            self._open_blocks.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+        elif self._skip_depth:
+            return
+        elif tag in _BLOCK_TAGS:
+            self._close_block(tag)
+        elif tag in _P_CLOSING_ENDS:
+            self._close_block('p')
+
+    def _close_block(self, tag):
+        """Close the innermost open `tag` (and anything opened inside it); flush once no block is open"""
+        if tag not in self._open_blocks:
+            return
+        while self._open_blocks.pop() != tag:
+            pass
+        if not self._open_blocks:
+            self._flush_block()
+
+    def handle_data(self, data):
+        if self._skip_depth or self.done:
+            return
+        text = data.strip()
+        if not text:
+            return
+        if self._open_blocks:
+            self._block_parts.append(text)
+        elif self._other_chars < self.max_chars:
+            self._other_parts.append(text)
+            self._other_chars += len(text) + 1
+
+    def _flush_block(self):
+        if not self._block_parts:
+            return
+        block = ' '.join(self._block_parts)
+        self._block_parts = []
+        self._blocks.append(block)
+        self._block_chars += len(block) + 1
+        if self._block_chars >= self.max_chars:
+            self.done = True
+
+    def text(self, min_body_chars=200):
+        """Article body text, or all visible text when the body is too short"""
+        self._flush_block()
+        if self._block_chars >= min_body_chars or not self._other_parts:
+            return ' '.join(self._blocks)[:self.max_chars]
+        return ' '.join(self._blocks + self._other_parts)[:self.max_chars]
+
+
+def iter_response_text(response, max_bytes=2 * 1024 * 1024, chunk_size=64 * 1024):
+    """Decode a streamed requests response incrementally, stopping after max_bytes"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    received = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        received += len(chunk)
+        if received > max_bytes:
+            chunk = chunk[:len(chunk) - (received - max_bytes)]
+            yield decoder.decode(chunk, final=True)
+            return
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+def extract_article_text(chunks, max_chars=100000, min_body_chars=200):
+    """Extract article text from an iterable of HTML text chunks, stopping early once enough is collected"""
+    parser = ArticleTextParser(max_chars=max_chars)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    return parser.text(min_body_chars=min_body_chars)
@@ -0,0 +1,181 @@
+"""
+Shared outbound HTTP client with connection pooling, bounded retries and
+per-upstream circuit breakers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except Exception:  # Optional at runtime, like in app.py
+    requests = None
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the upstream's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and
+    requests fail immediately. Once `reset_timeout` seconds have passed a
+    single trial request is let through (half-open); its outcome closes or
+    re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.rejected = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.total_successes += 1
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'total_failures': self.total_failures,
+                'total_successes': self.total_successes,
+                'rejected': self.rejected,
+                'retry_in_seconds': retry_in
+            }
+
+
+class HttpClient:
+    """
+    One pooled requests.Session for all outbound calls.
+
+    Connections are kept alive per host, idempotent requests are retried
+    with exponential backoff on connection errors and 429/5xx responses,
+    and every upstream ("engine") gets its own circuit breaker so a dead
+    service fails fast instead of holding a worker thread until timeout.
+    """
+
+    def __init__(self, pool_connections=20, pool_maxsize=32, retries=1, backoff_factor=0.3,
+                 failure_threshold=5, reset_timeout=30.0, max_breakers=1024, user_agent=None):
+        if requests is None:
+            raise RuntimeError("requests is required for HttpClient")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_breakers = max_breakers
+        self._breakers = OrderedDict()
+        self._breakers_lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        if user_agent:
+            self.session.headers['User-Agent'] = user_agent
+
+    def breaker(self, engine):
+        """Circuit breaker for an upstream, created on first use"""
+        with self._breakers_lock:
+            breaker = self._breakers.get(engine)
+            if breaker is None:
+                breaker = self._breakers[engine] = CircuitBreaker(engine, self.failure_threshold, self.reset_timeout)
+                # Per-host breakers for arbitrary article URLs must not grow without bound
+                while len(self._breakers) > self.max_breakers:
+                    self._breakers.popitem(last=False)
+            else:
+                self._breakers.move_to_end(engine)
+            return breaker
+
+    def get(self, url, engine=None, **kwargs):
+        """GET through the shared session, guarded by the engine's circuit breaker (defaults to the host)"""
+        engine = engine or urlparse(url).netloc.lower()
+        breaker = self.breaker(engine)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {engine}")
+        try:
+            response = self.session.get(url, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def stats(self):
+        """Breaker states and connection pool usage"""
+        with self._breakers_lock:
+            breakers = list(self._breakers.items())
+        pools = {}
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'available_slots': pool.pool.qsize() if pool.pool is not None else 0,
+                'max_size': pool.pool.maxsize if pool.pool is not None else 0
+            }
+        return {
+            'breakers': {name: breaker.snapshot() for name, breaker in breakers},
+            'pools': pools
+        }
@@ -0,0 +1,98 @@
+"""
+Single-pass keyword counting for the indicator lexicons.
+
+The lexicons (groups of categories of words and phrases) live in
+lexicons.json, or the file named by LEXICONS_PATH, and are compiled into
+one word-level trie. A text is lowercased and tokenized once, then every
+category of every group is counted in a single scan. Matches respect word
+boundaries, so `now` does not match inside `know`.
+"""
+
+import json
+import os
+import re
+import threading
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+_TERMINAL = ''  # Trie key holding the phrase ids that end at a node (never a token)
+
+DEFAULT_LEXICONS_PATH = os.path.join(os.path.dirname(__file__), 'lexicons.json')
+
+
+def tokenize(text):
+    """Lowercase word tokens, keeping inner apostrophes and hyphens (don't, cover-up)"""
+    return _TOKEN_RE.findall((text or '').lower().replace('’', "'"))
+
+
+class KeywordMatcher:
+    """
+    Word-level trie over {group: {category: [phrase, ...]}} lexicons.
+
+    count(text) returns {group: {category: n}} where n is the number of
+    distinct phrases of that category found in the text.
+    """
+
+    def __init__(self, lexicons):
+        self.lexicons = lexicons
+        self._root = {}
+        self._phrase_categories = []  # phrase id -> list of (group, category)
+        phrase_ids = {}
+        for group, categories in lexicons.items():
+            for category, phrases in categories.items():
+                for phrase in phrases:
+                    tokens = tuple(tokenize(phrase))
+                    if not tokens:
+                        continue
+                    phrase_id = phrase_ids.get(tokens)
+                    if phrase_id is None:
+                        phrase_id = phrase_ids[tokens] = len(self._phrase_categories)
+                        self._phrase_categories.append([])
+                        node = self._root
+                        for token in tokens:
+                            node = node.setdefault(token, {})
+                        node.setdefault(_TERMINAL, []).append(phrase_id)
+                    if (group, category) not in self._phrase_categories[phrase_id]:
+                        self._phrase_categories[phrase_id].append((group, category))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find(self, text):
+        """Ids of the distinct lexicon phrases occurring in the text"""
+        tokens = tokenize(text)
+        root = self._root
+        found = set()
+        for start, token in enumerate(tokens):
+            node = root.get(token)
+            position = start + 1
+            while node is not None:
+                found.update(node.get(_TERMINAL, ()))
+                if position == len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return found
+
+    def count(self, text):
+        """Distinct phrase counts for every category of every group, from one scan of the text"""
+        counts = {group: dict.fromkeys(categories, 0) for group, categories in self.lexicons.items()}
+        for phrase_id in self.find(text):
+            for group, category in self._phrase_categories[phrase_id]:
+                counts[group][category] += 1
+        return counts
+
+
+_default_matcher = None
+_default_lock = threading.Lock()
+
+
+def get_default_matcher():
+    """Matcher for LEXICONS_PATH (or the bundled lexicons.json), loaded once per process"""
+    global _default_matcher
+    if _default_matcher is None:
+        with _default_lock:
+            if _default_matcher is None:
+                _default_matcher = KeywordMatcher.from_file(os.environ.get('LEXICONS_PATH', DEFAULT_LEXICONS_PATH))
+    return _default_matcher
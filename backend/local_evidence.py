@@ -0,0 +1,192 @@
+"""
+Offline BM25 index over a local corpus of fact-checks and reference articles.
+
+The index is built from JSONL files (one article per line with `title`,
+`url` and `text`/`snippet`, plus optional `published_at`, `source` and
+`credibility`) into a directory of NumPy arrays. At startup the arrays are
+memory-mapped, so lookups need no network access and loading is cheap
+even for large corpora.
+
+Usage:
+    python local_evidence.py build --out evidence_index articles.jsonl [more.jsonl ...]
+    python local_evidence.py query evidence_index "claim text"
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'he', 'her',
+    'his', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'she', 'that', 'the', 'their', 'they', 'this',
+    'to', 'was', 'were', 'will', 'with'
+}
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens without stopwords or single characters"""
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def build_index(jsonl_paths, out_dir, snippet_chars=300):
+    """Build an on-disk BM25 index from JSONL article files. Returns the number of indexed documents."""
+    os.makedirs(out_dir, exist_ok=True)
+    vocab = {}
+    postings = []  # term id -> list of (doc id, term frequency)
+    doc_lengths = []
+    doc_offsets = []
+
+    with open(os.path.join(out_dir, 'docs.jsonl'), 'wb') as docs_file:
+        for path in jsonl_paths:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        article = json.loads(line)
+                    except ValueError:
+                        continue
+                    body = article.get('text') or article.get('content') or article.get('snippet') or ''
+                    tokens = tokenize(f"{article.get('title', '')} {body}")
+                    if not tokens:
+                        continue
+                    doc_id = len(doc_lengths)
+                    for term, tf in Counter(tokens).items():
+                        term_id = vocab.get(term)
+                        if term_id is None:
+                            term_id = vocab[term] = len(postings)
+                            postings.append([])
+                        postings[term_id].append((doc_id, tf))
+                    doc_lengths.append(len(tokens))
+
+                    doc = {
+                        'title': article.get('title', ''),
+                        'url': article.get('url', ''),
+                        'snippet': (article.get('snippet') or body)[:snippet_chars],
+                        'published_at': article.get('published_at', ''),
+                        'source': article.get('source', ''),
+                        'credibility': article.get('credibility')
+                    }
+                    doc_offsets.append(docs_file.tell())
+                    docs_file.write(json.dumps(doc, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in postings])
+    docs = np.fromiter((d for plist in postings for d, _ in plist), dtype=np.int32, count=int(offsets[-1]))
+    tfs = np.fromiter((tf for plist in postings for _, tf in plist), dtype=np.float32, count=int(offsets[-1]))
+
+    np.save(os.path.join(out_dir, 'postings_offsets.npy'), offsets)
+    np.save(os.path.join(out_dir, 'postings_docs.npy'), docs)
+    np.save(os.path.join(out_dir, 'postings_tf.npy'), tfs)
+    np.save(os.path.join(out_dir, 'doc_lengths.npy'), np.asarray(doc_lengths, dtype=np.float32))
+    np.save(os.path.join(out_dir, 'doc_offsets.npy'), np.asarray(doc_offsets, dtype=np.int64))
+    with open(os.path.join(out_dir, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'documents': len(doc_lengths),
+            'terms': len(vocab),
+            'avg_doc_length': float(np.mean(doc_lengths)) if doc_lengths else 0.0
+        }, f)
+    return len(doc_lengths)
+
+
+class LocalEvidenceIndex:
+    """Read-only, memory-mapped BM25 index produced by build_index()"""
+
+    def __init__(self, index_dir, k1=1.5, b=0.75):
+        self.index_dir = index_dir
+        self.k1 = k1
+        self.b = b
+        with open(os.path.join(index_dir, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(index_dir, 'vocab.json'), encoding='utf-8') as f:
+            self.vocab = json.load(f)
+        self.documents = meta['documents']
+        self.avg_doc_length = meta['avg_doc_length'] or 1.0
+        self._offsets = np.load(os.path.join(index_dir, 'postings_offsets.npy'), mmap_mode='r')
+        self._docs = np.load(os.path.join(index_dir, 'postings_docs.npy'), mmap_mode='r')
+        self._tfs = np.load(os.path.join(index_dir, 'postings_tf.npy'), mmap_mode='r')
+        self._doc_lengths = np.load(os.path.join(index_dir, 'doc_lengths.npy'), mmap_mode='r')
+        self._doc_offsets = np.load(os.path.join(index_dir, 'doc_offsets.npy'), mmap_mode='r')
+        self._docs_path = os.path.join(index_dir, 'docs.jsonl')
+
+    @classmethod
+    def load(cls, index_dir):
+        """Open an index directory, or return None if no index has been built there"""
+        if not index_dir or not os.path.exists(os.path.join(index_dir, 'meta.json')):
+            return None
+        return cls(index_dir)
+
+    def _document(self, doc_id):
+        with open(self._docs_path, 'rb') as f:
+            f.seek(int(self._doc_offsets[doc_id]))
+            return json.loads(f.readline())
+
+    def search(self, query, limit=5):
+        """Return up to `limit` stored documents for the query, best BM25 score first (each with a 'score')"""
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or limit <= 0:
+            return []
+
+        doc_parts = []
+        score_parts = []
+        for term_id in term_ids:
+            start, end = int(self._offsets[term_id]), int(self._offsets[term_id + 1])
+            docs = np.asarray(self._docs[start:end])
+            tfs = np.asarray(self._tfs[start:end])
+            df = end - start
+            idf = math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * np.asarray(self._doc_lengths[docs]) / self.avg_doc_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1) / (tfs + norm))
+
+        doc_ids, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+        if len(doc_ids) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(doc_ids))
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        results = []
+        for i in top:
+            doc = self._document(int(doc_ids[i]))
+            doc['score'] = round(float(scores[i]), 3)
+            results.append(doc)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local evidence index")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="Build an index from JSONL files")
+    build.add_argument('--out', required=True, help="Index directory")
+    build.add_argument('inputs', nargs='+', help="JSONL files with one article per line")
+    query = sub.add_parser('query', help="Search an existing index")
+    query.add_argument('index_dir')
+    query.add_argument('text')
+    query.add_argument('--limit', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        count = build_index(args.inputs, args.out)
+        print(f"✅ Indexed {count} documents into {args.out}")
+    else:
+        index = LocalEvidenceIndex.load(args.index_dir)
+        if index is None:
+            print(f"❌ No index found in {args.index_dir}")
+            return
+        for doc in index.search(args.text, limit=args.limit):
+            print(f"{doc['score']:>8}  {doc['title']}  {doc['url']}")
+
+
+if __name__ == '__main__':
+    main()
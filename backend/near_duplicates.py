@@ -0,0 +1,139 @@
+"""
+SimHash fingerprints and MinHash signatures for near-duplicate articles.
+
+Reposts with a rewritten headline or an appended tracking footer share most
+of their word shingles, so their 64-bit SimHashes differ in only a few bits,
+but on a short article a two-line footer can already move a dozen. A lookup
+counts the differing bits against every stored fingerprint in one numpy
+pass. Fingerprints within 3 bits always match; further ones, up to a wider
+limit, also need a MinHash estimate of their shingle-set Jaccard similarity
+above a threshold, so unrelated articles that land close by chance do not.
+"""
+
+import hashlib
+from collections import Counter
+
+import numpy as np
+
+try:
+    from .related_index import _SyncedIndex
+except Exception:
+    # Support running as script
+    from related_index import _SyncedIndex
+
+_BITS = np.arange(64, dtype=np.uint64)
+_CLOSE_DISTANCE = 3  # Matches this close need no similarity check
+# Universal hashes ((a * x + b) mod p) standing in for MinHash's random permutations; fixed so every worker agrees
+_MINHASH_PRIME = (1 << 31) - 1
+_MINHASH_A, _MINHASH_B = np.random.default_rng(20240611).integers(1, _MINHASH_PRIME, size=(2, 64), dtype=np.uint64)
+
+
+def _shingle_hashes(tokens, shingle_size):
+    """Counter of word shingles and their 64-bit hashes, in the same order"""
+    if len(tokens) <= shingle_size:
+        shingles = Counter([' '.join(tokens)])
+    else:
+        shingles = Counter(' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1))
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little') for shingle in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    return shingles, hashes
+
+
+def simhash(tokens, shingle_size=3):
+    """64-bit SimHash over word shingles of a token list (0 for no tokens)"""
+    if not tokens:
+        return 0
+    shingles, hashes = _shingle_hashes(tokens, shingle_size)
+    weights = np.fromiter(shingles.values(), dtype=np.float64, count=len(shingles))
+    bits = ((hashes[:, None] >> _BITS) & np.uint64(1)).astype(np.float64)
+    votes = weights @ (2 * bits - 1)
+    return int(np.packbits((votes > 0)[::-1]).view('>u8')[0])
+
+
+def minhash(tokens, shingle_size=3):
+    """64 x 32-bit MinHash signature of the shingle set of a non-empty token list, as bytes"""
+    _, hashes = _shingle_hashes(tokens, shingle_size)
+    values = (hashes % np.uint64(_MINHASH_PRIME))[:, None]
+    return ((values * _MINHASH_A + _MINHASH_B) % np.uint64(_MINHASH_PRIME)).min(axis=0).astype('<u4').tobytes()
+
+
+def minhash_similarity(first, second):
+    """Estimated Jaccard similarity of the shingle sets behind two MinHash signatures"""
+    return float(np.mean(np.frombuffer(first, dtype='<u4') == np.frombuffer(second, dtype='<u4')))
+
+
+def to_signed(value):
+    """Store an unsigned 64-bit fingerprint in a signed BIGINT column"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def _bit_counts(values):
+    """Set bits of each uint64 in an array"""
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0
+        return np.bitwise_count(values)
+    values = values - ((values >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (values * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+class SimHashIndex(_SyncedIndex):
+    """In-memory news id -> (fingerprint, cluster id, MinHash signature), with the fingerprints in one numpy array"""
+
+    def __init__(self, max_distance=15, min_similarity=0.6):
+        super().__init__()
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        self._entries = {}  # news id -> (fingerprint, cluster id, signature or None)
+        self._fingerprints = np.zeros(1024, dtype=np.uint64)
+        self._row_ids = np.zeros(1024, dtype=np.int64)
+        self._size = 0
+
+    def add(self, news_id, entry):
+        """Index one stored article from a (fingerprint, cluster id, signature) tuple. Re-adding a known id is a no-op."""
+        fingerprint, cluster_id, signature = entry
+        with self._lock:
+            if news_id in self._news_ids:
+                return False
+            self._news_ids.add(news_id)
+            self._entries[news_id] = (fingerprint, cluster_id or news_id, signature)
+            if self._size == len(self._row_ids):
+                self._fingerprints = np.concatenate([self._fingerprints, np.zeros_like(self._fingerprints)])
+                self._row_ids = np.concatenate([self._row_ids, np.zeros_like(self._row_ids)])
+            self._fingerprints[self._size] = fingerprint
+            self._row_ids[self._size] = news_id
+            self._size += 1
+        return True
+
+    def query(self, fingerprint, signature=None, exclude_id=None):
+        """
+        Most similar indexed article as (news_id, cluster_id, distance), or None.
+
+        Articles within 3 bits always match; ones up to max_distance bits away
+        only when both have a signature and their estimated Jaccard similarity
+        reaches min_similarity. The highest similarity wins, then the
+        smallest distance.
+        """
+        best, best_key = None, None
+        with self._lock:
+            distances = _bit_counts(self._fingerprints[:self._size] ^ np.uint64(fingerprint))
+            positions = np.flatnonzero(distances <= self.max_distance)
+            for news_id, distance in zip(self._row_ids[positions].tolist(), distances[positions].tolist()):
+                if news_id == exclude_id:
+                    continue
+                _, cluster_id, stored_signature = self._entries[news_id]
+                similarity = None
+                if signature is not None and stored_signature is not None:
+                    similarity = minhash_similarity(signature, stored_signature)
+                if distance > _CLOSE_DISTANCE and (similarity is None or similarity < self.min_similarity):
+                    continue
+                key = (-(similarity if similarity is not None else 1.0), distance, news_id)
+                if best_key is None or key < best_key:
+                    best, best_key = (news_id, cluster_id, distance), key
+        return best
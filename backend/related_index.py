@@ -0,0 +1,242 @@
+"""
+In-memory indexes over stored TF-IDF vectors for related-news lookup.
+"""
+
+import threading
+from array import array
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def _normalized_row(vector):
+    """Return (term indices, L2-normalized weights) of a 1 x N vector, or None if it is empty"""
+    row = csr_matrix(vector)
+    row.eliminate_zeros()
+    if row.nnz == 0:
+        return None
+    weights = row.data.astype(np.float64)
+    norm = np.sqrt(np.dot(weights, weights))
+    if norm == 0:
+        return None
+    return row.indices, weights / norm
+
+
+class _SyncedIndex:
+    """Bookkeeping shared by the related-news indexes: known ids and database sync"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._news_ids = set()
+        # Highest commit sequence loaded from the database. Rows are synced by
+        # commit order rather than by id: ids come from per-worker blocks (see
+        # write_behind.py), so a lower id can be committed long after a higher one.
+        self.watermark = 0
+
+    def __len__(self):
+        return len(self._news_ids)
+
+    def __contains__(self, news_id):
+        return news_id in self._news_ids
+
+    def sync(self, load_rows):
+        """
+        Load rows committed since the last sync.
+
+        load_rows(watermark) must yield (commit_seq, news_id, payload) for
+        stored rows with a commit sequence above the watermark, in ascending
+        commit sequence order. Rows with a None payload are skipped.
+        """
+        with self._sync_lock:
+            for commit_seq, news_id, payload in load_rows(self.watermark):
+                if payload is not None:
+                    self.add(news_id, payload)
+                self.watermark = max(self.watermark, commit_seq)
+
+
+class RelatedNewsIndex(_SyncedIndex):
+    """
+    Exact cosine-similarity index built as term -> postings lists.
+
+    A query only scores stored articles that share at least one term with
+    it, so its cost depends on the postings it touches rather than on the
+    total number of stored articles.
+    """
+
+    approximate = False
+
+    def __init__(self):
+        super().__init__()
+        self._postings = {}  # term index -> (array of news ids, array of weights)
+
+    def add(self, news_id, vector):
+        """Index one stored article. Re-adding a known id is a no-op."""
+        normalized = _normalized_row(vector)
+        if normalized is None:
+            return False
+        terms, weights = normalized
+        with self._lock:
+            if news_id in self._news_ids:
+                return False
+            for term, weight in zip(terms.tolist(), weights.tolist()):
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('i'), array('f'))
+                postings[0].append(news_id)
+                postings[1].append(weight)
+            self._news_ids.add(news_id)
+        return True
+
+    def query(self, vector, limit=5, exclude_id=None, min_similarity=0.0):
+        """Return up to `limit` (news_id, cosine similarity) pairs, best first"""
+        normalized = _normalized_row(vector)
+        if normalized is None or limit <= 0:
+            return []
+        terms, query_weights = normalized
+
+        with self._lock:
+            id_parts = []
+            weight_parts = []
+            for term, query_weight in zip(terms.tolist(), query_weights.tolist()):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                # Copy out of the array buffers so they can keep growing after the lock is released
+                id_parts.append(np.frombuffer(postings[0], dtype=np.intc).copy())
+                weight_parts.append(np.frombuffer(postings[1], dtype=np.float32) * query_weight)
+
+        if not id_parts:
+            return []
+
+        news_ids, inverse = np.unique(np.concatenate(id_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weight_parts))
+
+        if exclude_id is not None:
+            scores[news_ids == exclude_id] = -1.0
+        candidates = np.flatnonzero(scores > min_similarity)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(news_ids[i]), float(min(scores[i], 1.0))) for i in candidates]
+
+
+class ApproximateRelatedIndex(_SyncedIndex):
+    """
+    Approximate nearest-neighbour index using random-projection LSH.
+
+    TF-IDF rows are reduced to `dimensions` dense values with a fixed
+    Gaussian projection and hashed into `n_tables` tables of `n_bits`
+    hyperplane signs. A query scores only the articles in its buckets, plus
+    the `n_probes` neighbouring buckets per table reached by flipping the
+    least certain bits. More tables or probes raise recall at the cost of
+    latency. Returned similarities are cosines of the reduced vectors.
+    """
+
+    approximate = True
+
+    def __init__(self, dimensions=128, n_tables=8, n_bits=12, n_probes=2, seed=42):
+        super().__init__()
+        self.dimensions = dimensions
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.n_probes = min(n_probes, n_bits)
+        self._seed = seed
+        self._projection = None  # vocabulary x dimensions, created from the first vector seen
+        rng = np.random.default_rng(seed + 1)
+        self._hyperplanes = rng.standard_normal((n_tables, dimensions, n_bits)).astype(np.float32)
+        self._bit_values = np.left_shift(1, np.arange(n_bits, dtype=np.int64))
+        self._buckets = [{} for _ in range(n_tables)]  # key -> array of row positions
+        self._vectors = np.zeros((1024, dimensions), dtype=np.float16)
+        self._row_ids = np.zeros(1024, dtype=np.int64)
+        self._size = 0
+
+    def _reduce(self, vector):
+        """Project a sparse row to a unit-length dense vector, or None if it is empty"""
+        row = csr_matrix(vector)
+        if row.nnz == 0:
+            return None
+        if self._projection is None:
+            with self._lock:
+                if self._projection is None:
+                    rng = np.random.default_rng(self._seed)
+                    self._projection = (rng.standard_normal((row.shape[1], self.dimensions))
+                                        / np.sqrt(self.dimensions)).astype(np.float32)
+        reduced = np.asarray(row @ self._projection, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(reduced)
+        if norm == 0:
+            return None
+        return reduced / norm
+
+    def _margins(self, reduced):
+        """Signed distance of the vector to every hyperplane, shape (n_tables, n_bits)"""
+        return np.einsum('d,tdb->tb', reduced, self._hyperplanes)
+
+    def _keys(self, margins):
+        return ((margins > 0) * self._bit_values).sum(axis=1)
+
+    def add(self, news_id, vector):
+        """Index one stored article. Re-adding a known id is a no-op."""
+        reduced = self._reduce(vector)
+        if reduced is None:
+            return False
+        keys = self._keys(self._margins(reduced)).tolist()
+        with self._lock:
+            if news_id in self._news_ids:
+                return False
+            if self._size == len(self._row_ids):
+                self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+                self._row_ids = np.concatenate([self._row_ids, np.zeros_like(self._row_ids)])
+            position = self._size
+            self._vectors[position] = reduced
+            self._row_ids[position] = news_id
+            self._size += 1
+            for table, key in zip(self._buckets, keys):
+                bucket = table.get(key)
+                if bucket is None:
+                    bucket = table[key] = array('i')
+                bucket.append(position)
+            self._news_ids.add(news_id)
+        return True
+
+    def _probe_keys(self, margins):
+        """Keys to visit per table: the query's own bucket and its closest neighbours"""
+        base_keys = self._keys(margins)
+        probes = [base_keys[:, None]]
+        if self.n_probes:
+            uncertain_bits = np.argsort(np.abs(margins), axis=1)[:, :self.n_probes]
+            probes.append(base_keys[:, None] ^ self._bit_values[uncertain_bits])
+        return np.concatenate(probes, axis=1).tolist()
+
+    def query(self, vector, limit=5, exclude_id=None, min_similarity=0.0):
+        """Return up to `limit` (news_id, approximate cosine similarity) pairs, best first"""
+        if limit <= 0 or self._projection is None:
+            return []
+        reduced = self._reduce(vector)
+        if reduced is None:
+            return []
+        probe_keys = self._probe_keys(self._margins(reduced))
+
+        with self._lock:
+            parts = []
+            for table, keys in zip(self._buckets, probe_keys):
+                for key in keys:
+                    bucket = table.get(key)
+                    if bucket is not None:
+                        parts.append(np.frombuffer(bucket, dtype=np.intc).copy())
+            if not parts:
+                return []
+            positions = np.unique(np.concatenate(parts))
+            candidate_vectors = self._vectors[positions].astype(np.float32)
+            candidate_ids = self._row_ids[positions]
+
+        scores = candidate_vectors @ reduced
+        if exclude_id is not None:
+            scores[candidate_ids == exclude_id] = -1.0
+        candidates = np.flatnonzero(scores > min_similarity)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(candidate_ids[i]), float(min(scores[i], 1.0))) for i in candidates]
@@ -0,0 +1,53 @@
+"""
+Compact binary encoding for stored TF-IDF vectors.
+
+A vector is stored as a small header followed by the non-zero column
+indices (uint32) and their values (float32), instead of a JSON list with
+one entry per vocabulary term.
+"""
+
+import json
+import struct
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+_MAGIC = b'SPV1'
+_HEADER = struct.Struct('<4sII')  # magic, dimension, number of non-zeros
+
+
+def encode_sparse_vector(row):
+    """Encode a 1 x N sparse (or dense) row as compact bytes"""
+    row = csr_matrix(row)
+    row.eliminate_zeros()
+    row.sort_indices()
+    indices = row.indices.astype('<u4', copy=False)
+    values = row.data.astype('<f4', copy=False)
+    return _HEADER.pack(_MAGIC, row.shape[1], len(indices)) + indices.tobytes() + values.tobytes()
+
+
+def decode_sparse_vector(blob):
+    """Decode bytes produced by encode_sparse_vector into a 1 x N csr_matrix"""
+    magic, dimension, nnz = _HEADER.unpack_from(blob)
+    if magic != _MAGIC:
+        raise ValueError("Not an encoded sparse vector")
+    offset = _HEADER.size
+    indices = np.frombuffer(blob, dtype='<u4', count=nnz, offset=offset).astype(np.int32)
+    values = np.frombuffer(blob, dtype='<f4', count=nnz, offset=offset + 4 * nnz).astype(np.float32)
+    indptr = np.array([0, nnz], dtype=np.int32)
+    return csr_matrix((values, indices, indptr), shape=(1, dimension))
+
+
+def decode_legacy_vector(vector_json):
+    """Decode the legacy dense JSON list format into a 1 x N csr_matrix"""
+    dense = np.asarray(json.loads(vector_json), dtype=np.float32).reshape(1, -1)
+    return csr_matrix(dense)
+
+
+def load_stored_vector(sparse_blob, legacy_json=None):
+    """Return the stored vector of a News row, preferring the compact encoding"""
+    if sparse_blob:
+        return decode_sparse_vector(bytes(sparse_blob))
+    if legacy_json:
+        return decode_legacy_vector(legacy_json)
+    return None
@@ -0,0 +1,298 @@
+"""
+Streaming story clustering for trending topics.
+
+Every analyzed article is assigned to a story cluster as it arrives, with a
+leader algorithm: the article joins the most similar cluster centroid when
+the cosine similarity clears a threshold, and otherwise starts a cluster of
+its own. Centroids live in a random-projection LSH index, so an assignment
+looks at a few buckets instead of every cluster. Per-cluster counts are
+kept in time buckets for sliding-window trending statistics, and the least
+recently updated clusters are evicted to keep memory bounded.
+"""
+
+from array import array
+from collections import OrderedDict, deque
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+try:
+    from .related_index import _SyncedIndex
+except Exception:
+    # Support running as script
+    from related_index import _SyncedIndex
+
+
+class _StoryCluster:
+    __slots__ = ('cluster_id', 'centroid', 'keys', 'size', 'title', 'story_id', 'last_seen', 'buckets')
+
+    def __init__(self, cluster_id, centroid, keys, title, story_id):
+        self.cluster_id = cluster_id  # Key in this process only
+        self.centroid = centroid
+        self.keys = keys
+        self.size = 0
+        self.title = title
+        self.story_id = story_id  # Lowest member news id, the same in every worker
+        self.last_seen = 0.0
+        self.buckets = deque()  # [bucket start, articles, FAKE articles], oldest first
+
+
+class _RepeatSubmissions(_SyncedIndex):
+    """Commit-sequence watermark over NewsEvent rows, feeding repeat submissions to a StoryClusterer"""
+
+    def __init__(self, clusterer):
+        super().__init__()
+        self._clusterer = clusterer
+
+    def add(self, event_id, payload):
+        return self._clusterer.record(event_id, payload)
+
+
+class StoryClusterer(_SyncedIndex):
+    """
+    Leader clustering over reduced TF-IDF vectors with an LSH index of centroids.
+
+    add(news_id, (vector, timestamp, label, title)) assigns a stored article
+    and record(event_id, (news_id, vector, timestamp, label, title)) counts a
+    repeat submission (a NewsEvent row). sync() and sync_events() feed in the
+    rows other workers wrote, so every worker counts the same articles and
+    submissions. Stories are identified by their lowest member news id
+    rather than a per-process counter, so workers that saw the rows in a
+    different order still report the same id.
+    """
+
+    def __init__(self, threshold=0.5, max_clusters=5000, dimensions=128, n_tables=6, n_bits=10, n_probes=1,
+                 bucket_seconds=300, max_window=86400, max_recent_ids=100000, seed=7):
+        super().__init__()
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.dimensions = dimensions
+        self.n_probes = min(n_probes, n_bits)
+        self.bucket_seconds = bucket_seconds
+        self.max_window = max_window
+        self.max_recent_ids = max_recent_ids
+        self._seed = seed
+        self._projection = None  # vocabulary x dimensions, recreated if the vocabulary changes
+        rng = np.random.default_rng(seed + 1)
+        self._hyperplanes = rng.standard_normal((n_tables, dimensions, n_bits)).astype(np.float32)
+        self._bit_values = np.left_shift(1, np.arange(n_bits, dtype=np.int64))
+        self._tables = [{} for _ in range(n_tables)]  # key -> array of cluster ids
+        self._clusters = OrderedDict()  # cluster id -> _StoryCluster, least recently updated first
+        self._recent_ids = OrderedDict()  # news id -> cluster id, bounded; de-duplicates synced rows
+        self._recent_events = OrderedDict()  # event id -> cluster id, likewise
+        self._events = _RepeatSubmissions(self)
+        self._next_cluster_id = 1
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._clusters)
+
+    def __contains__(self, news_id):
+        return news_id in self._recent_ids
+
+    def _reset(self, vocabulary_size):
+        """Start over with a projection for a new vocabulary (the model was retrained)"""
+        rng = np.random.default_rng(self._seed)
+        self._projection = (rng.standard_normal((vocabulary_size, self.dimensions))
+                            / np.sqrt(self.dimensions)).astype(np.float32)
+        self._tables = [{} for _ in self._tables]
+        self._clusters.clear()
+
+    def _reduce(self, vector):
+        """Unit-length dense projection of a sparse row, or None if it is empty"""
+        row = csr_matrix(vector)
+        if row.nnz == 0:
+            return None
+        if self._projection is None or self._projection.shape[0] != row.shape[1]:
+            self._reset(row.shape[1])
+        reduced = np.asarray(row @ self._projection, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(reduced)
+        if norm == 0:
+            return None
+        return reduced / norm
+
+    def _margins(self, reduced):
+        return np.einsum('d,tdb->tb', reduced, self._hyperplanes)
+
+    def _keys(self, margins):
+        return ((margins > 0) * self._bit_values).sum(axis=1)
+
+    def _probe_keys(self, reduced):
+        margins = self._margins(reduced)
+        base_keys = self._keys(margins)
+        probes = [base_keys[:, None]]
+        if self.n_probes:
+            uncertain_bits = np.argsort(np.abs(margins), axis=1)[:, :self.n_probes]
+            probes.append(base_keys[:, None] ^ self._bit_values[uncertain_bits])
+        return np.concatenate(probes, axis=1).tolist()
+
+    def _index(self, cluster):
+        for table, key in zip(self._tables, cluster.keys):
+            bucket = table.get(key)
+            if bucket is None:
+                bucket = table[key] = array('q')
+            bucket.append(cluster.cluster_id)
+
+    def _unindex(self, cluster):
+        for table, key in zip(self._tables, cluster.keys):
+            bucket = table.get(key)
+            if bucket is None:
+                continue
+            remaining = array('q', (cid for cid in bucket if cid != cluster.cluster_id))
+            if remaining:
+                table[key] = remaining
+            else:
+                del table[key]
+
+    def _nearest(self, reduced):
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for table, keys in zip(self._tables, self._probe_keys(reduced)):
+            for key in keys:
+                for cluster_id in table.get(key, ()):
+                    if cluster_id in seen:
+                        continue
+                    seen.add(cluster_id)
+                    cluster = self._clusters.get(cluster_id)
+                    if cluster is None:
+                        continue
+                    similarity = float(np.dot(cluster.centroid, reduced))
+                    if similarity >= best_similarity:
+                        best, best_similarity = cluster, similarity
+        return best
+
+    def _count(self, cluster, timestamp, label):
+        bucket_start = timestamp - timestamp % self.bucket_seconds
+        buckets = cluster.buckets
+        if not buckets or buckets[-1][0] < bucket_start:
+            buckets.append([bucket_start, 0, 0])
+            bucket = buckets[-1]
+        else:
+            # Late rows (synced from other workers) land in an existing or inserted older bucket
+            position = len(buckets)
+            while position > 0 and buckets[position - 1][0] > bucket_start:
+                position -= 1
+            if position > 0 and buckets[position - 1][0] == bucket_start:
+                bucket = buckets[position - 1]
+            else:
+                bucket = [bucket_start, 0, 0]
+                buckets.insert(position, bucket)
+        bucket[1] += 1
+        if label == "FAKE":
+            bucket[2] += 1
+        horizon = max(timestamp, cluster.last_seen) - 2 * self.max_window
+        while buckets and buckets[0][0] < horizon:
+            buckets.popleft()
+        cluster.size += 1
+        cluster.last_seen = max(cluster.last_seen, timestamp)
+
+    def _evict(self, now):
+        """Drop clusters over the size bound, and ones idle for longer than any window looks back"""
+        while self._clusters:
+            oldest = next(iter(self._clusters.values()))
+            if len(self._clusters) <= self.max_clusters and oldest.last_seen >= now - 2 * self.max_window:
+                break
+            self._clusters.popitem(last=False)
+            self._unindex(oldest)
+            self.evictions += 1
+
+    def _assign(self, vector, timestamp, label, title, news_id):
+        reduced = self._reduce(vector)
+        if reduced is None:
+            return None
+        cluster = self._nearest(reduced)
+        if cluster is None:
+            keys = self._keys(self._margins(reduced)).tolist()
+            cluster = _StoryCluster(self._next_cluster_id, reduced, keys, title, news_id)
+            self._next_cluster_id += 1
+            self._clusters[cluster.cluster_id] = cluster
+            self._index(cluster)
+        else:
+            # Size-weighted update of the unit centroid, re-hashed when it crosses a hyperplane
+            centroid = cluster.centroid * cluster.size + reduced
+            cluster.centroid = centroid / (np.linalg.norm(centroid) or 1.0)
+            keys = self._keys(self._margins(cluster.centroid)).tolist()
+            if keys != cluster.keys:
+                self._unindex(cluster)
+                cluster.keys = keys
+                self._index(cluster)
+            self._clusters.move_to_end(cluster.cluster_id)
+            if news_id < cluster.story_id:
+                # An earlier article (e.g. synced late from another worker) names the story
+                cluster.story_id, cluster.title = news_id, title
+        self._count(cluster, timestamp, label)
+        self._evict(timestamp)
+        return cluster.cluster_id
+
+    def _add_once(self, recent, row_id, news_id, payload):
+        vector, timestamp, label, title = payload
+        with self._lock:
+            if row_id not in recent:
+                recent[row_id] = self._assign(vector, timestamp, label, title, news_id)
+                if len(recent) > self.max_recent_ids:
+                    recent.popitem(last=False)
+            return self._story_id(recent[row_id])
+
+    def _story_id(self, cluster_id):
+        cluster = self._clusters.get(cluster_id)
+        return cluster.story_id if cluster is not None else None
+
+    def add(self, news_id, payload):
+        """Assign a stored article from (vector, timestamp, label, title); returns its story id"""
+        return self._add_once(self._recent_ids, news_id, news_id, payload)
+
+    def record(self, event_id, payload):
+        """Count a repeat submission from (news_id, vector, timestamp, label, title); returns its story id"""
+        news_id, *article = payload
+        return self._add_once(self._recent_events, event_id, news_id, article)
+
+    def sync_events(self, load_rows):
+        """Like sync(), for repeat submissions: load_rows yields (commit_seq, event_id, payload) for NewsEvent rows"""
+        self._events.sync(load_rows)
+
+    def cluster_of(self, news_id):
+        """Story id of an assigned article, or None"""
+        with self._lock:
+            return self._story_id(self._recent_ids.get(news_id))
+
+    def trending(self, now, window_seconds=3600, limit=10, min_count=2):
+        """Clusters with the most articles in the last window, with growth against the window before it"""
+        window_seconds = max(self.bucket_seconds, min(window_seconds, self.max_window))
+        start = now - window_seconds
+        previous_start = start - window_seconds
+        stories = []
+        with self._lock:
+            for cluster in self._clusters.values():
+                if cluster.last_seen < start:
+                    continue
+                count = fake = previous = 0
+                for bucket_start, articles, fake_articles in cluster.buckets:
+                    if bucket_start >= start:
+                        count += articles
+                        fake += fake_articles
+                    elif bucket_start >= previous_start:
+                        previous += articles
+                if count < min_count:
+                    continue
+                stories.append({
+                    'cluster_id': cluster.story_id,
+                    'title': cluster.title,
+                    'leader_news_id': cluster.story_id,
+                    'size': cluster.size,
+                    'count': count,
+                    'previous_count': previous,
+                    'growth_rate': round((count - previous) / previous, 3) if previous else None,
+                    'fake_ratio': round(fake / count, 3)
+                })
+        stories.sort(key=lambda story: (-story['count'], -(story['growth_rate'] or 0.0), story['cluster_id']))
+        return stories[:limit]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'clusters': len(self._clusters),
+                'max_clusters': self.max_clusters,
+                'evictions': self.evictions,
+                'watermark': self.watermark,
+                'event_watermark': self._events.watermark
+            }
@@ -0,0 +1,57 @@
+"""
+Open-vocabulary TF-IDF weights for re-ranking evidence snippets.
+
+Texts are tokenized exactly as the model sees them (the app's cleaning plus
+the production vectorizer's analyzer) and weighted with its fixed IDF
+statistics, so nothing is fitted per request. Unlike the vectorizer itself,
+the vocabulary is open: terms it never kept, which are often exactly the
+claim-specific ones ("microchip", "covid"), get the weight of the rarest
+known term instead of being dropped.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+
+class TermWeights:
+    """The model's analyzer and IDF, with a default IDF for terms outside its vocabulary"""
+
+    def __init__(self, analyzer, vocabulary, idf, default_idf, sublinear_tf=False):
+        self.analyzer = analyzer
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.default_idf = default_idf
+        self.sublinear_tf = sublinear_tf
+
+    @classmethod
+    def from_vectorizer(cls, vectorizer, preprocess=None):
+        """Weights of a fitted TfidfVectorizer; `preprocess` runs before its analyzer (e.g. clean_text)"""
+        analyze = vectorizer.build_analyzer()
+        analyzer = (lambda text: analyze(preprocess(text))) if preprocess is not None else analyze
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        default_idf = float(idf.max()) if idf.size else 1.0
+        return cls(analyzer, dict(vectorizer.vocabulary_), idf, default_idf, vectorizer.sublinear_tf)
+
+    def transform(self, texts):
+        """L2-normalized TF-IDF rows for texts. Unseen terms get columns after the model's vocabulary,
+        shared by all rows of this call, so rows from one call can be compared with each other."""
+        unseen = {}
+        data, indices, indptr = [], [], [0]
+        known = len(self.vocabulary)
+        for text in texts:
+            for term, tf in Counter(self.analyzer(text)).items():
+                column = self.vocabulary.get(term)
+                if column is None:
+                    column = unseen.setdefault(term, known + len(unseen))
+                    idf = self.default_idf
+                else:
+                    idf = self.idf[column]
+                indices.append(column)
+                data.append(((1 + math.log(tf)) if self.sublinear_tf else tf) * idf)
+            indptr.append(len(indices))
+        matrix = csr_matrix((data, indices, indptr), shape=(len(texts), known + len(unseen)), dtype=np.float64)
+        return normalize(matrix, copy=False)
@@ -0,0 +1,67 @@
+"""
+One-pass word and sentence statistics for readability scoring.
+
+The text is split on whitespace once and tallied per distinct word, so
+lengths, syllables, digits and sentence punctuation are looked at once per
+word type rather than once per occurrence (news text repeats the same
+vocabulary heavily). Syllable counts are also memoized across calls.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+
+_SENTENCE_END_RE = re.compile(r'[.!?]')
+# One match per sentence: from its first visible character up to the next terminator
+_SENTENCE_RE = re.compile(r'[^\s.!?][^.!?]*')
+_VOWELS = frozenset('aeiouy')
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word):
+    """Vowel-group syllable approximation (at least 1)"""
+    count = 0
+    on_vowel = False
+    for char in word.lower():
+        is_vowel = char in _VOWELS
+        if is_vowel and not on_vowel:
+            count += 1
+        on_vowel = is_vowel
+    return max(count, 1)
+
+
+def text_statistics(text):
+    """
+    Raw counts for a text from one split into words.
+
+    Per-word work (length, syllables, digits, sentence punctuation) is done
+    once per distinct word and weighted by its frequency. Sentences are the
+    non-blank runs of text between '.', '!' and '?'; `sentence_words` is the
+    number of words inside them (punctuation-only tokens are not words of
+    any sentence).
+    """
+    words = text.split()
+    word_counts = Counter(words)
+    total_length = 0
+    syllables = 0
+    sentence_words = 0
+    has_numbers = False
+    for word, count in word_counts.items():
+        total_length += len(word) * count
+        syllables += count_syllables(word) * count
+        if not has_numbers and any(char.isdigit() for char in word):
+            has_numbers = True
+        if '.' in word or '!' in word or '?' in word:
+            sentence_words += sum(1 for part in _SENTENCE_END_RE.split(word) if part) * count
+        else:
+            sentence_words += count
+
+    return {
+        'word_count': len(words),
+        'total_word_length': total_length,
+        'unique_words': len(word_counts),
+        'syllables': syllables,
+        'has_numbers': has_numbers,
+        'sentence_count': sum(1 for _ in _SENTENCE_RE.finditer(text)),
+        'sentence_words': sentence_words
+    }
@@ -0,0 +1,148 @@
+"""
+Persistent on-disk cache of text extracted from article URLs.
+
+Entries are keyed by normalized URL and keep the ETag / Last-Modified
+validators of the response they were extracted from, so stale entries can
+be revalidated with a conditional GET. The cache is a single SQLite file,
+which lets every gunicorn worker share it.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+_TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_src'}
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """Canonical form of a URL: lowercase scheme/host, no default port, fragment or tracking parameters"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith('utm_') and k.lower() not in _TRACKING_PARAMS]
+    query.sort()
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class ExtractedTextCache:
+    """
+    Size-bounded SQLite cache of extracted article text.
+
+    Entries younger than `fresh_seconds` are served without touching the
+    network; older ones should be revalidated by the caller. When the
+    stored text exceeds `max_bytes`, the least recently used entries are
+    evicted.
+    """
+
+    _EVICTION_CHECK_INTERVAL = 64  # puts between size checks
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, fresh_seconds=3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._local = threading.local()
+        self._puts_since_check = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS url_text (
+                    url TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_url_text_accessed ON url_text (accessed_at)')
+
+    def _connection(self):
+        """One connection per thread; WAL mode so several processes can share the file"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        """Return {'text', 'etag', 'last_modified', 'fresh'} for a cached URL, or None"""
+        key = normalize_url(url)
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT text, etag, last_modified, fetched_at FROM url_text WHERE url = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            with conn:
+                conn.execute('UPDATE url_text SET accessed_at = ? WHERE url = ?', (now, key))
+            text, etag, last_modified, fetched_at = row
+            return {
+                'text': text,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fresh': now - fetched_at < self.fresh_seconds
+            }
+        except sqlite3.Error as e:
+            print(f"URL cache read failed: {e}")
+            return None
+
+    def put(self, url, text, etag=None, last_modified=None):
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO url_text (url, text, etag, last_modified, fetched_at, accessed_at, size) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, text, etag, last_modified, now, now, len(text.encode('utf-8')))
+                )
+            self._puts_since_check += 1
+            if self._puts_since_check >= self._EVICTION_CHECK_INTERVAL:
+                self._puts_since_check = 0
+                self.evict()
+        except sqlite3.Error as e:
+            print(f"URL cache write failed: {e}")
+
+    def touch(self, url):
+        """Mark an entry as freshly revalidated (e.g. after a 304 Not Modified)"""
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('UPDATE url_text SET fetched_at = ?, accessed_at = ? WHERE url = ?',
+                             (time.time(), time.time(), normalize_url(url)))
+        except sqlite3.Error as e:
+            print(f"URL cache update failed: {e}")
+
+    def evict(self):
+        """Drop least recently used entries until the cache is below 90% of max_bytes"""
+        conn = self._connection()
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM url_text').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        with conn:
+            for url, size in conn.execute('SELECT url, size FROM url_text ORDER BY accessed_at').fetchall():
+                if total <= target:
+                    break
+                conn.execute('DELETE FROM url_text WHERE url = ?', (url,))
+                total -= size
+                removed += 1
+        return removed
+
+    def stats(self):
+        conn = self._connection()
+        entries, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM url_text').fetchone()
+        return {'entries': entries, 'bytes': total, 'max_bytes': self.max_bytes}
@@ -0,0 +1,428 @@
+"""
+Write-behind persistence for analyzed articles and user counters.
+
+/predict used to insert its News row and then commit the user's counters in
+two separate transactions per request, which serializes every worker on
+SQLite. Rows and counter increments are now buffered in memory and written
+by a background thread in one bulk transaction per flush.
+
+News ids are handed out up front from blocks reserved in the `id_blocks`
+table, so a request can return its `news_id` before the row is written.
+Because those ids are not in commit order, rows also get a `commit_seq`
+from a CommitSequence, which other workers sync their indexes by.
+"""
+
+import atexit
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError
+
+
+def _ensure_counter(db, name, start_sql='1'):
+    """Create the `id_blocks` table and the named counter row in it (starting at `start_sql`) if missing"""
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS id_blocks (name VARCHAR(64) PRIMARY KEY, next_id INTEGER NOT NULL)'
+        ))
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                f'INSERT INTO id_blocks (name, next_id) SELECT :name, {start_sql} '
+                f'WHERE NOT EXISTS (SELECT 1 FROM id_blocks WHERE name = :name)'
+            ), {'name': name})
+    except IntegrityError:
+        pass  # Another process created it first
+
+
+class IdAllocator:
+    """
+    Hands out unique ids for a table from blocks reserved in the database.
+
+    Each process reserves `block_size` ids at a time with a single UPDATE,
+    so ids are unique across workers without touching the table itself.
+    Ids are not in commit order, and the unused tail of a block is skipped
+    when a process exits.
+    """
+
+    def __init__(self, db, table_name, block_size=100):
+        self.db = db
+        self.table_name = table_name
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._table_ready = False
+
+    def _ensure_table(self):
+        _ensure_counter(self.db, self.table_name)
+        self._table_ready = True
+
+    def _reserve_block(self):
+        if not self._table_ready:
+            self._ensure_table()
+        next_free = f'(SELECT COALESCE(MAX(id), 0) + 1 FROM {self.table_name})'
+        with self.db.engine.begin() as conn:
+            # Never hand out ids below rows inserted without the allocator
+            conn.execute(text(
+                f'UPDATE id_blocks SET next_id = '
+                f'(CASE WHEN next_id > {next_free} THEN next_id ELSE {next_free} END) + :size '
+                f'WHERE name = :name'
+            ), {'size': self.block_size, 'name': self.table_name})
+            end = conn.execute(text('SELECT next_id FROM id_blocks WHERE name = :name'),
+                               {'name': self.table_name}).scalar()
+        self._next, self._end = end - self.block_size, end
+
+    def next_id(self):
+        with self._lock:
+            if self._next >= self._end:
+                self._reserve_block()
+            allocated = self._next
+            self._next += 1
+            return allocated
+
+
+class CommitSequence:
+    """
+    Numbers a table's rows in the order their transactions commit.
+
+    A writing transaction takes its numbers with an UPDATE of a counter row
+    in `id_blocks`, which holds that row's lock until the transaction ends.
+    A transaction that takes numbers after another one therefore commits
+    after it, so a reader that has loaded every row up to number N never
+    sees a lower number appear later. Ids from IdAllocator blocks give no
+    such guarantee, and a rolled-back transaction leaves no hole.
+    """
+
+    def __init__(self, db, table_name, column='commit_seq'):
+        self.db = db
+        self.table_name = table_name
+        self.column = column
+        self.name = f'{table_name}.{column}'
+        self._ready = False
+
+    def ensure(self):
+        """Create the counter, continuing after any numbers already in the table"""
+        if not self._ready:
+            _ensure_counter(self.db, self.name, f'(SELECT COALESCE(MAX({self.column}), 0) + 1 FROM {self.table_name})')
+            self._ready = True
+
+    def stamp(self, session, rows):
+        """Number column-value dicts or model instances inside the session's open transaction"""
+        if not rows:
+            return
+        self.ensure()
+        session.execute(text('UPDATE id_blocks SET next_id = next_id + :count WHERE name = :name'),
+                        {'count': len(rows), 'name': self.name})
+        end = session.execute(text('SELECT next_id FROM id_blocks WHERE name = :name'), {'name': self.name}).scalar()
+        for number, row in enumerate(rows, start=end - len(rows)):
+            if isinstance(row, dict):
+                row[self.column] = number
+            else:
+                setattr(row, self.column, number)
+
+
+class WriteBehindQueue:
+    """
+    Bounded buffer of News rows, NewsEvent links and User counter deltas,
+    flushed in bulk.
+
+    A background thread flushes every `flush_interval` seconds, or sooner
+    once `batch_size` rows are waiting. When `max_pending` rows are already
+    buffered the caller flushes inline before queueing more; if that flush
+    fails the error is raised to the caller and nothing new is queued, so
+    memory stays bounded without dropping writes. A failed flush is retried
+    row by row and rows that fail keep their place for the next flush; only
+    a row that fails on its own `max_attempts` times is set aside in
+    `dead_letters`. The thread starts on first use (after a gunicorn fork)
+    and pending writes are flushed at interpreter exit.
+    """
+
+    def __init__(self, app, db, News, User, NewsEvent, news_sequence, event_sequence, flush_interval=1.0,
+                 batch_size=200, max_pending=2000, max_attempts=3, max_dead_letters=1000):
+        self.app = app
+        self.db = db
+        self.News = News
+        self.User = User
+        self.NewsEvent = NewsEvent
+        self.news_sequence = news_sequence
+        self.event_sequence = event_sequence
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._columns = [column.key for column in News.__table__.columns]
+        self._event_columns = [column.key for column in NewsEvent.__table__.columns]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._rows = OrderedDict()  # news id -> column values
+        self._pending_hashes = {}  # content hash -> id of a queued News row, until it is committed
+        self._events = []  # NewsEvent column values
+        self._counters = {}  # user id -> [predictions, fake, real]
+        self._wake = threading.Event()
+        self._stopped = False
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failures = 0
+        self._attempts = {}  # (kind, id) -> failed attempts at writing that row on its own
+        self.dead_letters = deque(maxlen=max_dead_letters)  # Rows given up on, most recent last
+        self.dead_lettered = 0
+        self.last_flush_ms = 0.0
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='write-behind', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def reserve(self, count=1):
+        """Make room for `count` more rows, flushing inline when the buffer is full.
+        Raises the flush error if the buffer cannot be drained."""
+        self._ensure_started()
+        with self._lock:
+            pending = len(self._rows) + len(self._events)
+        if pending + count > self.max_pending:
+            try:
+                self.flush(raise_errors=True)
+            except Exception:
+                with self._lock:
+                    pending = len(self._rows) + len(self._events)
+                if pending + count > self.max_pending:
+                    raise
+
+    def add_news(self, news):
+        """Queue a News row whose id has already been allocated"""
+        row = {key: getattr(news, key) for key in self._columns if getattr(news, key) is not None}
+        row.setdefault('analyzed_at', datetime.utcnow())
+        self.reserve()
+        with self._lock:
+            self._rows[row['id']] = row
+            if row.get('content_hash'):
+                self._pending_hashes[row['content_hash']] = row['id']
+            pending = len(self._rows) + len(self._events)
+        self._after_add(pending)
+
+    def add_event(self, event):
+        """Queue a NewsEvent linking a repeat submission to its stored article"""
+        row = {key: getattr(event, key) for key in self._event_columns if getattr(event, key) is not None}
+        self.reserve()
+        with self._lock:
+            self._events.append(row)
+            pending = len(self._rows) + len(self._events)
+        self._after_add(pending)
+
+    def _after_add(self, pending):
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def add_user_prediction(self, user_id, label):
+        """Queue one prediction for a user's activity counters"""
+        self._ensure_started()
+        with self._lock:
+            counts = self._counters.setdefault(user_id, [0, 0, 0])
+            counts[0] += 1
+            counts[1 if label == "FAKE" else 2] += 1
+
+    def _make_visible(self, pending):
+        """Flush if `pending` is buffered, or wait for an in-progress flush that may hold it. Returns True if either happened."""
+        if pending:
+            self.flush()
+            return True
+        if self._flush_lock.locked():
+            with self._flush_lock:
+                return True
+        return False
+
+    def pending_news_id(self, content_hash):
+        """Id of a queued (not yet committed) News row with this content hash, or None"""
+        with self._lock:
+            return self._pending_hashes.get(content_hash)
+
+    def wait_for_news(self, news_ids):
+        """Make queued articles readable from the database (read-your-writes for detail views)"""
+        with self._lock:
+            pending = any(news_id in self._rows for news_id in news_ids)
+        return self._make_visible(pending)
+
+    def wait_for_user(self, user_id):
+        """Make a user's queued articles and counters readable from the database"""
+        with self._lock:
+            pending = (user_id in self._counters
+                       or any(row.get('user_id') == user_id for row in self._rows.values())
+                       or any(row.get('user_id') == user_id for row in self._events))
+        return self._make_visible(pending)
+
+    def flush(self, raise_errors=False):
+        """Write everything buffered so far in one transaction. Returns the number of rows written.
+
+        If the transaction fails, the writes are retried one row at a time so a
+        single bad row cannot hold back the rest. Rows that still fail go back
+        on the queue; after `max_attempts` row-specific failures they are moved
+        to `dead_letters` instead. With raise_errors, the error is re-raised
+        when anything had to be put back.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = list(self._rows.values()), OrderedDict()
+                events, self._events = self._events, []
+                counters, self._counters = self._counters, {}
+            if not rows and not events and not counters:
+                return 0
+            started = time.perf_counter()
+            with self.app.app_context():
+                try:
+                    # Counter rows are created on their own connection, before this transaction holds any lock
+                    self.news_sequence.ensure()
+                    self.event_sequence.ensure()
+                    if rows:
+                        self.news_sequence.stamp(self.db.session, rows)
+                        self.db.session.bulk_insert_mappings(self.News, rows)
+                    if events:
+                        self.event_sequence.stamp(self.db.session, events)
+                        self.db.session.bulk_insert_mappings(self.NewsEvent, events)
+                    self._update_counters(counters)
+                    self.db.session.commit()
+                    written, error = rows, None
+                except Exception as e:
+                    self.db.session.rollback()
+                    self.failures += 1
+                    print(f"Write-behind flush failed, retrying row by row: {e}")
+                    written, error = self._flush_rows_individually(rows, events, counters)
+            self._forget_hashes(written)
+            self.flushes += 1
+            self.flushed_rows += len(written)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            if error is not None and raise_errors:
+                raise error
+            return len(written)
+
+    def _update_counters(self, counters):
+        user_table = self.User.__table__
+        for user_id, (predictions, fake, real) in counters.items():
+            self.db.session.execute(
+                user_table.update().where(user_table.c.id == user_id).values(
+                    predictions_made=func.coalesce(user_table.c.predictions_made, 0) + predictions,
+                    fake_detected=func.coalesce(user_table.c.fake_detected, 0) + fake,
+                    real_detected=func.coalesce(user_table.c.real_detected, 0) + real
+                )
+            )
+
+    def _flush_rows_individually(self, rows, events, counters):
+        """Write each row in its own transaction. Returns (News rows written, last error or None)."""
+        written, retry_rows, retry_events = [], [], []
+        error = None
+        unavailable = False
+        for kind, model, sequence, items, retry in (('news', self.News, self.news_sequence, rows, retry_rows),
+                                                    ('event', self.NewsEvent, self.event_sequence, events, retry_events)):
+            for item in items:
+                if unavailable:
+                    retry.append(item)
+                    continue
+                try:
+                    sequence.stamp(self.db.session, [item])
+                    self.db.session.bulk_insert_mappings(model, [item])
+                    self.db.session.commit()
+                except Exception as e:
+                    self.db.session.rollback()
+                    error = e
+                    if isinstance(e, (OperationalError, InterfaceError)):
+                        # The database itself is unavailable; not this row's fault, so no attempt is counted
+                        unavailable = True
+                        retry.append(item)
+                    elif not self._give_up(kind, item, e):
+                        retry.append(item)
+                    continue
+                self._attempts.pop((kind, item.get('id')), None)
+                if kind == 'news':
+                    written.append(item)
+        retry_counters = {}
+        if counters and not unavailable:
+            try:
+                self._update_counters(counters)
+                self.db.session.commit()
+            except Exception as e:
+                self.db.session.rollback()
+                error, retry_counters = e, counters
+        else:
+            retry_counters = counters
+        self._requeue(retry_rows, retry_events, retry_counters)
+        return written, error if (retry_rows or retry_events or retry_counters) else None
+
+    def _give_up(self, kind, item, error):
+        """Count a failed attempt at writing a row; after max_attempts move it to the dead letters"""
+        key = (kind, item.get('id'))
+        attempts = self._attempts.get(key, 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[key] = attempts
+            return False
+        self._attempts.pop(key, None)
+        self.dead_letters.append({'kind': kind, 'row': item, 'error': str(error)})
+        self.dead_lettered += 1
+        print(f"Write-behind giving up on {kind} {item.get('id')} after {attempts} attempts: {error}")
+        if kind == 'news':
+            self._forget_hashes([item])
+        return True
+
+    def _forget_hashes(self, rows):
+        with self._lock:
+            for row in rows:
+                if self._pending_hashes.get(row.get('content_hash')) == row['id']:
+                    del self._pending_hashes[row['content_hash']]
+
+    def _requeue(self, rows, events, counters):
+        """Put failed writes back, ahead of anything queued meanwhile, for the next flush.
+        Nothing is dropped here: their ids were already handed out, and reserve() stops
+        new writes from growing the buffer while flushes keep failing."""
+        with self._lock:
+            merged = OrderedDict((row['id'], row) for row in rows)
+            merged.update(self._rows)
+            self._rows = merged
+            self._events = events + self._events
+            for user_id, deltas in counters.items():
+                counts = self._counters.setdefault(user_id, [0, 0, 0])
+                for i, delta in enumerate(deltas):
+                    counts[i] += delta
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Write-behind flush error: {e}")
+
+    def close(self):
+        """Stop the background thread and write whatever is still buffered"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._rows)
+            pending_events = len(self._events)
+            pending_users = len(self._counters)
+        return {
+            'pending_rows': pending,
+            'pending_events': pending_events,
+            'pending_user_updates': pending_users,
+            'max_pending': self.max_pending,
+            'flush_interval': self.flush_interval,
+            'flushes': self.flushes,
+            'flushed_rows': self.flushed_rows,
+            'failures': self.failures,
+            'dead_lettered': self.dead_lettered,
+            'last_flush_ms': self.last_flush_ms
+        }
@@ -0,0 +1,85 @@
+"""
+Compare the streaming article extractor with the previous BeautifulSoup
+extraction over a folder of saved HTML pages.
+
+Usage:
+    python benchmarks/bench_html_extraction.py path/to/html_pages [--repeat 3] [--max-kb 2048]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from html_extraction import extract_article_text  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except Exception:
+    BeautifulSoup = None
+
+
+def soup_extract(raw):
+    """The old extract_text_from_url(): whole page, full tree, every string"""
+    soup = BeautifulSoup(raw.decode('utf-8', errors='replace'), "html.parser")
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return " ".join(soup.stripped_strings)
+
+
+def streaming_extract(raw, max_bytes, chunk_size=64 * 1024):
+    """The new path, fed in network-sized chunks up to the byte cap"""
+    raw = raw[:max_bytes]
+    chunks = (raw[i:i + chunk_size].decode('utf-8', errors='replace') for i in range(0, len(raw), chunk_size))
+    return extract_article_text(chunks)
+
+
+def measure(extract, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [extract(raw) for raw in pages]
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    for raw in pages:
+        extract(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, sum(len(text) for text in outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML article extraction")
+    parser.add_argument('folder', help="Folder with saved .html/.htm pages")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-kb', type=int, default=2048, help="Byte cap for the streaming extractor")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.folder, '*.htm*')))
+    if not paths:
+        print(f"❌ No HTML files found in {args.folder}")
+        return
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    print(f"📄 {len(pages)} pages, {sum(len(p) for p in pages) / 1024:.0f} KB total")
+
+    results = {'streaming': measure(lambda raw: streaming_extract(raw, args.max_kb * 1024), pages, args.repeat)}
+    if BeautifulSoup is not None:
+        results['beautifulsoup'] = measure(soup_extract, pages, args.repeat)
+    else:
+        print("⚠️ bs4 not installed, skipping the BeautifulSoup baseline")
+
+    for name, (seconds, peak, chars) in results.items():
+        print(f"{name:>14}: {seconds * 1000:8.1f} ms  peak {peak / 1024:8.0f} KB  {chars:>9} chars extracted")
+    if len(results) == 2:
+        print(f"⚡ Speedup: {results['beautifulsoup'][0] / results['streaming'][0]:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
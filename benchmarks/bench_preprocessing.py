@@ -0,0 +1,77 @@
+"""
+Compare AdvancedTextPreprocessor.preprocess_text(), which shares one
+AnalyzedDocument between the feature extractors, with the previous flow
+where every extractor tokenized, tagged and parsed the article on its own.
+
+Usage:
+    python benchmarks/bench_preprocessing.py path/to/articles [--repeat 3] [--no-spacy]
+
+The folder holds one article per .txt file.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from advanced_preprocessing import AdvancedTextPreprocessor, AnalyzedDocument  # noqa: E402
+
+
+def separate_documents(preprocessor, text):
+    """The old flow: a fresh document (new tokenization/TextBlob/spaCy doc) for every extractor"""
+    processed = preprocessor._advanced_cleaning(preprocessor._basic_cleaning(text))
+    new_doc = lambda: AnalyzedDocument(text, preprocessor.nlp)  # noqa: E731
+    features = {}
+    features.update(preprocessor._basic_statistics(new_doc(), processed))
+    features.update(preprocessor._linguistic_features(new_doc()))
+    features.update(preprocessor._sentiment_features(new_doc()))
+    features.update(preprocessor._fake_news_indicators(text))
+    features.update(preprocessor._credibility_indicators(text))
+    features.update(preprocessor._readability_features(new_doc()))
+    if preprocessor.nlp:
+        features.update(preprocessor._spacy_features(new_doc()))
+    return processed, features
+
+
+def measure(preprocess, articles, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [preprocess(text) for text in articles]
+        best = min(best, time.perf_counter() - start)
+    return best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-article feature extraction")
+    parser.add_argument('folder', help="Folder with one article per .txt file")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-spacy', action='store_true', help="Skip the spaCy features")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.folder, '*.txt')))
+    if not paths:
+        print(f"❌ No .txt files found in {args.folder}")
+        return
+    articles = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            articles.append(f.read())
+    print(f"📄 {len(articles)} articles, {sum(len(a.split()) for a in articles)} words total")
+
+    preprocessor = AdvancedTextPreprocessor(use_spacy=not args.no_spacy)
+    shared_seconds, shared = measure(preprocessor.preprocess_text, articles, args.repeat)
+    separate_seconds, separate = measure(lambda text: separate_documents(preprocessor, text), articles, args.repeat)
+
+    for name, seconds in (('separate', separate_seconds), ('shared', shared_seconds)):
+        print(f"{name:>9}: {seconds * 1000:8.1f} ms total  {seconds * 1000 / len(articles):7.2f} ms/article")
+    print(f"⚡ Speedup: {separate_seconds / shared_seconds:.1f}x")
+    if shared != separate:
+        print("⚠️ Feature values differ between the two flows")
+
+
+if __name__ == '__main__':
+    main()
@@ -1423,22 +1423,80 @@ async function verifyWithSourcesHybrid() {
     list.innerHTML = '<p>Running hybrid search across news, gov, scholarly, fact-check…</p>';
     card.classList.remove('hidden');
     try {
-        const res = await fetch('/verify/hybrid', {
+        const res = await fetch('/verify/hybrid/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             credentials: 'include',
             body: JSON.stringify({ news: text })
         });
-        const data = await res.json();
         if (!res.ok) {
+            const data = await res.json();
             throw new Error(data.error || 'Hybrid verification failed');
         }
-        renderHybridResults(data);
+        if (!res.body || !res.body.getReader) {
+            // Streaming not supported by this browser: fall back to the single JSON response
+            return await verifyWithSourcesHybridOnce(text);
+        }
+        // Render each source group as soon as the server streams it
+        const payload = { query: '', results: { all: [], news: [], gov: [], fact_check: [], scholarly: [], local: [] } };
+        await readServerSentEvents(res.body, (event, data) => {
+            if (event === 'error') {
+                throw new Error(data.error || 'Hybrid verification failed');
+            }
+            if (event === 'query') {
+                payload.query = data.query;
+                return;
+            }
+            if (event in payload.results) {
+                payload.results[event] = data.items || [];
+                renderHybridResults(payload);
+            }
+        });
     } catch (err) {
         list.innerHTML = `<p style="color:#dc3545;">${err.message}</p>`;
     }
 }
 
+async function verifyWithSourcesHybridOnce(text) {
+    const res = await fetch('/verify/hybrid', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: 'include',
+        body: JSON.stringify({ news: text })
+    });
+    const data = await res.json();
+    if (!res.ok) {
+        throw new Error(data.error || 'Hybrid verification failed');
+    }
+    renderHybridResults(data);
+}
+
+// Minimal Server-Sent Events parser for fetch() response bodies (EventSource cannot POST)
+async function readServerSentEvents(body, onEvent) {
+    const reader = body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            const dataLines = [];
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (dataLines.length) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
 function renderHybridResults(payload) {
     const { query, results } = payload || {};
     const card = document.getElementById('verifyHybridCard');
@@ -1454,7 +1512,8 @@ function renderHybridResults(payload) {
         news: (results && results.news ? results.news.length : 0),
         gov: (results && results.gov ? results.gov.length : 0),
         fact_check: (results && results.fact_check ? results.fact_check.length : 0),
-        scholarly: (results && results.scholarly ? results.scholarly.length : 0)
+        scholarly: (results && results.scholarly ? results.scholarly.length : 0),
+        local: (results && results.local ? results.local.length : 0)
     };
     tabs.forEach(btn => {
         const key = btn.getAttribute('data-tab');
@@ -1512,7 +1571,8 @@ function updateHybridAllSections(container, results) {
         { key: 'news', title: '📰 News' },
         { key: 'gov', title: '🏛️ Government' },
         { key: 'fact_check', title: '✅ Fact-check' },
-        { key: 'scholarly', title: '📚 Scholarly' }
+        { key: 'scholarly', title: '📚 Scholarly' },
+        { key: 'local', title: '🗂️ Local archive' }
     ];
     sections.forEach(sec => {
         const items = (results && results[sec.key]) || [];
@@ -1637,18 +1697,33 @@ function viewNewsDetails(newsId) {
 
 
 
-// News history functionality
-async function loadUserHistory(page = 1) {
+// News history functionality (keyset pagination: one cursor per visited page)
+let historyCursors = [''];
+let historyTotalPages = null;
+
+async function loadUserHistory(pageIndex = 0) {
     try {
-        const response = await fetch(`/news/history?page=${page}&per_page=10`, {
+        if (pageIndex === 0) {
+            historyCursors = [''];
+        }
+        // Only the first page asks for the total; later pages skip the COUNT
+        const includeTotal = pageIndex === 0 ? '&include_total=1' : '';
+        const after = encodeURIComponent(historyCursors[pageIndex]);
+        const response = await fetch(`/news/history?after=${after}&per_page=10${includeTotal}`, {
             credentials: 'include'
         });
 
         const result = await response.json();
         
         if (response.ok) {
+            if (result.pagination.total !== undefined) {
+                historyTotalPages = Math.max(1, Math.ceil(result.pagination.total / result.pagination.per_page));
+            }
+            if (result.pagination.next_cursor) {
+                historyCursors[pageIndex + 1] = result.pagination.next_cursor;
+            }
             displayNewsHistory(result);
-            updatePagination(result.pagination);
+            updatePagination(result.pagination, pageIndex);
         } else {
             console.error('Failed to load history:', result.error);
         }
@@ -1688,18 +1763,18 @@ function displayNewsHistory(historyData) {
     newsHistory.innerHTML = historyHTML;
 }
 
-function updatePagination(pagination) {
+function updatePagination(pagination, pageIndex) {
     const btnPrev = document.getElementById('btnPrevPage');
     const btnNext = document.getElementById('btnNextPage');
     const pageInfo = document.getElementById('pageInfo');
     
-    btnPrev.disabled = !pagination.has_prev;
+    btnPrev.disabled = pageIndex === 0;
     btnNext.disabled = !pagination.has_next;
-    pageInfo.textContent = `Page ${pagination.page} of ${pagination.pages}`;
+    pageInfo.textContent = historyTotalPages ? `Page ${pageIndex + 1} of ${historyTotalPages}` : `Page ${pageIndex + 1}`;
     
     // Store current page for navigation
-    btnPrev.onclick = () => loadUserHistory(pagination.page - 1);
-    btnNext.onclick = () => loadUserHistory(pagination.page + 1);
+    btnPrev.onclick = () => loadUserHistory(pageIndex - 1);
+    btnNext.onclick = () => loadUserHistory(pageIndex + 1);
 }
 
 
@@ -1734,7 +1809,7 @@ function toggleHistoryView() {
     if (historyCard.classList.contains('hidden')) {
         historyCard.classList.remove('hidden');
         toggleBtn.textContent = '📚 Hide History';
-        loadUserHistory(1);
+        loadUserHistory(0);
     } else {
         historyCard.classList.add('hidden');
         toggleBtn.textContent = '📚 View History';
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Bulk URL ingestion for Fake News Detection app
+
+Fetches a file of article URLs concurrently (with per-domain politeness
+limits), extracts and scores them with the loaded model, and stores the
+results in the News table in batches.
+
+Usage:
+    python ingest_urls.py urls.txt [--workers 16] [--per-domain 2] [--delay 1.0] [--batch-size 200] [--skip-existing]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Import the app the same way wsgi.py does so the same database and model are used
+project_root = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.join(project_root, 'backend')
+sys.path.insert(0, backend_dir)
+os.chdir(backend_dir)
+
+from app import (app, db, News, is_url, fetch_url_text, clean_text,  # noqa: E402
+                 score_articles, build_news_record, index_stored_news, sync_simhash_index)
+
+
+class DomainThrottle:
+    """Caps concurrent fetches per domain and spaces out their start times"""
+
+    def __init__(self, max_per_domain=2, min_interval=1.0):
+        self.max_per_domain = max_per_domain
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, domain):
+        with self._lock:
+            semaphore = self._semaphores.get(domain)
+            if semaphore is None:
+                semaphore = self._semaphores[domain] = threading.BoundedSemaphore(self.max_per_domain)
+        with semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(domain, now))
+                self._next_start[domain] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def read_urls(path):
+    """Unique http(s) URLs from a file, one per line ('#' starts a comment)"""
+    urls = OrderedDict()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#') and is_url(url):
+                urls[url] = None
+    return list(urls)
+
+
+def interleave_by_domain(urls):
+    """Round-robin URLs across domains so one large publisher does not tie up every worker"""
+    queues = OrderedDict()
+    for url in urls:
+        queues.setdefault(urlparse(url).hostname or '', deque()).append(url)
+    ordered = []
+    while queues:
+        for domain in list(queues):
+            ordered.append(queues[domain].popleft())
+            if not queues[domain]:
+                del queues[domain]
+    return ordered
+
+
+def existing_urls(urls, chunk_size=500):
+    """URLs already stored as News.original_source"""
+    found = set()
+    for start in range(0, len(urls), chunk_size):
+        chunk = urls[start:start + chunk_size]
+        found.update(row[0] for row in db.session.query(News.original_source).filter(News.original_source.in_(chunk)))
+    return found
+
+
+def fetch_article(url, throttle):
+    """Return (url, resolved_text, cleaned) using the same extraction as /predict"""
+    with throttle.slot(urlparse(url).hostname or ''):
+        text = fetch_url_text(url)
+    if text is None:
+        raise ValueError("Download or extraction failed")
+    cleaned = clean_text(text)
+    if not cleaned:
+        raise ValueError("No analyzable text")
+    return url, text, cleaned
+
+
+def store_batch(batch, totals):
+    """Score a batch of fetched articles in one model call and insert them in one transaction"""
+    try:
+        scored = score_articles([cleaned for _, _, cleaned in batch])
+        records = []
+        for (url, text, _), (analysis, label, confidence, interpretability_data) in zip(batch, scored):
+            records.append((build_news_record(url, text, analysis, label, confidence, 'url', interpretability_data), analysis))
+        db.session.add_all(news for news, _ in records)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        totals['failed'] += len(batch)
+        print(f"❌ Failed to store batch of {len(batch)}: {e}")
+        return
+    # Only committed rows are indexed; later articles in the run can join their near-duplicate clusters
+    for news, analysis in records:
+        index_stored_news(news, analysis)
+    totals['stored'] += len(records)
+    for news, _ in records:
+        totals[news.prediction] = totals.get(news.prediction, 0) + 1
+
+
+def ingest(urls, workers=16, per_domain=2, delay=1.0, batch_size=200):
+    throttle = DomainThrottle(max_per_domain=per_domain, min_interval=delay)
+    totals = {'stored': 0, 'failed': 0}
+    pending_urls = iter(interleave_by_domain(urls))
+    batch = []
+    in_flight = {}  # future -> url
+    started = time.time()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+        def submit_more():
+            # Bounded look-ahead keeps memory flat for very large URL lists
+            while len(in_flight) < workers * 4:
+                url = next(pending_urls, None)
+                if url is None:
+                    return
+                in_flight[executor.submit(fetch_article, url, throttle)] = url
+
+        submit_more()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = in_flight.pop(future)
+                try:
+                    batch.append(future.result())
+                except Exception as e:
+                    totals['failed'] += 1
+                    print(f"⚠️ Skipped {url}: {e}")
+            submit_more()
+            # Several downloads can finish together; never store more than batch_size per transaction
+            while len(batch) >= batch_size:
+                store_batch(batch[:batch_size], totals)
+                batch = batch[batch_size:]
+                elapsed = time.time() - started
+                print(f"📦 {totals['stored']} stored, {totals['failed']} failed ({elapsed:.0f}s)")
+        if batch:
+            store_batch(batch, totals)
+
+    totals['seconds'] = round(time.time() - started, 1)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, score and store a list of article URLs")
+    parser.add_argument('url_file', help="Text file with one URL per line")
+    parser.add_argument('--workers', type=int, default=16, help="Concurrent downloads")
+    parser.add_argument('--per-domain', type=int, default=2, help="Concurrent downloads per domain")
+    parser.add_argument('--delay', type=float, default=1.0, help="Seconds between request starts to one domain")
+    parser.add_argument('--batch-size', type=int, default=200, help="Articles scored and inserted per transaction")
+    parser.add_argument('--skip-existing', action='store_true', help="Skip URLs already stored in the database")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        sync_simhash_index()
+        urls = read_urls(args.url_file)
+        if args.skip_existing:
+            already = existing_urls(urls)
+            urls = [url for url in urls if url not in already]
+            print(f"⏭️  Skipping {len(already)} URLs already in the database")
+        print(f"🌐 Ingesting {len(urls)} URLs with {args.workers} workers")
+        totals = ingest(urls, workers=args.workers, per_domain=args.per_domain,
+                        delay=args.delay, batch_size=args.batch_size)
+
+    print(f"✅ Done in {totals.pop('seconds')}s: {totals}")
+
+
+if __name__ == '__main__':
+    main()
@@ -53,13 +53,47 @@ class News(db.Model):
     emotional_indicators = db.Column(db.Integer)
     
     # Vector representation for similarity search
-    content_vector = db.Column(db.Text)  # JSON string of TF-IDF vector
+    content_vector_sparse = db.Column(db.LargeBinary)  # Compact sparse TF-IDF vector
+    content_vector = db.Column(db.Text)  # Legacy JSON dense vector; rewritten by migrate_db.py
     
     # Related news tracking
     related_news_ids = db.Column(db.Text)  # JSON string of related article IDs
     
+    # Duplicate detection: identical cleaned text or URL under the same model is analyzed once
+    content_hash = db.Column(db.String(64))  # sha256 of cleaned_content
+    canonical_url = db.Column(db.String(1000))  # Normalized original_source for URL inputs
+    model_version = db.Column(db.String(20))  # Model that produced the prediction
+    vocabulary_version = db.Column(db.String(20))  # Vectorizer that produced content_vector_sparse
+    simhash = db.Column(db.BigInteger)  # 64-bit SimHash of cleaned_content (signed, see near_duplicates.py)
+    minhash = db.Column(db.LargeBinary)  # MinHash signature of cleaned_content, confirms wider SimHash matches
+    cluster_id = db.Column(db.Integer)  # Id of the first article in its near-duplicate cluster
+    commit_seq = db.Column(db.BigInteger)  # Commit order across workers, which indexes sync by (see write_behind.py)
+    
     user = db.relationship('User', backref='news_articles')
 
+    __table_args__ = (
+        # Serves per-user history ordered by time, including keyset pagination
+        db.Index('ix_news_user_analyzed_at', 'user_id', 'analyzed_at', 'id'),
+        db.Index('ix_news_content_hash', 'content_hash', 'model_version'),
+        db.Index('ix_news_canonical_url', 'canonical_url', 'model_version'),
+        db.Index('ix_news_cluster_id', 'cluster_id'),
+        db.Index('ix_news_commit_seq', 'commit_seq'),
+    )
+
+# A submission that reused an already analyzed article instead of storing a copy
+class NewsEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    news_id = db.Column(db.Integer, db.ForeignKey('news.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    source_type = db.Column(db.String(20), nullable=False)  # text or url
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    commit_seq = db.Column(db.BigInteger)  # Commit order across workers (see write_behind.py)
+
+    __table_args__ = (
+        db.Index('ix_news_event_user_submitted_at', 'user_id', 'submitted_at', 'id'),
+        db.Index('ix_news_event_commit_seq', 'commit_seq'),
+    )
+
 def init_database():
     with app.app_context():
         # Create all tables
@@ -69,6 +103,7 @@ def init_database():
         print("Tables created:")
         print("- users")
         print("- news")
+        print("- news_event")
         
         # Check if tables exist
         from sqlalchemy import inspect
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Database migration tool for Fake News Detection app
+
+Adds columns and indexes introduced after the database was created, rewrites
+legacy JSON content vectors into the compact sparse encoding, numbers older
+rows in commit order for index syncing, records which vocabulary the served
+model's articles were vectorized with and fingerprints older articles for
+near-duplicate detection.
+
+Usage:
+    python migrate_db.py [--batch-size 500] [--no-vacuum]
+"""
+
+import argparse
+import os
+import sys
+
+# Import the app the same way wsgi.py does so the same database is used
+project_root = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.join(project_root, 'backend')
+sys.path.insert(0, backend_dir)
+os.chdir(backend_dir)
+
+from app import (app, db, News, NewsEvent, article_fingerprint, simhash_index, sync_simhash_index,  # noqa: E402
+                 news_commit_sequence, news_event_commit_sequence, model_artifacts)
+from db_migrations import (add_missing_columns, add_missing_indexes, migrate_content_vectors,  # noqa: E402
+                           backfill_commit_sequences, backfill_fingerprints, backfill_vocabulary_versions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the Fake News Detection database")
+    parser.add_argument('--batch-size', type=int, default=500, help="Rows converted per transaction")
+    parser.add_argument('--no-vacuum', action='store_true', help="Skip VACUUM after converting (SQLite only)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+        added = add_missing_columns(db)
+        print(f"🧱 Added columns: {', '.join(added) if added else 'none'}")
+
+        indexes = add_missing_indexes(db)
+        print(f"📇 Added indexes: {', '.join(indexes) if indexes else 'none'}")
+
+        converted = migrate_content_vectors(db, News, batch_size=args.batch_size)
+        print(f"🗜️  Converted {converted} content vectors to sparse encoding")
+
+        sequenced = (backfill_commit_sequences(db, News, news_commit_sequence, batch_size=args.batch_size)
+                     + backfill_commit_sequences(db, NewsEvent, news_event_commit_sequence, batch_size=args.batch_size))
+        print(f"🔢 Numbered {sequenced} rows in commit order")
+
+        tagged = backfill_vocabulary_versions(db, News, model_artifacts.version, model_artifacts.vocabulary_version)
+        print(f"🏷️  Tagged {tagged} articles with the served model's vocabulary")
+
+        sync_simhash_index()
+        fingerprinted = backfill_fingerprints(db, News, article_fingerprint, simhash_index, batch_size=args.batch_size)
+        print(f"🧬 Fingerprinted {fingerprinted} articles for near-duplicate detection")
+
+        if converted and not args.no_vacuum and db.engine.dialect.name == 'sqlite':
+            print("🧹 Reclaiming space (VACUUM)...")
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql('VACUUM')
+
+    print("✅ Migration complete")
+
+
+if __name__ == '__main__':
+    main()
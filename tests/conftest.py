@@ -0,0 +1,105 @@
+import functools
+import http.server
+import os
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+sys.path.insert(0, ROOT)
+
+# The app reads its configuration at import time, so point every store at a scratch directory first
+_SCRATCH = tempfile.mkdtemp(prefix='fakenews-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_SCRATCH, 'app.db')
+os.environ['URL_CACHE_PATH'] = os.path.join(_SCRATCH, 'url_text.sqlite3')
+os.environ['EVIDENCE_CACHE_PATH'] = os.path.join(_SCRATCH, 'evidence.sqlite3')
+os.environ['SECRET_KEY'] = 'test-secret-key-for-the-test-suite-only'
+os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret-key-for-the-test-suite-only'
+os.environ['HTTP_RETRIES'] = '0'
+
+FIXTURE_PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+
+class _StubHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so connection reuse is observable
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?', 1)[0]
+        with server.lock:
+            server.hits[path] += 1
+            server.client_ports.append(self.client_address[1])
+            server.requests.append((self.headers.get('Host'), path))
+            responses = server.routes.get(path)
+            response = responses.pop(0) if responses and len(responses) > 1 else (responses[0] if responses else None)
+        if response is None:
+            return super().do_GET()  # Fixture pages
+        status, body = response
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    """Local HTTP server serving the fixture pages plus scripted (status, body) responses per path"""
+
+    daemon_threads = True
+
+    def __init__(self, directory):
+        super().__init__(('127.0.0.1', 0), functools.partial(_StubHandler, directory=directory))
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.hits = defaultdict(int)
+        self.client_ports = []
+        self.requests = []
+
+    def script(self, path, *responses):
+        """Answer `path` with these (status, body) pairs in turn, repeating the last one"""
+        with self.lock:
+            self.routes[path] = list(responses)
+
+    def url(self, path, host='127.0.0.1'):
+        return f"http://{host}:{self.server_port}{path}"
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer(FIXTURE_PAGES)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    import app as app_module
+    with app_module.app.app_context():
+        app_module.db.create_all()
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def logged_in_client(app_module, client):
+    import uuid
+    username = f"user_{uuid.uuid4().hex[:8]}"
+    client.post('/register', json={'username': username, 'email': f"{username}@example.com", 'password': 'secret-pass'})
+    response = client.post('/login', json={'username': username, 'password': 'secret-pass'})
+    assert response.status_code == 200
+    return client
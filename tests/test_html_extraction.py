@@ -0,0 +1,51 @@
+from html_extraction import ArticleTextParser, extract_article_text
+
+PARAGRAPH = "The regional water board approved a plan on Wednesday to repair the aging reservoir dam before winter."
+
+
+def test_closed_paragraphs_are_collected_without_chrome():
+    html = (f"<html><body><nav>Home | World</nav><h1>Dam repairs approved</h1><p>{PARAGRAPH}</p>"
+            f"<p>Work starts next month.</p><footer>Subscribe now</footer></body></html>")
+
+    assert extract_article_text([html], min_body_chars=10) == f"Dam repairs approved {PARAGRAPH} Work starts next month."
+
+
+def test_unclosed_paragraphs_end_at_the_next_block():
+    html = (f"<html><body><h1>Dam repairs approved</h1><p>{PARAGRAPH}<p>Work starts next month."
+            f"<div class=share>Share this story</div><nav>Home | World</nav><footer>Subscribe now</footer></body></html>")
+    parser = ArticleTextParser()
+    parser.feed(html)
+
+    # Each implicitly closed paragraph is flushed as its own block
+    assert parser._blocks == ['Dam repairs approved', PARAGRAPH, 'Work starts next month.']
+    text = parser.text(min_body_chars=10)
+    assert 'Home' not in text and 'Subscribe' not in text and 'Share' not in text
+
+
+def test_unclosed_paragraphs_still_stop_early():
+    chunks = [f"<p>{PARAGRAPH}"] * 50 + ["<p>never reached"]
+    parser = ArticleTextParser(max_chars=300)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+
+    assert parser.done
+    assert 'never reached' not in parser.text()
+
+
+def test_paragraphs_inside_a_blockquote_form_one_block():
+    html = f"<blockquote><p>{PARAGRAPH}<p>Officials agreed.</blockquote><p>After the quote."
+
+    parser = ArticleTextParser()
+    parser.feed(html)
+
+    assert parser._blocks == [f"{PARAGRAPH} Officials agreed."]
+    assert parser.text(min_body_chars=10).endswith('After the quote.')
+
+
+def test_heading_ends_an_open_heading_and_paragraph():
+    parser = ArticleTextParser()
+    parser.feed(f"<h1>Dam repairs<h2>Board vote<p>{PARAGRAPH}<h3>Next steps</h3>")
+
+    assert parser.text(min_body_chars=10) == f"Dam repairs Board vote {PARAGRAPH} Next steps"
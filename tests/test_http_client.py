@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from http_client import CircuitBreaker, CircuitOpenError, HttpClient
+
+
+def test_connections_are_pooled_and_reused(stub_server):
+    client = HttpClient(retries=0)
+    for _ in range(5):
+        response = client.get(stub_server.url('/article1.html'), timeout=5)
+        assert response.status_code == 200
+        response.content
+
+    assert len(set(stub_server.client_ports)) == 1
+    pool = client.stats()['pools'][f"http://127.0.0.1:{stub_server.server_port}"]
+    assert pool['connections_opened'] == 1
+    assert pool['requests'] == 5
+
+
+def test_5xx_is_retried_with_backoff(stub_server):
+    stub_server.script('/flaky', (503, 'down'), (503, 'down'), (200, '<p>back</p>'))
+    client = HttpClient(retries=2, backoff_factor=0.1)
+
+    started = time.monotonic()
+    response = client.get(stub_server.url('/flaky'), timeout=5)
+
+    assert response.status_code == 200
+    assert stub_server.hits['/flaky'] == 3
+    assert time.monotonic() - started >= 0.1  # Slept between attempts
+    # Retries happen below the breaker: the call as a whole is one success
+    snapshot = client.breaker(f"127.0.0.1:{stub_server.server_port}").snapshot()
+    assert snapshot['total_successes'] == 1
+    assert snapshot['total_failures'] == 0
+
+
+def test_retries_are_bounded(stub_server):
+    stub_server.script('/down', (503, 'down'))
+    client = HttpClient(retries=1, backoff_factor=0)
+
+    response = client.get(stub_server.url('/down'), timeout=5)
+
+    assert response.status_code == 503
+    assert stub_server.hits['/down'] == 2
+    assert client.breaker(f"127.0.0.1:{stub_server.server_port}").snapshot()['total_failures'] == 1
+
+
+def test_breaker_opens_fails_fast_then_half_opens_and_closes(stub_server):
+    stub_server.script('/engine', (503, 'down'), (503, 'down'), (200, '<p>ok</p>'))
+    client = HttpClient(retries=0, failure_threshold=2, reset_timeout=0.2)
+    url = stub_server.url('/engine')
+
+    assert client.get(url, engine='search', timeout=5).status_code == 503
+    assert client.get(url, engine='search', timeout=5).status_code == 503
+    assert client.breaker('search').state == CircuitBreaker.OPEN
+
+    # Open: refused without touching the upstream
+    with pytest.raises(CircuitOpenError):
+        client.get(url, engine='search', timeout=5)
+    assert stub_server.hits['/engine'] == 2
+    assert client.breaker('search').snapshot()['rejected'] == 1
+
+    # After the reset timeout one trial request goes through and closes the breaker
+    time.sleep(0.25)
+    assert client.get(url, engine='search', timeout=5).status_code == 200
+    snapshot = client.breaker('search').snapshot()
+    assert snapshot['state'] == CircuitBreaker.CLOSED
+    assert snapshot['consecutive_failures'] == 0
+
+
+def test_half_open_allows_a_single_trial_and_reopens_on_failure():
+    breaker = CircuitBreaker('engine', failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # Trial already in flight
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_upstreams_status_reports_breakers_and_pools(app_module, logged_in_client, stub_server):
+    app_module.http_client.get(stub_server.url('/article2.html'), timeout=5).close()
+
+    response = logged_in_client.get('/upstreams/status')
+
+    assert response.status_code == 200
+    status = response.get_json()
+    host = f"127.0.0.1:{stub_server.server_port}"
+    assert status['breakers'][host]['state'] == 'closed'
+    assert status['breakers'][host]['total_successes'] >= 1
+    assert set(status['pools'][f"http://{host}"]) == {'connections_opened', 'requests', 'available_slots', 'max_size'}
+    assert 'evidence_cache' in status
+
+
+def test_upstreams_status_requires_login(client):
+    assert client.get('/upstreams/status').status_code != 200
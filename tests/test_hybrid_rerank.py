@@ -0,0 +1,45 @@
+def test_claim_terms_outside_the_model_vocabulary_still_match(app_module):
+    # "microchip" is not among the production vectorizer's features
+    assert 'microchip' not in app_module.model_artifacts.vectorizer.vocabulary_
+    items = [
+        {'title': 'Reuters', 'snippet': 'vaccine microchip', 'credibility': 0.9},
+        {'title': 'Weather', 'snippet': 'sunny skies expected across the region', 'credibility': 0.9},
+    ]
+
+    ranked = app_module._hybrid_rerank('vaccine microchip claim spreads online', items)
+
+    assert ranked[0]['snippet'] == 'vaccine microchip'
+    assert ranked[0]['similarity'] > 0.5
+    assert ranked[1]['similarity'] == 0.0
+
+
+def test_terms_are_weighted_the_way_the_model_sees_them(app_module):
+    weights = app_module.model_artifacts.rerank_weights
+    rows = weights.transform(['which of the these were', 'which were these of the', 'Vaccine claims in 2021', 'vaccine claims'])
+
+    # Stop words and digits are dropped like clean_text and the vectorizer drop them
+    assert rows[0].nnz == rows[1].nnz == 0
+    assert (rows[2] - rows[3]).nnz == 0
+
+
+def test_batch_scores_each_list_against_its_own_query(app_module):
+    first, second = app_module._hybrid_rerank_batch([
+        ('senate budget vote', [{'title': 'Senate', 'snippet': 'budget vote'}, {'title': 'Comet', 'snippet': 'visible tonight'}]),
+        ('comet visible tonight', [{'title': 'Comet', 'snippet': 'visible tonight'}]),
+    ])
+
+    assert [item['similarity'] for item in first] == [1.0, 0.0]
+    assert second[0]['similarity'] == 1.0
+
+
+def test_rerank_combines_similarity_and_credibility(app_module):
+    items = [
+        {'title': 'Senate', 'snippet': 'budget vote', 'source': 'blog', 'credibility': 0.1},
+        {'title': 'Senate', 'snippet': 'budget vote', 'source': 'agency', 'credibility': 0.9},
+    ]
+
+    ranked = app_module._hybrid_rerank('senate budget vote', items)
+
+    assert [item['source'] for item in ranked] == ['agency', 'blog']
+    assert ranked[0]['similarity'] == ranked[1]['similarity'] == 1.0
+    assert ranked[0]['hybrid_score'] == round(0.7 + 0.3 * 0.9, 3)
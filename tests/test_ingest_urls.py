@@ -0,0 +1,114 @@
+import sys
+import threading
+import time
+
+import ingest_urls
+from ingest_urls import DomainThrottle
+
+
+def _stored_sources(app_module, urls):
+    with app_module.app.app_context():
+        rows = app_module.db.session.query(app_module.News.original_source).filter(app_module.News.original_source.in_(urls))
+        return sorted(row[0] for row in rows)
+
+
+def test_throttle_caps_concurrency_per_domain():
+    throttle = DomainThrottle(max_per_domain=2, min_interval=0)
+    lock = threading.Lock()
+    active = {'a': 0, 'b': 0}
+    peak = {'a': 0, 'b': 0}
+
+    def fetch(domain):
+        with throttle.slot(domain):
+            with lock:
+                active[domain] += 1
+                peak[domain] = max(peak[domain], active[domain])
+            time.sleep(0.05)
+            with lock:
+                active[domain] -= 1
+
+    threads = [threading.Thread(target=fetch, args=(domain,)) for domain in 'ab' * 5]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {'a': 2, 'b': 2}
+
+
+def test_ingest_spaces_requests_to_one_domain_only(app_module, stub_server):
+    # Same server under two host names: the delay applies per domain, not globally
+    urls = [stub_server.url(f'/article{n}.html', host) for n, host in ((1, '127.0.0.1'), (2, '127.0.0.1'), (3, 'localhost'))]
+
+    started = time.monotonic()
+    with app_module.app.app_context():
+        totals = ingest_urls.ingest(urls, workers=4, per_domain=2, delay=0.5, batch_size=10)
+    elapsed = time.monotonic() - started
+
+    assert totals['stored'] == 3
+    assert 0.5 <= elapsed < 1.0  # A global delay would take at least 1.0s
+    assert sorted(host.split(':')[0] for host, _ in stub_server.requests) == ['127.0.0.1', '127.0.0.1', 'localhost']
+
+
+def test_ingest_inserts_in_batches_and_indexes_after_commit(app_module, stub_server, monkeypatch):
+    urls = [stub_server.url(f'/article{n}.html') for n in range(1, 6)]
+    events = []
+    store_batch = ingest_urls.store_batch
+    commit = app_module.db.session.commit
+    monkeypatch.setattr(ingest_urls, 'store_batch', lambda batch, totals: (events.append(('batch', len(batch))), store_batch(batch, totals)))
+    monkeypatch.setattr(app_module.db.session, 'commit', lambda: (commit(), events.append(('commit',))))
+    monkeypatch.setattr(ingest_urls, 'index_stored_news', lambda news, analysis: events.append(('index', news.id)))
+
+    with app_module.app.app_context():
+        totals = ingest_urls.ingest(urls, workers=4, per_domain=5, delay=0, batch_size=2)
+
+    assert totals['stored'] == 5 and totals['failed'] == 0
+    assert [event[1] for event in events if event[0] == 'batch'] == [2, 2, 1]
+    kinds = [event[0] for event in events]
+    assert kinds == ['batch', 'commit', 'index', 'index'] * 2 + ['batch', 'commit', 'index']
+    assert _stored_sources(app_module, urls) == sorted(urls)
+
+
+def test_failed_commit_indexes_nothing(app_module, stub_server, monkeypatch):
+    urls = [stub_server.url('/article6.html')]
+    indexed = []
+
+    def failing_commit():
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(app_module.db.session, 'commit', failing_commit)
+    monkeypatch.setattr(ingest_urls, 'index_stored_news', lambda news, analysis: indexed.append(news.id))
+
+    with app_module.app.app_context():
+        totals = ingest_urls.ingest(urls, workers=1, per_domain=1, delay=0, batch_size=10)
+
+    assert totals['stored'] == 0 and totals['failed'] == 1
+    assert indexed == []
+    monkeypatch.undo()
+    assert _stored_sources(app_module, urls) == []
+
+
+def test_failed_downloads_are_counted_not_stored(app_module, stub_server):
+    stub_server.script('/gone', (404, 'not found'))
+    urls = [stub_server.url('/gone')]
+
+    with app_module.app.app_context():
+        totals = ingest_urls.ingest(urls, workers=1, per_domain=1, delay=0, batch_size=10)
+
+    assert totals == {'stored': 0, 'failed': 1, 'seconds': totals['seconds']}
+    assert _stored_sources(app_module, urls) == []
+
+
+def test_skip_existing_does_not_refetch_stored_urls(app_module, stub_server, tmp_path, monkeypatch):
+    first, second = stub_server.url('/article1.html'), stub_server.url('/article2.html')
+    with app_module.app.app_context():
+        ingest_urls.ingest([first], workers=1, per_domain=1, delay=0, batch_size=10)
+    url_file = tmp_path / 'urls.txt'
+    url_file.write_text(f"# fixture pages\n{first}\n{second}\n{second}\n", encoding='utf-8')
+
+    monkeypatch.setattr(sys, 'argv', ['ingest_urls.py', str(url_file), '--skip-existing', '--delay', '0'])
+    ingest_urls.main()
+
+    assert stub_server.hits['/article1.html'] == 1
+    assert stub_server.hits['/article2.html'] == 1
+    assert _stored_sources(app_module, [first, second]) == [first, second]
@@ -0,0 +1,89 @@
+import pickle
+
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.naive_bayes import MultinomialNB
+
+from related_index import ApproximateRelatedIndex
+
+TRAINING = [
+    ("the mayor opened the new library branch downtown on saturday", 0),
+    ("miracle cure discovered doctors hate this one simple trick", 1),
+    ("council approved the annual budget after a public hearing", 0),
+    ("shocking secret the government does not want you to know", 1),
+]
+
+
+@pytest.fixture
+def swap_model(app_module, monkeypatch, tmp_path):
+    """Install model/vectorizer files and reload them; the served model is restored afterwards"""
+    def swap(model, vectorizer_bytes):
+        model_file, vectorizer_file = tmp_path / 'model.pkl', tmp_path / 'vectorizer.pkl'
+        model_file.write_bytes(pickle.dumps(model))
+        vectorizer_file.write_bytes(vectorizer_bytes)
+        monkeypatch.setattr(app_module, 'model_path', str(model_file))
+        monkeypatch.setattr(app_module, 'vectorizer_path', str(vectorizer_file))
+        assert app_module.load_model_artifacts()
+        return app_module.model_artifacts
+    yield swap
+    monkeypatch.undo()
+    app_module.load_model_artifacts()
+
+
+def _small_model():
+    vectorizer = TfidfVectorizer(stop_words='english')
+    X = vectorizer.fit_transform([text for text, _ in TRAINING])
+    return MultinomialNB().fit(X, [label for _, label in TRAINING]), vectorizer
+
+
+def test_request_keeps_the_model_it_started_with(app_module, swap_model):
+    with app_module.app.test_request_context('/predict'):
+        served = app_module.current_model()
+        model, vectorizer = _small_model()
+        reloaded = swap_model(model, pickle.dumps(vectorizer))
+
+        assert app_module.model_artifacts is reloaded
+        assert app_module.current_model() is served
+        analysis = app_module.ArticleAnalysis('the council approved the budget')
+        assert analysis.vector.shape[1] == len(served.vectorizer.vocabulary_)
+
+    with app_module.app.test_request_context('/predict'):
+        assert app_module.current_model() is reloaded
+
+
+def test_new_vocabulary_gets_its_own_vector_indexes(app_module, client, swap_model, monkeypatch):
+    earlier = client.post('/predict', json={'news': 'The council approved the annual budget after a long public hearing.'})
+    served = app_module.model_artifacts
+    monkeypatch.setattr(app_module, 'RELATED_NEWS_MODE', 'approximate')
+    model, vectorizer = _small_model()
+
+    reloaded = swap_model(model, pickle.dumps(vectorizer))
+
+    assert reloaded.vocabulary_version != served.vocabulary_version
+    assert reloaded.related_index is not served.related_index
+    assert reloaded.story_clusters is not served.story_clusters
+    assert isinstance(reloaded.related_index, ApproximateRelatedIndex)
+    # The projection is sized for the new vocabulary, and rows vectorized with the old one are not loaded
+    for text in ('The mayor opened the new library branch downtown today.',
+                 'The mayor opened a library branch downtown on Saturday.'):
+        response = client.post('/predict', json={'news': text})
+        assert response.status_code == 200
+    assert response.get_json()['related_news']
+    assert reloaded.related_index._projection.shape[0] == len(vectorizer.vocabulary_)
+    assert earlier.get_json()['news_id'] not in reloaded.related_index
+
+
+def test_same_vectorizer_keeps_the_vector_indexes(app_module, swap_model):
+    served = app_module.model_artifacts
+    with open(app_module.vectorizer_path, 'rb') as f:
+        vectorizer_bytes = f.read()
+    with open(app_module.model_path, 'rb') as f:
+        model = pickle.load(f)
+    model.retrained = True  # Different model file, same vocabulary
+
+    reloaded = swap_model(model, vectorizer_bytes)
+
+    assert reloaded.version != served.version
+    assert reloaded.vocabulary_version == served.vocabulary_version
+    assert reloaded.related_index is served.related_index
+    assert reloaded.story_clusters is served.story_clusters
@@ -0,0 +1,112 @@
+from near_duplicates import SimHashIndex
+
+
+ARTICLE = ("<html><body><h1>Harbor ferry schedule expands</h1><p>The port authority confirmed on Monday that the harbor "
+           "ferry will add four evening crossings next month, according to a statement from the transport office. "
+           "Officials said the change follows a rise in commuter traffic across the bay during the past year.</p>"
+           "</body></html>")
+
+
+def _stored(app_module, news_id):
+    app_module.write_behind.flush()
+    with app_module.app.app_context():
+        return app_module.db.session.get(app_module.News, news_id)
+
+
+def test_failed_download_is_not_reused(app_module, client, stub_server):
+    stub_server.script('/flaky-article', (404, 'gone'), (200, ARTICLE))
+    url = stub_server.url('/flaky-article')
+
+    failed = client.post('/predict', json={'news': url}).get_json()
+
+    news = _stored(app_module, failed['news_id'])
+    assert news.canonical_url is None and news.content_hash is None
+
+    # Another failed URL does not match the empty text, and the recovered URL is downloaded again
+    stub_server.script('/missing', (404, 'gone'))
+    other = client.post('/predict', json={'news': stub_server.url('/missing')}).get_json()
+    assert not other['reused']
+    retried = client.post('/predict', json={'news': url}).get_json()
+    assert not retried['reused']
+    assert stub_server.hits['/flaky-article'] == 2
+    assert _stored(app_module, retried['news_id']).canonical_url is not None
+
+    # Now that it was downloaded, the URL is reused without another request
+    assert client.post('/predict', json={'news': url}).get_json()['reused']
+    assert stub_server.hits['/flaky-article'] == 2
+
+
+STORY = ("Residents of the valley town gathered at the library on Thursday evening to hear the county engineer explain "
+         "how the new flood barrier will be built along the river. The engineer said construction starts in spring, "
+         "will take about two years and is paid for by a state infrastructure grant approved last autumn. Several "
+         "farmers asked whether the barrier would change irrigation rights, and the county promised a written answer "
+         "before the next public meeting in the same library.")
+
+
+def test_exact_resubmission_is_not_a_near_duplicate(client):
+    text = STORY.replace('valley town', 'hill town')
+    first = client.post('/predict', json={'news': text}).get_json()
+
+    # Usually still in the write-behind buffer, so only the in-memory fingerprint finds it
+    again = client.post('/predict', json={'news': text}).get_json()
+
+    assert again['reused'] and again['news_id'] == first['news_id']
+    assert again['near_duplicate'] is False
+
+
+def test_near_duplicate_preview_shows_the_submitted_text(client):
+    original = client.post('/predict', json={'news': STORY}).get_json()
+    repost = "County desk update. " + STORY
+
+    response = client.post('/predict', json={'news': repost}).get_json()
+
+    assert response['reused'] and response['near_duplicate'] is True
+    assert response['news_id'] == original['news_id']
+    assert response['cleaned_preview'].startswith('county desk update residents of the valley town')
+
+
+def test_short_text_resubmitted_before_the_flush_is_reused(app_module, client):
+    text = "Bridge on Elm Street closed for repairs until Friday."
+    assert len(app_module.clean_text(text).split()) < app_module.NEAR_DUPLICATE_MIN_TOKENS
+
+    first = client.post('/predict', json={'news': text}).get_json()
+    again = client.post('/predict', json={'news': text}).get_json()
+
+    assert again['reused'] and again['news_id'] == first['news_id']
+    with app_module.app.app_context():
+        assert app_module.News.query.filter_by(cleaned_content=app_module.clean_text(text)).count() == 1
+
+
+MARKET = ("Stall holders at the weekend farmers market on the harbor front voted on Saturday to extend opening hours "
+          "through the winter, after the city agreed to light the square and cover the walkway between the fish hall "
+          "and the bus stop. The market manager said about forty growers and bakers plan to stay, and that a small "
+          "heating grant from the regional council will pay for tents until the covered hall is finished next year.")
+
+
+def test_reposts_with_a_new_headline_or_footer_are_near_duplicates(client):
+    original = client.post('/predict', json={'news': MARKET}).get_json()
+    reposts = [
+        "Harbor market keeps its doors open all winter as the city lights the square. " + MARKET,
+        MARKET + " Sign up for our free morning newsletter to get the top stories in your inbox every day. "
+                 "Have a news tip? Email our newsroom or call the local desk.",
+    ]
+
+    for repost in reposts:
+        response = client.post('/predict', json={'news': repost}).get_json()
+        assert response['reused'] and response['near_duplicate'] is True
+        assert response['news_id'] == original['news_id']
+
+
+def test_wider_matches_need_similar_shingles(app_module):
+    fingerprint, signature = app_module.article_fingerprint(app_module.clean_text(MARKET))
+    _, unrelated = app_module.article_fingerprint(app_module.clean_text(STORY))
+    # Eight bits away: beyond the always-matching distance, within the wider one
+    nearby = fingerprint ^ 0xFF
+    index = SimHashIndex(max_distance=15, min_similarity=0.6)
+    index.add(1, (nearby, 1, unrelated))
+    index.add(2, (fingerprint ^ 0x7, 2, None))
+
+    assert index.query(fingerprint, signature) == (2, 2, 3)
+    assert index.query(fingerprint, signature, exclude_id=2) is None
+    index.add(3, (nearby, 3, signature))
+    assert index.query(fingerprint, signature, exclude_id=2) == (3, 3, 8)
@@ -0,0 +1,77 @@
+import functools
+import time
+
+from scipy.sparse import csr_matrix
+
+from story_clusters import StoryClusterer
+
+ARTICLE = ("Astronomers at the mountain observatory reported that a newly found comet will pass close enough to be seen "
+           "without a telescope in early March, according to a statement from the national space agency. The agency "
+           "said the comet is expected to be brightest just after sunset, and urged viewers to find a dark site away "
+           "from city lights on the clearest evenings of the month.")
+
+
+def _story(clusterer, news_id):
+    cluster_id = clusterer.cluster_of(news_id)
+    stories = clusterer.trending(time.time(), window_seconds=3600, limit=50, min_count=1)
+    return next(story for story in stories if story['cluster_id'] == cluster_id)
+
+
+def test_repeat_submissions_reach_every_worker(app_module, client):
+    first = client.post('/predict', json={'news': ARTICLE}).get_json()
+    for _ in range(2):
+        assert client.post('/predict', json={'news': ARTICLE}).get_json()['reused']
+    app_module.write_behind.flush()
+
+    artifacts = app_module.model_artifacts
+    local = artifacts.story_clusters
+    # A worker that only sees the database
+    other = StoryClusterer(threshold=local.threshold, max_clusters=local.max_clusters,
+                           bucket_seconds=local.bucket_seconds, max_window=local.max_window)
+    load_rows = functools.partial(app_module._load_cluster_rows, vocabulary_version=artifacts.vocabulary_version,
+                                  max_window=local.max_window)
+    load_events = functools.partial(app_module._load_cluster_events, vocabulary_version=artifacts.vocabulary_version,
+                                    max_window=local.max_window)
+    with app_module.app.app_context():
+        app_module.sync_story_clusters()
+        other.sync(load_rows)
+        other.sync_events(load_events)
+
+    assert _story(other, first['news_id'])['count'] == _story(local, first['news_id'])['count'] >= 3
+
+    # Syncing again, or syncing the worker that recorded the submissions, counts nothing twice
+    with app_module.app.app_context():
+        app_module.sync_story_clusters()
+        other.sync_events(load_events)
+    assert _story(other, first['news_id'])['count'] == _story(local, first['news_id'])['count']
+
+
+def test_record_counts_each_event_once():
+    clusterer = StoryClusterer(bucket_seconds=60)
+    vector = csr_matrix([[0.0, 1.0, 0.5]])
+    now = time.time()
+    clusterer.add(1, (vector, now, 'REAL', 'Comet visible'))
+
+    clusterer.record(10, (1, vector, now, 'REAL', 'Comet visible'))
+    clusterer.record(10, (1, vector, now, 'REAL', 'Comet visible'))
+    clusterer.record(11, (1, vector, now, 'FAKE', 'Comet visible'))
+
+    story = clusterer.trending(now, window_seconds=60, min_count=1)[0]
+    assert story['count'] == 3
+    assert story['fake_ratio'] == round(1 / 3, 3)
+
+
+def test_story_ids_do_not_depend_on_arrival_order():
+    now = time.time()
+    rows = {news_id: (csr_matrix([[1.0, 0.2 * news_id, 0.0, 0.0]]), now, 'REAL', f'Comet {news_id}') for news_id in (3, 4, 5)}
+    rows[8] = (csr_matrix([[0.0, 0.0, 1.0, 0.1]]), now, 'FAKE', 'Flood')
+    # One worker stored 5 and 8 itself and synced the rest later; the other synced everything in id order
+    first, second = StoryClusterer(bucket_seconds=60), StoryClusterer(bucket_seconds=60)
+    for news_id in (5, 8, 3, 4):
+        first.add(news_id, rows[news_id])
+    for news_id in (3, 4, 5, 8):
+        second.add(news_id, rows[news_id])
+
+    assert [first.cluster_of(news_id) for news_id in rows] == [second.cluster_of(news_id) for news_id in rows] == [3, 3, 3, 8]
+    assert first.trending(now, window_seconds=60, min_count=1) == second.trending(now, window_seconds=60, min_count=1)
+    assert first.trending(now, window_seconds=60, min_count=1)[0]['title'] == 'Comet 3'
@@ -0,0 +1,142 @@
+import functools
+
+import pytest
+
+from related_index import RelatedNewsIndex
+from write_behind import IdAllocator, WriteBehindQueue
+
+
+@pytest.fixture
+def queue(app_module):
+    context = app_module.app.app_context()
+    context.push()
+    queue = WriteBehindQueue(app_module.app, app_module.db, app_module.News, app_module.User, app_module.NewsEvent,
+                             app_module.news_commit_sequence, app_module.news_event_commit_sequence, flush_interval=3600, batch_size=100, max_pending=3)
+    yield queue
+    queue._stopped = True
+    queue._wake.set()
+    context.pop()
+
+
+@pytest.fixture
+def failing_commits(app_module, monkeypatch):
+    def commit():
+        raise RuntimeError('database is locked')
+    monkeypatch.setattr(app_module.db.session, 'commit', commit)
+    return monkeypatch
+
+
+def _news(app_module, allocator=None):
+    allocator = allocator or app_module.news_id_allocator
+    return app_module.News(id=allocator.next_id(), title='Write-behind test', content='Body text', cleaned_content='body text',
+                           prediction='REAL', confidence=0.9, source_type='text')
+
+
+def _stored(app_module, ids):
+    with app_module.app.app_context():
+        return sorted(row[0] for row in app_module.db.session.query(app_module.News.id).filter(app_module.News.id.in_(ids)))
+
+
+def test_failed_flush_keeps_every_row_for_the_next_one(app_module, queue, failing_commits):
+    news = [_news(app_module) for _ in range(3)]
+    for item in news:
+        queue.add_news(item)
+
+    assert queue.flush() == 0
+    assert queue.stats()['pending_rows'] == 3
+
+    failing_commits.undo()
+    assert queue.flush() == 3
+    assert _stored(app_module, [item.id for item in news]) == sorted(item.id for item in news)
+
+
+def test_full_buffer_raises_instead_of_dropping(app_module, queue, failing_commits):
+    news = [_news(app_module) for _ in range(3)]
+    for item in news:
+        queue.add_news(item)
+
+    # The inline flush fails, so the caller gets the error and the new row is not queued
+    with pytest.raises(RuntimeError):
+        queue.add_news(_news(app_module))
+    assert queue.stats()['pending_rows'] == 3
+    assert queue.failures == 1
+
+    failing_commits.undo()
+    extra = _news(app_module)
+    queue.add_news(extra)  # Inline flush succeeds and makes room
+    assert queue.flush() == 1
+    ids = [item.id for item in news] + [extra.id]
+    assert _stored(app_module, ids) == sorted(ids)
+
+
+def test_predict_reports_no_news_id_when_the_buffer_cannot_drain(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module.write_behind, 'max_pending', 0)
+    monkeypatch.setattr(app_module.write_behind, 'flush', lambda raise_errors=False: (_ for _ in ()).throw(RuntimeError('disk full')))
+
+    response = client.post('/predict', json={'news': 'Officials confirmed the new budget for the transit system on Tuesday afternoon.'})
+
+    assert response.status_code == 200
+    assert response.get_json()['news_id'] is None
+
+
+def test_bad_row_is_retried_alone_then_set_aside(app_module, queue):
+    good = [_news(app_module) for _ in range(2)]
+    bad = _news(app_module)
+    bad.cleaned_content = None  # NOT NULL violation: fails every time
+    for item in (good[0], bad, good[1]):
+        queue.add_news(item)
+
+    # The batch fails, the row-by-row retry writes the good rows
+    assert queue.flush() == 2
+    assert _stored(app_module, [item.id for item in good]) == sorted(item.id for item in good)
+    assert queue.stats()['pending_rows'] == 1
+
+    later = _news(app_module)
+    queue.add_news(later)
+    assert queue.flush() == 1  # The bad row does not block rows queued after it
+    assert queue.flush() == 0
+    assert queue.stats()['pending_rows'] == 0
+    assert queue.dead_lettered == 1 and queue.dead_letters[-1]['row']['id'] == bad.id
+    assert _stored(app_module, [bad.id, later.id]) == [later.id]
+
+
+def test_unavailable_database_does_not_count_attempts(app_module, queue, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+
+    def commit():
+        raise OperationalError('COMMIT', {}, Exception('unable to open database file'))
+    monkeypatch.setattr(app_module.db.session, 'commit', commit)
+    news = _news(app_module)
+    queue.add_news(news)
+
+    for _ in range(queue.max_attempts + 1):
+        assert queue.flush() == 0
+    assert queue.dead_lettered == 0 and queue.stats()['pending_rows'] == 1
+
+    monkeypatch.undo()
+    assert queue.flush() == 1
+
+
+def test_lower_id_committed_after_a_sync_is_still_loaded(app_module, queue):
+    # Two workers with their own id blocks; the one holding the lower ids writes last
+    first_worker, second_worker = (IdAllocator(app_module.db, app_module.News.__table__.name, block_size=10)
+                                   for _ in range(2))
+    low, high = _news(app_module, first_worker), _news(app_module, second_worker)
+    assert low.id < high.id
+    artifacts = app_module.model_artifacts
+    for news in (low, high):
+        news.content_vector_sparse = app_module.encode_sparse_vector(
+            artifacts.vectorizer.transform(['officials confirmed the transit budget']))
+        news.vocabulary_version = artifacts.vocabulary_version
+    load_rows = functools.partial(app_module._load_indexable_news, vocabulary_version=artifacts.vocabulary_version)
+
+    index = RelatedNewsIndex()
+    queue.add_news(high)
+    queue.flush()
+    index.sync(load_rows)
+    assert high.id in index and low.id not in index
+
+    queue.add_news(low)
+    queue.flush()
+    index.sync(load_rows)
+    assert low.id in index
@@ -18,7 +18,8 @@ os.chdir(backend_dir)
 
 # Now import the Flask app (this will work because we're in backend directory)
 try:
-    from app import app, db
+    from app import app, db, sync_related_index, sync_simhash_index
+    from db_migrations import add_missing_columns, add_missing_indexes
     print("✅ Flask app imported successfully")
 except Exception as e:
     print(f"❌ Error importing app: {e}")
@@ -30,7 +31,12 @@ except Exception as e:
 with app.app_context():
     try:
         db.create_all()
+        add_missing_columns(db)
+        add_missing_indexes(db)
         print("✅ Database tables initialized")
+        sync_related_index()
+        sync_simhash_index()
+        print("✅ Related-news and near-duplicate indexes loaded")
     except Exception as e:
         print(f"⚠️ Database initialization note: {e}")
         # Database initialization is optional - app.py handles it